@@ -0,0 +1,169 @@
+import numpy as np
+
+# Experience replay for the DQN agent, stored in preallocated arrays.
+# Boards are packed two cells per byte (41 bytes) or one cell per byte (81 bytes), actions as uint8 (cell, number - 1).
+# With the nibble packing, a transition takes 89 bytes (+ 8 bytes with prioritized sampling).
+
+BOARD_BYTES = {"nibble": 41, "uint8": 81}
+
+def pack_boards(boards, packing="nibble"):
+    """
+    Pack (N, 9, 9) boards into (N, 41) uint8 arrays (nibble) or (N, 81) uint8 arrays.
+    """
+    cells = np.asarray(boards, dtype=np.uint8).reshape(-1, 81)
+    if packing == "uint8":
+        return cells
+    padded = np.zeros((cells.shape[0], 82), dtype=np.uint8)
+    padded[:, :81] = cells
+    return (padded[:, 0::2] << 4) | padded[:, 1::2]
+
+def unpack_boards(packed, packing="nibble"):
+    """
+    Unpack boards packed by pack_boards into (N, 9, 9) uint8 arrays.
+    """
+    if packing == "uint8":
+        return packed.reshape(-1, 9, 9)
+    cells = np.empty((packed.shape[0], 82), dtype=np.uint8)
+    cells[:, 0::2] = packed >> 4
+    cells[:, 1::2] = packed & 0x0F
+    return cells[:, :81].reshape(-1, 9, 9)
+
+class SumTree:
+    """
+    Binary tree whose leaves hold the priorities and whose nodes hold the sums of their children,
+    stored in a flat array (node i has children 2i and 2i + 1, the leaves start at index size).
+    Updates and prefix-sum searches are vectorized over a batch of indices.
+    """
+    def __init__(self, capacity):
+        self.size = 1 << max(0, int(np.ceil(np.log2(max(capacity, 1)))))
+        self.tree = np.zeros(2 * self.size, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def update(self, indices, priorities):
+        nodes = np.asarray(indices) + self.size
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        # Index of the leaf where each cumulative value falls
+        nodes = np.ones(len(values), dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        while nodes[0] < self.size:
+            left = self.tree[2 * nodes]
+            go_right = values >= left
+            values -= left * go_right
+            nodes = 2 * nodes + go_right
+        return nodes - self.size
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions (state, action, reward, next state, done).
+    When it is full, the oldest transitions are overwritten.
+    With prioritized=True, transitions are sampled with probability proportional to priority ** alpha (sum-tree),
+    new transitions get the highest priority seen so far.
+    """
+    def __init__(self, capacity, packing="nibble", prioritized=False, alpha=0.6, eps=1e-6, rng=None):
+        if packing not in BOARD_BYTES:
+            raise ValueError(f"Invalid packing: {packing}")
+        self.capacity = capacity
+        self.packing = packing
+        self.rng = np.random.default_rng() if rng is None else rng
+
+        self.states = np.zeros((capacity, BOARD_BYTES[packing]), dtype=np.uint8)
+        self.next_states = np.zeros((capacity, BOARD_BYTES[packing]), dtype=np.uint8)
+        self.cells = np.zeros(capacity, dtype=np.uint8)
+        self.digits = np.zeros(capacity, dtype=np.uint8)  # Number - 1
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+
+        self.position = 0  # Next index to write
+        self.size = 0
+
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.eps = eps
+        if prioritized:
+            self.tree = SumTree(capacity)
+            self.max_priority = 1.0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        arrays = [self.states, self.next_states, self.cells, self.digits, self.rewards, self.dones]
+        return sum(a.nbytes for a in arrays) + (self.tree.tree.nbytes if self.prioritized else 0)
+
+    def add(self, states, actions, rewards, next_states, dones):
+        """
+        Add a batch of transitions: states and next_states (N, 9, 9), actions (N,) indices 9 * cell + number - 1
+        (as in SudokuEnv), rewards (N,) and dones (N,).
+        """
+        actions = np.asarray(actions).reshape(-1)
+        n = len(actions)
+        if n == 0:
+            return
+        skip = max(0, n - self.capacity)  # Only the last capacity transitions would be kept
+        indices = (self.position + np.arange(skip, n)) % self.capacity
+
+        self.states[indices] = pack_boards(states, self.packing)[skip:]
+        self.next_states[indices] = pack_boards(next_states, self.packing)[skip:]
+        self.cells[indices] = actions[skip:] // 9
+        self.digits[indices] = actions[skip:] % 9
+        self.rewards[indices] = np.asarray(rewards, dtype=np.float32).reshape(-1)[skip:]
+        self.dones[indices] = np.asarray(dones, dtype=bool).reshape(-1)[skip:]
+
+        if self.prioritized:
+            self.tree.update(indices, self.max_priority ** self.alpha)
+
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample(self, batch_size, beta=0.4):
+        """
+        Sample a minibatch. Returns a dict with states, next_states (batch_size, 9, 9) uint8, actions (int64 indices),
+        rewards, dones, the buffer indices and the importance-sampling weights (all ones without prioritization).
+        """
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer.")
+
+        if self.prioritized:
+            # Stratified sampling: one value in each of batch_size equal segments of the total priority
+            segment = self.tree.total / batch_size
+            values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+            indices = np.minimum(self.tree.find(values), self.size - 1)
+            probabilities = self.tree.tree[indices + self.tree.size] / self.tree.total
+            weights = (self.size * probabilities) ** -beta
+            weights = (weights / weights.max()).astype(np.float32)
+        else:
+            indices = self.rng.integers(self.size, size=batch_size)
+            weights = np.ones(batch_size, dtype=np.float32)
+
+        return {
+            "states": unpack_boards(self.states[indices], self.packing),
+            "actions": 9 * self.cells[indices].astype(np.int64) + self.digits[indices],
+            "rewards": self.rewards[indices],
+            "next_states": unpack_boards(self.next_states[indices], self.packing),
+            "dones": self.dones[indices],
+            "indices": indices,
+            "weights": weights,
+        }
+
+    def update_priorities(self, indices, td_errors):
+        """
+        Set the priorities of sampled transitions from their TD errors.
+        """
+        if not self.prioritized:
+            return
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.eps
+        self.max_priority = max(self.max_priority, priorities.max())
+        # With duplicated indices, the last priority is kept
+        self.tree.update(indices, priorities ** self.alpha)
@@ -0,0 +1,122 @@
+import numpy as np
+import sys
+import os
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.utils.puzzle_store import PuzzleStore
+from src.generator.canonical_form import DedupIndex
+
+# Loader for the Kaggle Sudoku dataset: a CSV file with a header and one "puzzle,solution" row of 81 digits each
+# (0 or "." for an empty cell). The rows have a fixed size, so a chunk of rows is parsed as a single byte array.
+
+CHUNK_SIZE = 1 << 16
+
+PUZZLE_COLUMNS = ("puzzle", "puzzles", "quizzes", "quiz")
+SOLUTION_COLUMNS = ("solution", "solutions")
+
+def _column_offsets(header):
+    # Byte offsets of the puzzle and the solution in a row
+    columns = [name.strip().lower() for name in header.decode().strip().split(",")]
+    if len(columns) != 2 or not set(columns) & set(PUZZLE_COLUMNS) or not set(columns) & set(SOLUTION_COLUMNS):
+        raise ValueError(f"Invalid header: expected puzzle and solution columns, got {columns}")
+    if columns[0] in PUZZLE_COLUMNS:
+        return 0, 82
+    return 82, 0
+
+def iter_csv_chunks(csv_path, chunk_size=CHUNK_SIZE):
+    """
+    Read the CSV file by chunks of chunk_size rows, without creating a Python object per row.
+    Yields (puzzles, solutions) as (n, 9, 9) uint8 arrays. The arrays are preallocated once and
+    overwritten by the next chunk: copy them to keep them.
+    """
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        puzzle_offset, solution_offset = _column_offsets(header)
+
+        # All the rows have the size of the first one ("\n" or "\r\n" line endings)
+        first_row = f.readline()
+        row_size = len(first_row)
+        if row_size == 0:
+            return
+        if row_size < 163 or first_row[81:82] != b",":
+            raise ValueError(f"Invalid row: {first_row[:170]!r}")
+        f.seek(len(header))
+
+        buffer = np.empty(chunk_size * row_size, dtype=np.uint8)
+        puzzles = np.empty((chunk_size, 9, 9), dtype=np.uint8)
+        solutions = np.empty((chunk_size, 9, 9), dtype=np.uint8)
+
+        while True:
+            n_bytes = f.readinto(memoryview(buffer))
+            if n_bytes == 0:
+                break
+
+            # The last row of the file may have no line ending
+            n = n_bytes // row_size
+            if n_bytes % row_size >= 163:
+                buffer[n_bytes:(n + 1) * row_size] = ord("\n")
+                n += 1
+            elif n_bytes % row_size != 0 and buffer[n * row_size:n_bytes].tobytes().strip():
+                raise ValueError("Invalid file: the rows should all have the same size.")
+
+            rows = buffer[:n * row_size].reshape(n, row_size)
+            if not (rows[:, 81] == ord(",")).all():
+                raise ValueError("Invalid file: the rows should all have the same size.")
+
+            for offset, grids in ((puzzle_offset, puzzles), (solution_offset, solutions)):
+                cells = grids[:n].reshape(n, 81)
+                np.subtract(rows[:, offset:offset + 81], ord("0"), out=cells)
+                cells[cells > 9] = 0  # "." for an empty cell
+
+            yield puzzles[:n], solutions[:n]
+
+def convert_csv(csv_path, store_path, chunk_size=CHUNK_SIZE, overwrite=False, verbose=True, dedup_path=None):
+    """
+    Convert the CSV file once into a PuzzleStore (nibble packing, 81 bytes per pair) that can be memory-mapped.
+    With dedup_path, the puzzles equivalent to a puzzle of that DedupIndex (or to a previous row) are skipped,
+    and the others are added to the index. Returns the store.
+    """
+    store = PuzzleStore.create(store_path, packing="nibble", metadata={"source": os.path.basename(csv_path)}, overwrite=overwrite)
+    dedup_index = DedupIndex(dedup_path) if dedup_path is not None else None
+    duplicates = 0
+    for puzzles, solutions in iter_csv_chunks(csv_path, chunk_size):
+        if dedup_index is not None:
+            new = dedup_index.add_many(puzzles)
+            duplicates += int((~new).sum())
+            puzzles, solutions = puzzles[new], solutions[new]
+        store.append(puzzles, solutions)
+        if verbose:
+            print(f"\r{len(store)} puzzles converted, {duplicates} duplicates skipped", end="", flush=True)
+    if verbose:
+        print()
+    return store
+
+def load_dataset(csv_path, store_path=None, chunk_size=CHUNK_SIZE):
+    """
+    Return the PuzzleStore of the CSV file, converting it on the first call.
+    By default, the store is written next to the CSV file with the .store extension.
+    """
+    if store_path is None:
+        store_path = os.path.splitext(csv_path)[0] + ".store"
+    if os.path.exists(store_path) and os.path.getmtime(store_path) >= os.path.getmtime(csv_path):
+        return PuzzleStore(store_path)
+    return convert_csv(csv_path, store_path, chunk_size, overwrite=True)
+
+def iter_minibatches(store, batch_size, shuffle=True, rng=None, drop_last=False):
+    """
+    Yield (puzzles, solutions) minibatches of (batch_size, 9, 9) uint8 arrays from the store, for one epoch.
+    With shuffle=True, the records are drawn in a random order; the indices of a batch are sorted so that
+    the memory-mapped file is read forward.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n = len(store)
+    order = rng.permutation(n) if shuffle else np.arange(n)
+    records = store.records
+
+    for start in range(0, n, batch_size):
+        indices = order[start:start + batch_size]
+        if drop_last and len(indices) < batch_size:
+            break
+        yield store.decode(records[np.sort(indices)])
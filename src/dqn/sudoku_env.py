@@ -0,0 +1,131 @@
+import numpy as np
+
+# Batched Sudoku environment: n_envs boards are stepped at once with array operations.
+# An action is an index 9 * cell + (num - 1) with cell = 9 * row + col, so there are 729 actions.
+# The row, column and box occupancy of each board is kept as 9-bit masks (bit num - 1 set if num is present).
+
+N_ACTIONS = 729
+ALL_DIGITS = (1 << 9) - 1
+DIGIT_BITS = np.arange(9, dtype=np.uint16)
+
+# Box index of each cell
+CELL_BOX = (3 * (np.arange(81) // 27) + (np.arange(81) % 9) // 3).reshape(9, 9)
+
+# Default rewards
+DEFAULT_REWARDS = {
+    "legal": 1.0,  # Number placed without conflict
+    "illegal": -1.0,  # Filled cell or conflicting number, the board is not changed
+    "solved": 10.0,  # Bonus when the board is complete
+    "dead_end": -5.0,  # An empty cell has no candidate left, the episode ends
+}
+
+def occupancy_masks(boards):
+    """
+    Return the row, column and box occupancy masks of a (N, 9, 9) stack of boards, as three (N, 9) uint16 arrays.
+    """
+    boards = np.asarray(boards)
+    bits = np.where(boards > 0, np.left_shift(1, np.maximum(boards.astype(np.int32) - 1, 0)), 0).astype(np.uint16)
+    rows = np.bitwise_or.reduce(bits, axis=2)
+    cols = np.bitwise_or.reduce(bits, axis=1)
+    boxes = np.bitwise_or.reduce(bits.reshape(-1, 3, 3, 3, 3).transpose(0, 1, 3, 2, 4).reshape(-1, 9, 9), axis=2)
+    return rows, cols, boxes
+
+class SudokuEnv:
+    """
+    Gym-style environment stepping n_envs Sudoku boards at once.
+    puzzles is a (M, 9, 9) array of puzzles drawn at random, or a function (k, rng) -> (k, 9, 9) array
+    (for example to read a PuzzleStore). Finished boards are reset automatically from this source.
+    """
+    def __init__(self, n_envs, puzzles, max_steps=2 * 81, rewards=None, rng=None):
+        self.n_envs = n_envs
+        self.max_steps = max_steps
+        self.rewards = dict(DEFAULT_REWARDS, **(rewards or {}))
+        self.rng = np.random.default_rng() if rng is None else rng
+
+        if callable(puzzles):
+            self.puzzle_source = puzzles
+        else:
+            puzzles = np.asarray(puzzles, dtype=np.uint8)
+            self.puzzle_source = lambda k, rng: puzzles[rng.integers(len(puzzles), size=k)]
+
+        self.boards = np.zeros((n_envs, 9, 9), dtype=np.uint8)
+        self.rows = np.zeros((n_envs, 9), dtype=np.uint16)
+        self.cols = np.zeros((n_envs, 9), dtype=np.uint16)
+        self.boxes = np.zeros((n_envs, 9), dtype=np.uint16)
+        self.steps = np.zeros(n_envs, dtype=np.int32)
+        self._envs = np.arange(n_envs)
+
+    def _reset_envs(self, envs):
+        # Load new puzzles in the given boards
+        if len(envs) == 0:
+            return
+        boards = np.asarray(self.puzzle_source(len(envs), self.rng), dtype=np.uint8).reshape(len(envs), 9, 9)
+        self.boards[envs] = boards
+        self.rows[envs], self.cols[envs], self.boxes[envs] = occupancy_masks(boards)
+        self.steps[envs] = 0
+
+    def reset(self):
+        """
+        Reset every board, return the observations (N, 9, 9) and the legal action masks (N, 729).
+        """
+        self._reset_envs(self._envs)
+        return self.boards.copy(), self.action_masks()
+
+    def candidates(self):
+        # Candidate mask of every cell (N, 9, 9), 0 for filled cells
+        used = self.rows[:, :, None] | self.cols[:, None, :] | self.boxes[:, CELL_BOX]
+        return np.where(self.boards == 0, ~used & ALL_DIGITS, 0).astype(np.uint16)
+
+    def action_masks(self, candidates=None):
+        """
+        Return the legal actions as a (N, 729) boolean array.
+        """
+        if candidates is None:
+            candidates = self.candidates()
+        return ((candidates[..., None] >> DIGIT_BITS) & 1).astype(bool).reshape(self.n_envs, N_ACTIONS)
+
+    def step(self, actions):
+        """
+        Apply one action per board. Returns the observations, the rewards, the done flags, the legal action masks
+        and an info dict ("solved", "dead_end" and "final_boards", the boards before the automatic reset).
+        The observations and masks of the finished boards are the ones of their new puzzle.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        envs = self._envs
+        cells, digits = actions // 9, actions % 9
+        rows, cols = cells // 9, cells % 9
+        boxes = CELL_BOX[rows, cols]
+        bits = (1 << digits).astype(np.uint16)
+
+        # An action is legal if the cell is empty and the number is not in its row, column or box
+        used = self.rows[envs, rows] | self.cols[envs, cols] | self.boxes[envs, boxes]
+        legal = (self.boards[envs, rows, cols] == 0) & ((used & bits) == 0)
+
+        # Place the legal numbers and update the occupancy masks
+        placed = envs[legal]
+        self.boards[placed, rows[legal], cols[legal]] = digits[legal] + 1
+        self.rows[placed, rows[legal]] |= bits[legal]
+        self.cols[placed, cols[legal]] |= bits[legal]
+        self.boxes[placed, boxes[legal]] |= bits[legal]
+        self.steps += 1
+
+        # End of the episodes
+        candidates = self.candidates()
+        empty = self.boards == 0
+        solved = ~empty.any(axis=(1, 2))
+        dead_end = (empty & (candidates == 0)).any(axis=(1, 2))
+        dones = solved | dead_end | (self.steps >= self.max_steps)
+
+        rewards = np.where(legal, self.rewards["legal"], self.rewards["illegal"]).astype(np.float32)
+        rewards[solved] += self.rewards["solved"]
+        rewards[dead_end] += self.rewards["dead_end"]
+
+        info = {"solved": solved, "dead_end": dead_end, "final_boards": self.boards[dones].copy()}
+
+        # Automatic reset of the finished boards
+        finished = envs[dones]
+        if len(finished):
+            self._reset_envs(finished)
+            candidates[finished] = self.candidates()[finished]
+
+        return self.boards.copy(), rewards, dones, self.action_masks(candidates), info
@@ -0,0 +1,111 @@
+import numpy as np
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.generator.grid_generator import generate_grid, difficulty_levels
+from src.generator.canonical_form import DedupIndex
+
+# Number of tasks submitted in advance for each worker
+TASKS_PER_WORKER = 4
+
+# Function to generate one puzzle in a worker process
+def generate_task(difficulty, index, seed, mode, attempt=0):
+    """
+    Generate the puzzle number index of the difficulty. The random state only depends on (seed, difficulty, index),
+    so a run gives the same puzzles whatever the number of workers or the order in which the tasks finish.
+    A new attempt (after a duplicate puzzle) also depends on the attempt number.
+    """
+    entropy = [seed, difficulty_levels[difficulty], index] + ([attempt] if attempt else [])
+    task_seed = np.random.SeedSequence(entropy).generate_state(1)[0]
+    np.random.seed(task_seed)
+    solution_grid, grid = generate_grid(difficulty=difficulty, mode=mode)
+    return difficulty, index, grid, solution_grid
+
+# Function to format a generated puzzle as a line of the output file
+def format_line(difficulty, index, grid, solution_grid):
+    return f"{difficulty} {index} {''.join(map(str, np.ravel(grid)))} {''.join(map(str, np.ravel(solution_grid)))}\n"
+
+# Function to read the puzzles already in the output file
+def read_done(output_path):
+    """
+    Return the set of (difficulty, index) already written in the output file.
+    A last line cut by an interruption is removed from the file.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "rb+") as f:
+        content = f.read()
+        # Drop an incomplete last line
+        end = content.rfind(b"\n") + 1
+        if end != len(content):
+            f.truncate(end)
+
+    for line in content[:end].decode().splitlines():
+        fields = line.split()
+        if len(fields) == 4 and fields[0] in difficulty_levels:
+            done.add((fields[0], int(fields[1])))
+    return done
+
+def generate_bulk(output_path, count, difficulties=tuple(difficulty_levels), workers=None, seed=0, mode="incremental", verbose=True,
+                  dedup_path=None):
+    """
+    Generate count puzzles of each difficulty on a process pool and append them to the output file as they finish,
+    one line "difficulty index puzzle solution" per puzzle (81 digits each, 0 for an empty cell).
+    The puzzles already in the file are skipped, so an interrupted run can be resumed with the same arguments.
+    With dedup_path, the canonical forms of the written puzzles are kept in that DedupIndex, and a puzzle equivalent
+    to one of the index is generated again (next attempt of the same task).
+    Returns the number of puzzles generated by this call.
+    """
+    for difficulty in difficulties:
+        if difficulty not in difficulty_levels:
+            raise ValueError(f"Invalid difficulty: {difficulty}")
+
+    done = read_done(output_path)
+    tasks = [(difficulty, index) for difficulty in difficulties for index in range(count) if (difficulty, index) not in done]
+    if verbose:
+        print(f"{len(done)} puzzles already in {output_path}, {len(tasks)} to generate")
+    if not tasks:
+        return 0
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    workers = workers or os.cpu_count()
+    dedup_index = DedupIndex(dedup_path) if dedup_path is not None else None
+    tasks = [(difficulty, index, 0) for difficulty, index in tasks]
+    n_tasks = len(tasks)
+    generated, duplicates = 0, 0
+
+    with open(output_path, "a") as f, ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        next_task = 0
+        while next_task < len(tasks) or pending:
+            # Keep a bounded number of tasks in flight
+            while next_task < len(tasks) and len(pending) < TASKS_PER_WORKER * workers:
+                difficulty, index, attempt = tasks[next_task]
+                pending[executor.submit(generate_task, difficulty, index, seed, mode, attempt)] = tasks[next_task]
+                next_task += 1
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                difficulty, index, attempt = pending.pop(future)
+                result = future.result()
+                if dedup_index is not None and not dedup_index.add(result[2]):
+                    # Equivalent to a puzzle already generated, try again
+                    tasks.append((difficulty, index, attempt + 1))
+                    duplicates += 1
+                    continue
+                f.write(format_line(*result))
+                generated += 1
+            f.flush()
+
+            if verbose:
+                print(f"\r{generated}/{n_tasks} puzzles generated, {duplicates} duplicates", end="", flush=True)
+
+    if verbose:
+        print()
+    return generated
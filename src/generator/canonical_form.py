@@ -0,0 +1,323 @@
+import numpy as np
+import itertools
+import math
+import os
+import struct
+
+# Canonical form of a puzzle under the Sudoku symmetries that keep a grid valid (the transformations of
+# solution_factory.transform_grids): transposition, permutations of the bands and of the rows within each band,
+# permutations of the stacks and of the columns within each stack, and relabeling of the numbers.
+#
+# The canonical form is the smallest grid in row-major order (0 before any number) among all the transformed grids,
+# the numbers being relabeled 1, 2, 3... in order of first appearance. It is built row by row: every partial
+# transformation (orientation, rows chosen so far, column permutation) giving the smallest rows so far is kept,
+# and extended with the rows still allowed by the band structure. The first row only depends on the positions of
+# its clues, so its best column permutations come from precomputed tables. A unique puzzle never has two empty rows
+# in a band (swapping them would give a second solution), so few partial transformations tie after each row.
+# The search is vectorized over the puzzles of a batch.
+
+# Number of puzzles canonicalized at once, to bound the size of the temporary arrays
+BATCH_SIZE = 2048
+
+# Maximum number of partial transformations after the first row (a batch above it is split, full grids reach it)
+MAX_CANDIDATES = 1 << 19
+
+class LineTables:
+    """
+    Permutations of the k^2 lines that keep the band structure, and the tables used for the first row:
+    for each permutation and each mask of filled columns, the permuted mask (1 for a filled cell, first column
+    in the highest bit, so a smaller value has its empty cells first), its minimum over the permutations
+    and the permutations reaching it.
+    """
+    def __init__(self, box_size):
+        self.box_size = k = box_size
+        self.size = n = k * k
+        perms = []
+        for band_order in itertools.permutations(range(k)):
+            for line_orders in itertools.product(itertools.permutations(range(k)), repeat=k):
+                perms.append([k * band + line for band, lines in zip(band_order, line_orders) for line in lines])
+        self.perms = np.array(perms, dtype=np.intp)  # (P, n): result line j is the original line perms[p, j]
+
+        masks = np.arange(1 << n)
+        self.perm_masks = np.zeros((len(perms), 1 << n), dtype=np.int64)  # (P, 2^n)
+        for j in range(n):
+            self.perm_masks |= ((masks[None, :] >> self.perms[:, j, None]) & 1) << (n - 1 - j)
+        self.min_masks = self.perm_masks.min(axis=0)
+        self.powers = (n + 1) ** np.arange(n - 1, -1, -1, dtype=np.int64)  # Key of a relabeled row
+        self.bit_lengths = np.array([int(mask).bit_length() for mask in range(1 << n)], dtype=np.int8)
+
+        # Permutations reaching the minimum, for each mask: best_perms[best_start[m]:best_start[m + 1]]
+        best = self.perm_masks == self.min_masks[None, :]
+        mask_index, perm_index = np.nonzero(best.T)
+        self.best_perms = perm_index
+        self.best_start = np.concatenate([[0], np.cumsum(best.sum(axis=0))])
+
+_line_tables = {}
+
+def line_tables(box_size):
+    # Tables of a box size, built on first use
+    if box_size not in _line_tables:
+        if box_size > 3:
+            raise ValueError(f"Invalid grid: canonical forms are only computed up to 9x9 boards, not {box_size ** 2}x{box_size ** 2}.")
+        _line_tables[box_size] = LineTables(box_size)
+    return _line_tables[box_size]
+
+def _grid_stack(grids):
+    # Return grids as a (N, n, n) uint8 stack and its box size, raise a ValueError if it is not a stack of k^2 x k^2 grids
+    grids = np.asarray(grids)
+    if grids.ndim != 3 or grids.shape[1] != grids.shape[2]:
+        raise ValueError("Invalid grids: It should be a (N, n, n) stack of grids.")
+    box_size = math.isqrt(grids.shape[1])
+    if box_size < 2 or box_size * box_size != grids.shape[1]:
+        raise ValueError(f"Invalid grids: Their size should be k^2 x k^2, not {grids.shape[1]}x{grids.shape[1]}.")
+    if grids.size and (grids.min() < 0 or grids.max() > grids.shape[1]):
+        raise ValueError(f"Invalid grids: The numbers should be between 0 and {grids.shape[1]}.")
+    grids = grids.astype(np.uint8)
+    for lines in (grids, grids.transpose(0, 2, 1)):
+        ordered = np.sort(lines, axis=2)
+        if ((ordered[:, :, 1:] == ordered[:, :, :-1]) & (ordered[:, :, 1:] != 0)).any():
+            raise ValueError("Invalid grids: A number appears twice in a row or a column.")
+    return grids, box_size
+
+def _add_rows(oriented, state, candidates, new_rows, tables):
+    # Append the row new_rows[i] (an original row) to the partial transformation candidates[i].
+    # Returns the new state and the key of the appended row after relabeling (smaller is better)
+    pid, orientation, perm, rows, used, labels, next_label = (array[candidates] for array in state)
+    step = (rows >= 0).sum(axis=1)
+    rows[np.arange(len(candidates)), step] = new_rows
+    used |= (1 << new_rows).astype(used.dtype)
+
+    values = oriented[orientation, new_rows]  # (C, n) original row
+    values = np.take_along_axis(values, tables.perms[perm], axis=1)  # Columns in the order of the permutation
+
+    # Relabel the numbers in order of first appearance, continuing the labels of the previous rows
+    # (the numbers of a row are distinct, so the new ones are numbered by their rank in the row)
+    everyone = np.arange(len(candidates))[:, None]
+    row_labels = labels[everyone, values]
+    new = (row_labels == 0) & (values != 0)
+    rank = np.cumsum(new, axis=1, dtype=np.int16)
+    row_labels = np.where(new, next_label[:, None] + rank - 1, row_labels).astype(np.uint8)
+    labels[np.nonzero(new)[0], values[new]] = row_labels[new]
+    next_label += rank[:, -1]
+
+    key = row_labels @ tables.powers
+    return (pid, orientation, perm, rows, used, labels, next_label), key
+
+def _keep_best(state, key, n_puzzles):
+    # Keep the partial transformations with the smallest key of their puzzle
+    pid = state[0]
+    best = np.full(n_puzzles, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(best, pid, key)
+    keep = key == best[pid]
+    return tuple(array[keep] for array in state)
+
+def _canonicalize_batch(grids, tables):
+    n, k = tables.size, tables.box_size
+    n_puzzles = len(grids)
+    oriented = np.stack([grids, grids.transpose(0, 2, 1)], axis=1).reshape(2 * n_puzzles, n, n)
+
+    # First row: the lines (rows of either orientation) whose best permuted mask is the smallest of their puzzle
+    masks = ((oriented != 0).astype(np.int64) << np.arange(n)).sum(axis=2)  # (2N, n), bit c for column c
+    line_keys = tables.min_masks[masks].reshape(n_puzzles, 2 * n)
+    lines = np.nonzero(line_keys == line_keys.min(axis=1, keepdims=True))
+    line_orientation = 2 * lines[0] + lines[1] // n
+    line_rows = lines[1] % n
+    line_masks = masks[line_orientation, line_rows]
+
+    # One partial transformation per best line and permutation of the columns
+    starts, stops = tables.best_start[line_masks], tables.best_start[line_masks + 1]
+    counts = stops - starts
+    if counts.sum() > MAX_CANDIDATES and n_puzzles > 1:
+        half = n_puzzles // 2
+        first, second = _canonicalize_batch(grids[:half], tables), _canonicalize_batch(grids[half:], tables)
+        return np.concatenate([first[0], second[0]]), tuple(np.concatenate(pair) for pair in zip(first[1], second[1]))
+    line_index = np.repeat(np.arange(len(line_masks)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    c = len(line_index)
+    state = (
+        lines[0][line_index],  # Puzzle
+        line_orientation[line_index],  # Index in oriented
+        tables.best_perms[starts[line_index] + offsets],  # Column permutation
+        np.full((c, n), -1, dtype=np.int8),  # Original rows chosen so far
+        np.zeros(c, dtype=np.int16),  # Bit mask of the chosen rows
+        np.zeros((c, n + 1), dtype=np.uint8),  # Label of each number, 0 if not seen yet
+        np.ones(c, dtype=np.int16),  # Next label
+    )
+    state, key = _add_rows(oriented, state, np.arange(c), line_rows[line_index], tables)
+
+    # Next rows: any row of an unused band at the start of a band, else an unused row of the current band
+    all_rows = np.arange(n)
+    for step in range(1, n):
+        rows, used = state[3], state[4]
+        free = (used[:, None] >> all_rows[None, :]) & 1 == 0
+        if step % k == 0:
+            used_bands = np.zeros((len(used), k), dtype=bool)
+            for band in range(k):
+                used_bands[:, band] = (used >> (k * band)) & 1 != 0
+            allowed = free & ~used_bands[:, all_rows // k]
+        else:
+            allowed = free & (all_rows[None, :] // k == rows[:, step - 1, None] // k)
+        candidates, new_rows = np.nonzero(allowed)
+        
+        # A row with more leading empty cells is smaller whatever its numbers: keep the most leading empty cells first
+        lead = tables.bit_lengths[tables.perm_masks[state[2][candidates], masks[state[1][candidates], new_rows]]]
+        best = np.full(n_puzzles, n + 1, dtype=np.int8)
+        np.minimum.at(best, state[0][candidates], lead)
+        keep = lead == best[state[0][candidates]]
+        candidates, new_rows = candidates[keep], new_rows[keep]
+        
+        state, key = _add_rows(oriented, state, candidates, new_rows, tables)
+        state = _keep_best(state, key, n_puzzles)
+
+    # One transformation per puzzle (several only for symmetrical puzzles, they give the same grid)
+    pid, orientation, perm, rows, _, labels, next_label = state
+    _, first = np.unique(pid, return_index=True)
+    orientation, perm, rows, labels, next_label = orientation[first], perm[first], rows[first], labels[first], next_label[first]
+
+    # Numbers absent from the puzzle get the remaining labels in increasing order, so the relabeling is a bijection
+    for num in range(1, n + 1):
+        missing = labels[:, num] == 0
+        labels[missing, num] = next_label[missing]
+        next_label += missing
+
+    transposed = orientation % 2 == 1
+    cols = tables.perms[perm]
+    everyone = np.arange(n_puzzles)[:, None, None]
+    canonical = labels[everyone, oriented[orientation][everyone, rows[:, :, None], cols[:, None, :]]]
+    return canonical.astype(np.uint8), (transposed, rows, cols, labels.astype(np.uint8))
+
+def canonicalize(grids):
+    """
+    Return the canonical forms of a (N, 9, 9) stack of puzzles (or of (N, 4, 4) grids) as a uint8 stack,
+    and the transformations as (transposed (N,), rows (N, n), cols (N, n), relabel (N, n + 1)):
+    canonical[i] = relabel[i][oriented[rows[i]][:, cols[i]]] with oriented = grids[i].T if transposed[i] else grids[i].
+    Two puzzles have the same canonical form if and only if one is a transformation of the other.
+    """
+    grids, box_size = _grid_stack(grids)
+    tables = line_tables(box_size)
+    n, size = len(grids), tables.size
+    canonical = np.empty((n, size, size), dtype=np.uint8)
+    transposed = np.empty(n, dtype=bool)
+    rows, cols = np.empty((n, size), dtype=np.intp), np.empty((n, size), dtype=np.intp)
+    relabel = np.empty((n, size + 1), dtype=np.uint8)
+    for start in range(0, n, BATCH_SIZE):
+        stop = min(start + BATCH_SIZE, n)
+        canonical[start:stop], transforms = _canonicalize_batch(grids[start:stop], tables)
+        transposed[start:stop], rows[start:stop], cols[start:stop], relabel[start:stop] = transforms
+    return canonical, (transposed, rows, cols, relabel)
+
+def canonical_form(grid):
+    """
+    Return the canonical form of a puzzle (or solution grid) and the transformation (transposed, rows, cols, relabel)
+    that maps the grid to it (see canonicalize and apply_transform).
+    """
+    canonical, (transposed, rows, cols, relabel) = canonicalize(np.asarray(grid)[None])
+    return canonical[0], (bool(transposed[0]), rows[0], cols[0], relabel[0])
+
+def apply_transform(grid, transform):
+    """
+    Apply a transformation returned by canonical_form to a grid: the puzzle gives its canonical form,
+    and its solution gives the solution of the canonical form.
+    """
+    transposed, rows, cols, relabel = transform
+    grid = np.asarray(grid)
+    oriented = grid.T if transposed else grid
+    return relabel[oriented[np.ix_(rows, cols)]]
+
+def invert_transform(grid, transform):
+    """
+    Apply the inverse of a transformation: map a grid of the canonical side (for example the solution
+    of the canonical form) back to the original puzzle.
+    """
+    transposed, rows, cols, relabel = transform
+    grid = np.asarray(grid)
+    unlabel = np.zeros_like(relabel)
+    unlabel[relabel] = np.arange(len(relabel), dtype=relabel.dtype)
+    oriented = np.empty_like(grid)
+    oriented[np.ix_(rows, cols)] = grid
+    oriented = unlabel[oriented]
+    return oriented.T if transposed else oriented
+
+def pack_keys(canonical):
+    """
+    Pack (N, n, n) canonical forms into (N, ceil(n * n / 2)) uint8 keys, two cells per byte.
+    """
+    cells = np.asarray(canonical, dtype=np.uint8).reshape(len(canonical), -1)
+    if cells.shape[1] % 2:
+        cells = np.concatenate([cells, np.zeros((len(cells), 1), dtype=np.uint8)], axis=1)
+    return (cells[:, 0::2] << 4) | cells[:, 1::2]
+
+def canonical_keys(grids):
+    """
+    Return the canonical key (bytes) of each puzzle of a (N, n, n) stack: equivalent puzzles have the same key.
+    """
+    return [key.tobytes() for key in pack_keys(canonicalize(grids)[0])]
+
+# File layout of a DedupIndex: header (magic, version, key size), then one fixed-size key per record, appended
+MAGIC = b"SUDOKUDX"
+VERSION = 1
+HEADER_FORMAT = "<8sHI"
+
+class DedupIndex:
+    """
+    Persistent set of canonical keys, to detect puzzles equivalent to an already seen puzzle in O(1).
+    The keys are kept in a Python set and appended to the file as they are added, so an interrupted run keeps
+    everything it added. The file is created on first use.
+    """
+    def __init__(self, path, size=9):
+        self.path = path
+        self.key_size = (size * size + 1) // 2
+        self.header_size = struct.calcsize(HEADER_FORMAT)
+        self.keys = set()
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                magic, version, key_size = struct.unpack(HEADER_FORMAT, f.read(self.header_size))
+                if magic != MAGIC:
+                    raise ValueError(f"Invalid dedup index: {path}")
+                if version != VERSION:
+                    raise ValueError(f"Unsupported dedup index version: {version}")
+                if key_size != self.key_size:
+                    raise ValueError(f"Invalid dedup index: keys of {key_size} bytes, expected {self.key_size}")
+                content = f.read()
+            # Ignore a last key cut by an interruption
+            n = len(content) // key_size
+            self.keys = {content[i * key_size:(i + 1) * key_size] for i in range(n)}
+            if n * key_size != len(content):
+                with open(path, "rb+") as f:
+                    f.truncate(self.header_size + n * key_size)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, self.key_size))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, grid):
+        return canonical_keys(np.asarray(grid)[None])[0] in self.keys
+
+    def add_many(self, grids):
+        """
+        Add the puzzles of a (N, n, n) stack and return a boolean array, True for the puzzles that were new
+        (not equivalent to a puzzle of the index nor to a previous puzzle of the stack).
+        """
+        new = np.zeros(len(grids), dtype=bool)
+        added = []
+        for i, key in enumerate(canonical_keys(grids) if len(grids) else []):
+            if len(key) != self.key_size:
+                raise ValueError(f"Invalid grids: keys of {len(key)} bytes, the index has keys of {self.key_size} bytes.")
+            if key not in self.keys:
+                self.keys.add(key)
+                added.append(key)
+                new[i] = True
+        if added:
+            with open(self.path, "ab") as f:
+                f.write(b"".join(added))
+        return new
+
+    def add(self, grid):
+        """
+        Add a puzzle, return True if it was new.
+        """
+        return bool(self.add_many(np.asarray(grid)[None])[0])
@@ -5,44 +5,69 @@ import os
 # Add the root directory to the path in order to import the modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 
-from src.solver.sudoku_solvers import lp_solver
+from src.solver.sudoku_solvers import propagating_solver, PropagatingBoard
+from src.generator.solution_factory import generate_solutions
 
 difficulty_levels = {"easy": 1, "medium": 2, "hard": 3, "expert": 4}
 
+# Maximum number of search nodes for one uniqueness check of the incremental generation on 9x9 boards.
+# On the other sizes it is scaled by (81 / number of cells)^2: a node costs more and there are more checks.
+DIG_MAX_NODES = 2000
+
+# Maximum number of random removals tried by mode="random" before giving up
+MAX_RANDOM_ATTEMPTS = 200
+
 # Function to generate a Sudoku grid
-def generate_grid(difficulty="medium"):
-    # Create a 9x9 grid of zeros
-    grid = np.zeros((9, 9), dtype=int)
-    
-    # First, fill the diagonal 3x3 grids
-    grid = fill_diagonal_grids(grid)
-    
-    # Then, fill the rest of the grid
-    fill_remaining_grids(grid)
+def generate_grid(difficulty="medium", mode="incremental", box_size=3):
+    """
+    Generate a solution grid and a puzzle of the given difficulty.
+    mode="incremental" removes the clues one at a time and keeps the puzzle unique (see dig_holes).
+    mode="random" removes a random set of cells and starts again until the puzzle has a unique solution,
+    and raises a RuntimeError after MAX_RANDOM_ATTEMPTS removals (usually the case at the expert level).
+    With box_size k, the grids are k^2 x k^2 (4x4, 16x16, 25x25...). On the other sizes than 9x9, the solution is
+    a random transformation of a pattern grid (see solution_factory): the backtracking fill is too slow above 9x9,
+    and the independent diagonal boxes of a 4x4 grid cannot always be completed.
+    """
+    size = box_size * box_size
+    if box_size != 3:
+        rng = np.random.default_rng(np.random.randint(2**31))
+        grid = generate_solutions(1, rng=rng, box_size=box_size)[0].astype(int)
+    else:
+        # Create a grid of zeros
+        grid = np.zeros((size, size), dtype=int)
+        
+        # First, fill the diagonal boxes
+        grid = fill_diagonal_grids(grid)
+        
+        # Then, fill the rest of the grid
+        fill_remaining_grids(grid)
     
     # Save the grid as the solution before removing numbers
     # save_grid(grid, difficulty, True)
     solution_grid = np.copy(grid)
     
-    # Remove numbers from the grid to create the puzzle
-    remove_numbers(grid, difficulty)
+    if mode == "incremental":
+        return solution_grid, dig_holes(solution_grid, difficulty)
+    if mode != "random":
+        raise ValueError(f"Invalid mode: {mode}")
     
-    # Testing the number of solutions
-    nb_solutions = lp_solver(grid)
-    while nb_solutions != 1:
+    # Remove numbers from the grid until the puzzle has a unique solution
+    for _ in range(MAX_RANDOM_ATTEMPTS):
         grid = np.copy(solution_grid)
         remove_numbers(grid, difficulty)
-        nb_solutions = lp_solver(grid)
-    
-    return solution_grid, grid
+        if propagating_solver(grid) == 1:
+            return solution_grid, grid
+    raise RuntimeError(f"No unique {difficulty} puzzle after {MAX_RANDOM_ATTEMPTS} random removals, use mode=\"incremental\"")
 
-# Function to fill the diagonal 3x3 grids with random permutations of 1-9
+# Function to fill the diagonal kxk boxes with random permutations of 1-n
 def fill_diagonal_grids(grid):
-    for i in range(3):
-        # Generate a random permutation of 1-9
-        permutation = np.random.permutation(9) + 1
-        # Fill the diagonal grid with the permutation
-        grid[i*3:i*3+3, i*3:i*3+3] = permutation.reshape((3, 3))
+    size = len(grid)
+    k = int(np.sqrt(size))
+    for i in range(k):
+        # Generate a random permutation of 1-n
+        permutation = np.random.permutation(size) + 1
+        # Fill the diagonal box with the permutation
+        grid[i*k:i*k+k, i*k:i*k+k] = permutation.reshape((k, k))
         
     return grid
 
@@ -54,10 +79,10 @@ def fill_remaining_grids(grid):
     
     row, col = empty_cell
 
-    # Define a permutation of 1-9
-    permutation = np.random.permutation(9) + 1
+    # Define a permutation of 1-n
+    permutation = np.random.permutation(len(grid)) + 1
     
-    for num in permutation:  # Try numbers from 1 to 9
+    for num in permutation:  # Try numbers from 1 to n
         if check_cell(grid, row, col, num):  # Check if the number can be placed
             grid[row][col] = num  # Place the number
             
@@ -70,8 +95,8 @@ def fill_remaining_grids(grid):
 
 # Function to find an empty cell in the grid
 def find_empty_cell(grid):
-    for i in range(9):
-        for j in range(9):
+    for i in range(len(grid)):
+        for j in range(len(grid)):
             if grid[i][j] == 0:
                 return i, j
     return None  # No empty cell found
@@ -86,10 +111,11 @@ def check_cell(grid, row, col, num):
     if num in grid[:, col]:
         return False
     
-    # Verify the 3x3 grid
-    start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-    for i in range(start_row, start_row + 3):
-        for j in range(start_col, start_col + 3):
+    # Verify the kxk box
+    k = int(np.sqrt(len(grid)))
+    start_row, start_col = k * (row // k), k * (col // k)
+    for i in range(start_row, start_row + k):
+        for j in range(start_col, start_col + k):
             if grid[i][j] == num:
                 return False
 
@@ -97,8 +123,8 @@ def check_cell(grid, row, col, num):
 
 # Function to check if the grid is valid
 def check_grid(grid):
-    for i in range(9):
-        for j in range(9):
+    for i in range(len(grid)):
+        for j in range(len(grid)):
             num = grid[i][j]
             if num == 0:
                 return False
@@ -112,15 +138,14 @@ def save_grid(grid, difficulty, solution=False):
     folder_path = os.path.join(os.path.dirname(__file__), "../../data/grids/")
     os.makedirs(folder_path, exist_ok=True)  # Create the folder if it doesn't exist
     
-    # Count the number of existing files with the same difficulty
-    existing_files = [f for f in os.listdir(folder_path) if f.startswith(f"solution_{difficulty}")]
+    # Count the number of existing files of the same kind with the same difficulty,
+    # so that a puzzle and its solution get the same number
+    prefix = f"solution_{difficulty}_" if solution else f"grid_{difficulty}_"
+    existing_files = [f for f in os.listdir(folder_path) if f.startswith(prefix)]
     grid_number = len(existing_files) + 1  # Numéro de la grille
 
     # Name of the file
-    if solution:
-        file_name = f"solution_{difficulty}_{grid_number}.txt"
-    else:
-        file_name = f"grid_{difficulty}_{grid_number}.txt"
+    file_name = f"{prefix}{grid_number}.txt"
     file_path = os.path.join(folder_path, file_name)
 
     # Save the grid in the file
@@ -130,22 +155,30 @@ def save_grid(grid, difficulty, solution=False):
     
     print(f"Grid saved under the name : {file_path}")
     
+# Function to draw the number of cells to remove
+def draw_n_cells(difficulty, size=9):
+    n_cells = min(np.random.randint(9, 12) * (difficulty_levels[difficulty] + 2), 64) # Example for difficulty = 'medium' :
+                                                                                      # n_cells ~= min(10*(2+2), 64) = 40
+    # Same share of the cells on the other board sizes
+    return round(n_cells * size * size / 81)
+
 # Function to remove numbers from the grid to create the puzzle
 def remove_numbers(grid, difficulty):
+    size = len(grid)
+    
     # Determine how many cells to remove
-    n_cells = min(np.random.randint(9, 12) * (difficulty_levels[difficulty] + 2), 64) # Example for difficulty = 'medium' :
-                                                                                      # n_cells ~= min(10*(2+2), 64) = 40
+    n_cells = draw_n_cells(difficulty, size)
                                                                                       
     # Generate a distribution of numbers
-    target_distribution = generate_distribution(difficulty, n_cells)
+    target_distribution = generate_distribution(difficulty, n_cells, size)
     current_counts = np.sum(grid != 0, axis=0).tolist()  # Count of current numbers
     
     # Shuffle the cells to remove them randomly
-    permutation = np.random.permutation(81)
+    permutation = np.random.permutation(size * size)
     
     i = 0
-    while n_cells > 0 and i < 81:
-        row, col = permutation[i] // 9, permutation[i] % 9
+    while n_cells > 0 and i < size * size:
+        row, col = permutation[i] // size, permutation[i] % size
         num = grid[row][col]
         
         # Check if we can remove this cell while respecting the distribution
@@ -156,8 +189,61 @@ def remove_numbers(grid, difficulty):
             
         i += 1
       
+# Function to remove the clues one at a time while the puzzle keeps a unique solution
+def dig_holes(solution_grid, difficulty, max_nodes=None):
+    """
+    Remove clues from the solution grid one at a time, in random order, and put back any clue whose removal
+    breaks uniqueness. The current puzzle is always unique with solution_grid as its solution, so removing
+    the number num from a cell keeps it unique if and only if no solution has another number in that cell:
+    each check is a single search for a solution with num excluded from the cell.
+    Each cell is tried at most once and each check is capped at max_nodes search nodes (a check that reaches
+    the cap keeps the clue), so the work per puzzle is bounded.
+    One board is kept for the whole dig: a check unassigns the clue and excludes its number on the trail,
+    and is undone afterwards, down to the removal itself when the removal is kept.
+    """
+    grid = np.copy(solution_grid)
+    size = len(grid)
+    if max_nodes is None:
+        max_nodes = DIG_MAX_NODES * 81 ** 2 // size ** 4
+    
+    # Determine how many cells to remove, as in remove_numbers
+    n_cells = draw_n_cells(difficulty, size)
+    
+    # Target number of clues for each number
+    target_distribution = generate_distribution(difficulty, n_cells, size)
+    current_counts = np.bincount(grid.ravel(), minlength=size + 1)[1:]
+    
+    board = PropagatingBoard(grid)
+    
+    # First pass following the target distribution, second pass on the cells skipped because of it
+    skipped = []
+    for pass_cells in (np.random.permutation(size * size), skipped):
+        for idx in pass_cells:
+            if n_cells == 0:
+                return grid
+            row, col = idx // size, idx % size
+            num = grid[row][col]
+            
+            if pass_cells is not skipped and current_counts[num - 1] <= target_distribution[num - 1]:
+                skipped.append(idx)
+                continue
+            
+            # Look for a solution with another number in the cell
+            mark = len(board.trail)
+            board.unassign(idx)
+            removal_mark = len(board.trail)
+            if board.eliminate([idx], 1 << (num - 1)) and board.count(limit=1, max_nodes=max_nodes) != 0:
+                board.undo(mark)  # Not unique anymore (or not proven unique), put the clue back
+            else:
+                board.undo(removal_mark)
+                grid[row][col] = 0
+                current_counts[num - 1] -= 1
+                n_cells -= 1
+    
+    return grid
+    
 # Function to generate a distribution of numbers to remove  
-def generate_distribution(difficulty, n_cells):
+def generate_distribution(difficulty, n_cells, size=9):
     # Define means and standard deviations for each difficulty
     difficulty_params = {
         "easy": {"mean": 9, "std": 1},    # High mean, tight distribution
@@ -168,26 +254,27 @@ def generate_distribution(difficulty, n_cells):
     
     params = difficulty_params[difficulty]
     
-    # Generate a normal distribution for 9 numbers
-    raw_distribution = np.random.normal(loc=params["mean"], scale=params["std"], size=9)
+    # Generate a normal distribution for the numbers (parameters given for 9 numbers, scaled to the size)
+    scale = size / 9
+    raw_distribution = np.random.normal(loc=scale * params["mean"], scale=scale * params["std"], size=size)
     
     # Convert to integers and adjust to stay within realistic bounds
-    distribution = np.clip(np.round(raw_distribution), 1, 9).astype(int)
+    distribution = np.clip(np.round(raw_distribution), 1, size).astype(int)
     
     # Calculate the total number of cells to retain
-    n_retained_cells = 81 - n_cells
+    n_retained_cells = size * size - n_cells
     
     # Adjust the distribution to match the total retained cells
     while sum(distribution) > n_retained_cells:  # Too many numbers
-        for i in range(9):
+        for i in range(size):
             if distribution[i] > 1:  # Reduce larger numbers first
                 distribution[i] -= 1
                 if sum(distribution) == n_retained_cells:
                     break
     
     while sum(distribution) < n_retained_cells:  # Too few numbers
-        for i in range(9):
-            if distribution[i] < 9:  # Increase smaller numbers first
+        for i in range(size):
+            if distribution[i] < size:  # Increase smaller numbers first
                 distribution[i] += 1
                 if sum(distribution) == n_retained_cells:
                     break
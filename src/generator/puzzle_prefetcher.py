@@ -0,0 +1,96 @@
+import numpy as np
+import sys
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.generator.grid_generator import difficulty_levels
+from src.generator.bulk_generator import generate_task
+
+# Number of generations failing in a row after which a difficulty is no longer generated
+MAX_FAILURES = 3
+
+class PuzzlePrefetcher:
+    """
+    Keep a small queue of ready puzzles for each difficulty, generated in the background on a process pool.
+    get() pops a puzzle instantly and orders a replacement, so a queue never holds (or waits for)
+    more than queue_size puzzles. It returns None when the queue is empty and block is False.
+    A failed generation is retried, and after MAX_FAILURES failures in a row the difficulty is given up:
+    get() raises a RuntimeError from the last exception once its queue is empty.
+    """
+    def __init__(self, difficulties=tuple(difficulty_levels), queue_size=2, workers=1, mode="incremental", seed=None):
+        for difficulty in difficulties:
+            if difficulty not in difficulty_levels:
+                raise ValueError(f"Invalid difficulty: {difficulty}")
+        self.queue_size = queue_size
+        self.mode = mode
+        self.seed = int(np.random.SeedSequence(seed).generate_state(1)[0])
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.ready = {difficulty: deque() for difficulty in difficulties}  # (solution_grid, grid)
+        self.pending = {difficulty: 0 for difficulty in difficulties}  # Puzzles being generated
+        self.next_index = {difficulty: 0 for difficulty in difficulties}
+        self.failures = {difficulty: 0 for difficulty in difficulties}  # Failed generations in a row
+        self.errors = {difficulty: None for difficulty in difficulties}  # Last exception
+        self.condition = threading.Condition()
+        self.closed = False
+
+        with self.condition:
+            for difficulty in difficulties:
+                self._refill(difficulty)
+
+    def _refill(self, difficulty):
+        # Order puzzles until ready + pending reaches queue_size (called with the lock held)
+        while (not self.closed and self.failures[difficulty] < MAX_FAILURES
+               and len(self.ready[difficulty]) + self.pending[difficulty] < self.queue_size):
+            index = self.next_index[difficulty]
+            self.next_index[difficulty] += 1
+            self.pending[difficulty] += 1
+            future = self.executor.submit(generate_task, difficulty, index, self.seed, self.mode)
+            future.add_done_callback(lambda future, difficulty=difficulty: self._on_done(difficulty, future))
+
+    def _on_done(self, difficulty, future):
+        # Called in a thread of the executor when a puzzle is generated
+        with self.condition:
+            self.pending[difficulty] -= 1
+            if future.cancelled():
+                return
+            if future.exception() is None:
+                _, _, grid, solution_grid = future.result()
+                self.ready[difficulty].append((solution_grid, grid))
+                self.failures[difficulty] = 0
+            else:
+                self.errors[difficulty] = future.exception()
+                self.failures[difficulty] += 1
+                self._refill(difficulty)  # Retry, until MAX_FAILURES failures in a row
+            self.condition.notify_all()
+
+    def available(self, difficulty):
+        with self.condition:
+            return len(self.ready[difficulty])
+
+    def get(self, difficulty, block=False, timeout=None):
+        """
+        Return a puzzle (solution_grid, grid) of the difficulty, or None if none is ready
+        (after waiting up to timeout seconds if block is True).
+        """
+        with self.condition:
+            if block:
+                self.condition.wait_for(lambda: self.ready[difficulty] or self._failed(difficulty) or self.closed, timeout)
+            if not self.ready[difficulty] and self._failed(difficulty):
+                raise RuntimeError(f"Puzzle generation failed for difficulty {difficulty}") from self.errors[difficulty]
+            puzzle = self.ready[difficulty].popleft() if self.ready[difficulty] else None
+            self._refill(difficulty)
+            return puzzle
+
+    def _failed(self, difficulty):
+        return self.failures[difficulty] >= MAX_FAILURES and self.pending[difficulty] == 0
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
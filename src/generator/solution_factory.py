@@ -0,0 +1,82 @@
+import numpy as np
+import math
+import os
+
+# Folder of the saved solution grids used as seeds
+GRIDS_FOLDER = os.path.join(os.path.dirname(__file__), "../../data/grids/")
+
+# Number of grids transformed at once, to bound the size of the temporary arrays
+CHUNK_SIZE = 1 << 18
+
+# Function to load the saved solution grids
+def load_seed_grids(folder_path=GRIDS_FOLDER):
+    """
+    Load the solution_*.txt grids of the folder as a (S, 9, 9) uint8 array.
+    """
+    file_names = sorted(f for f in os.listdir(folder_path) if f.startswith("solution_") and f.endswith(".txt"))
+    if not file_names:
+        raise ValueError(f"No solution grid found in {folder_path}")
+    return np.stack([np.loadtxt(os.path.join(folder_path, f), dtype=np.uint8).reshape(9, 9) for f in file_names])
+
+# Function to build a valid solution grid of size k^2 x k^2 from the shifted-rows pattern
+def base_solution(box_size):
+    """
+    Return the (k^2, k^2) uint8 grid whose row r is 1..k^2 shifted by k * (r % k) + r // k.
+    Random solutions of a size without seed grids are transformations of this grid (see generate_solutions).
+    """
+    size = box_size * box_size
+    rows, cols = np.arange(size)[:, None], np.arange(size)[None, :]
+    return ((box_size * (rows % box_size) + rows // box_size + cols) % size + 1).astype(np.uint8)
+
+# Function to draw a random permutation of the k^2 lines: bands (or stacks) shuffled, then lines within each band
+def _random_line_permutations(rng, n, box_size=3):
+    band_order = np.argsort(rng.random((n, box_size)), axis=1)
+    line_order = np.argsort(rng.random((n, box_size, box_size)), axis=2)
+    return (box_size * band_order[:, :, None] + line_order).reshape(n, box_size * box_size)
+
+def transform_grids(grids, rng=None):
+    """
+    Apply a random validity-preserving transformation to each grid of a (N, 9, 9) stack (or (N, k^2, k^2)):
+    digit relabeling, row swaps within a band, column swaps within a stack, band and stack swaps, and transposition.
+    Empty cells (0) stay empty, so puzzles can be transformed as well. Returns a new uint8 array.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    grids = np.asarray(grids, dtype=np.uint8)
+    n, size = grids.shape[0], grids.shape[1]
+    box_size = math.isqrt(size)
+    rows = np.arange(n)[:, None]
+
+    # Digit relabeling: relabel[n, num] is the new number, 0 is kept
+    relabel = np.zeros((n, size + 1), dtype=np.uint8)
+    relabel[:, 1:] = np.argsort(rng.random((n, size)), axis=1) + 1
+    result = relabel[rows, grids.reshape(n, size * size).astype(np.intp)].reshape(n, size, size)
+
+    # Rows and columns permutations
+    result = result[rows, _random_line_permutations(rng, n, box_size)]
+    result = result[rows[:, :, None], np.arange(size)[None, :, None], _random_line_permutations(rng, n, box_size)[:, None, :]]
+
+    # Transposition of half of the grids
+    transpose = rng.random(n) < 0.5
+    result[transpose] = result[transpose].transpose(0, 2, 1)
+
+    return result
+
+def generate_solutions(n, seed_grids=None, rng=None, box_size=3):
+    """
+    Generate n valid solution grids as a (n, 9, 9) uint8 array, by applying random transformations
+    (see transform_grids) to grids drawn from seed_grids (by default, the saved solution grids).
+    For another box_size without seed grids, the seed is base_solution(box_size) and the grids are (n, k^2, k^2).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if seed_grids is None:
+        seed_grids = load_seed_grids() if box_size == 3 else base_solution(box_size)[None]
+    seed_grids = np.asarray(seed_grids, dtype=np.uint8)
+    size = seed_grids.shape[1]
+
+    solutions = np.empty((n, size, size), dtype=np.uint8)
+    for start in range(0, n, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n)
+        seeds = seed_grids[rng.integers(len(seed_grids), size=stop - start)]
+        solutions[start:stop] = transform_grids(seeds, rng)
+
+    return solutions
@@ -7,13 +7,15 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"
 import pygame
 import numpy as np
 
-from src.generator.grid_generator import generate_grid
-from src.solver.sudoku_solvers import check_grid, place_hint
+from src.generator.puzzle_prefetcher import PuzzlePrefetcher
+from src.solver.sudoku_solvers import place_hint
 from src.utils.utils import reset_grid, is_initial_cell
+from src.utils.reward_utils import ConflictTracker
 
 # Display configuration
 WINDOW_SIZE = 540 # window of 540x540 pixels (9x9 grid)
 GRID_SIZE = 9
+BOX_SIZE = int(GRID_SIZE ** 0.5)
 CELL_SIZE = WINDOW_SIZE // GRID_SIZE
 BUTTON_WIDTH = (WINDOW_SIZE-5*20)//4 # 4 buttons with 20px between them
 BUTTON_HEIGHT = 40
@@ -24,16 +26,27 @@ WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GREY = (200, 200, 200)
 HIGHLIGHT_COLOR = (150, 150, 150)
+ERROR_COLOR = (250, 180, 180)
+HINT_COLOR = (180, 250, 180)
+SELECTED_COLOR = (180, 180, 250)
 
-# Pygame initialization
-pygame.init()
-window = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE+3*BUTTON_GAP+3*BUTTON_HEIGHT))
-pygame.display.set_caption("Sudoku")
+# Frame rate limit, and polling interval of the puzzle queue while a puzzle is loading (ms)
+FPS = 60
+LOADING_POLL_MS = 50
 
-# Initial grid example (remplace with your own grid)
-solution_grid, grid = generate_grid()
+# Window, opened by main (importing the module does not start pygame)
+window = None
+
+# Empty grid until the first puzzle is ready (generated in the background, see main)
+solution_grid, grid = None, np.zeros((GRID_SIZE, GRID_SIZE), dtype=int)
 initial_grid = np.copy(grid)
 
+# Difficulty of the puzzle being waited for, None once it is displayed
+loading = "medium"
+
+# Conflicting cells, updated on every edit
+conflicts = ConflictTracker(grid)
+
 # Buttons
 generate_button = pygame.Rect(BUTTON_GAP, WINDOW_SIZE + BUTTON_GAP, BUTTON_WIDTH, BUTTON_HEIGHT)
 check_button = pygame.Rect(2*BUTTON_GAP+BUTTON_WIDTH, WINDOW_SIZE + BUTTON_GAP, BUTTON_WIDTH, BUTTON_HEIGHT)
@@ -46,7 +59,7 @@ slider_rect = pygame.Rect(BUTTON_GAP, WINDOW_SIZE + 2 * BUTTON_GAP + BUTTON_HEIG
 # Selected cell
 selected_cell = None
 
-# List of non-correct cells
+# List of non-correct cells, updated live on every edit
 errors = []
 
 # List of hints
@@ -56,33 +69,58 @@ hints = []
 difficulty_levels = ["Easy", "Medium", "Hard", "Expert"]
 selected_difficulty_index = 1  # Default: Medium
 
-# Function to draw the grid
-def draw_grid(win, highlight_cell, selected_cell=None):
-    # Draw the Sudoku grid
-    win.fill(GREY)
-    
-    # Highlight the cell under the mouse
-    if (0 <= highlight_cell[0] < GRID_SIZE and 0 <= highlight_cell[1] < GRID_SIZE) and (highlight_cell != selected_cell):
-        pygame.draw.rect(win, HIGHLIGHT_COLOR, (highlight_cell[1] * CELL_SIZE, highlight_cell[0] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-        
-    # Highlight the cells with errors
-    for error in errors:
-        pygame.draw.rect(win, (250, 180, 180), (error[1] * CELL_SIZE, error[0] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-        
-    # Highlight the cells with hints
-    for hint in hints:
-        pygame.draw.rect(win, (180, 250, 180), (hint[1] * CELL_SIZE, hint[0] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-        
-    # Highlight the selected cell
-    if selected_cell is not None:
-        pygame.draw.rect(win, (180, 180, 250), (selected_cell[1] * CELL_SIZE, selected_cell[0] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-    
-    # Lines and columns
+# Fonts and rendered texts
+fonts = {}
+text_surfaces = {}
+
+# What is on the screen: (color, number) of each drawn cell, difficulty of the slider and loading message
+screen_cells = {}
+screen_state = {}
+
+# Function to render a text once, the surfaces of the digits and labels are reused on every frame
+def render_text(text, size, background=None):
+    key = (text, size, background)
+    if key not in text_surfaces:
+        if size not in fonts:
+            fonts[size] = pygame.font.Font(None, size)
+        text_surfaces[key] = fonts[size].render(text, True, BLACK, background)
+    return text_surfaces[key]
+
+# Function to get the background color of a cell
+def cell_color(cell, highlight_cell, selected_cell, error_cells, hint_cells):
+    if cell == selected_cell:
+        return SELECTED_COLOR
+    if cell in hint_cells:
+        return HINT_COLOR
+    if cell in error_cells:
+        return ERROR_COLOR
+    if cell == highlight_cell:
+        return HIGHLIGHT_COLOR
+    return GREY
+
+# Function to draw the grid lines that cross a rectangle
+def draw_lines(win, rect):
+    win.set_clip(rect)
     for i in range(GRID_SIZE + 1):
-        line_width = 3 if i % 3 == 0 else 1
+        line_width = 3 if i % BOX_SIZE == 0 else 1
         pygame.draw.line(win, BLACK, (0, i * CELL_SIZE), (WINDOW_SIZE, i * CELL_SIZE), line_width) # horizontal lines
         pygame.draw.line(win, BLACK, (i * CELL_SIZE, 0), (i * CELL_SIZE, WINDOW_SIZE), line_width) # vertical lines
-        
+    win.set_clip(None)
+
+# Function to draw a cell (background, number and borders), returns its rectangle
+def draw_cell(win, row, col, color, num):
+    rect = pygame.Rect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+    pygame.draw.rect(win, color, rect)
+    if num != 0:
+        win.blit(render_text(str(num), 40), (col * CELL_SIZE + (CELL_SIZE/2.5), row * CELL_SIZE + (CELL_SIZE/3)))
+    draw_lines(win, rect)
+    return rect
+
+# Function to draw the buttons and the slider, returns the rectangle of the panel
+def draw_panel(win, selected_index):
+    rect = pygame.Rect(0, WINDOW_SIZE, WINDOW_SIZE, win.get_height() - WINDOW_SIZE)
+    win.fill(GREY, rect)
+    
     # Draw buttons
     pygame.draw.rect(win, WHITE, generate_button)
     pygame.draw.rect(win, WHITE, check_button)
@@ -90,11 +128,14 @@ def draw_grid(win, highlight_cell, selected_cell=None):
     pygame.draw.rect(win, WHITE, hint_button)
 
     # Text for buttons
-    font = pygame.font.Font(None, 30)
-    win.blit(font.render("New", True, BLACK), (generate_button.x + 35, generate_button.y + 10))
-    win.blit(font.render("Verify", True, BLACK), (check_button.x + 25, check_button.y + 10))
-    win.blit(font.render("Reset", True, BLACK), (reset_button.x + 30, reset_button.y + 10))
-    win.blit(font.render("Help", True, BLACK), (hint_button.x + 35, hint_button.y + 10))
+    win.blit(render_text("New", 30), (generate_button.x + 35, generate_button.y + 10))
+    win.blit(render_text("Verify", 30), (check_button.x + 25, check_button.y + 10))
+    win.blit(render_text("Reset", 30), (reset_button.x + 30, reset_button.y + 10))
+    win.blit(render_text("Help", 30), (hint_button.x + 35, hint_button.y + 10))
+    
+    draw_slider(win, difficulty_levels, selected_index)
+    draw_lines(win, rect)  # Bottom border of the grid
+    return rect
 
 # Function to draw the slider
 def draw_slider(win, difficulty_levels, selected_index):
@@ -114,25 +155,53 @@ def draw_slider(win, difficulty_levels, selected_index):
     pygame.draw.circle(win, BLACK, (cursor_x, slider_rect.y + slider_rect.height // 2), 10)
     
     # Draw the text for the selected difficulty level
-    font = pygame.font.Font(None, 30)
-    difficulty_text = difficulty_levels[selected_index]
-    text_surface = font.render(difficulty_text, True, BLACK)
+    text_surface = render_text(difficulty_levels[selected_index], 30)
     win.blit(text_surface, (slider_rect.x + slider_rect.width // 2 - text_surface.get_width() // 2,
                             slider_rect.y + slider_rect.height + 5))
 
+# Function to draw the loading message over the grid, returns its rectangle
+def draw_loading(win):
+    text = render_text("Loading...", 40, WHITE)
+    return win.blit(text, (WINDOW_SIZE // 2 - text.get_width() // 2, WINDOW_SIZE // 2 - text.get_height() // 2))
 
-# Function to draw the numbers
-def draw_numbers(win, grid):
-    # Draw the numbers in the grid
-    font = pygame.font.Font(None, 40)
+# Function to redraw what changed since the last frame, returns the rectangles to update on the display
+def render(win, highlight_cell):
+    # Everything is redrawn on the first frame, after an expose event and when the loading message appears or goes
+    full = screen_state.get("loading", "") != loading
+    if full:
+        screen_cells.clear()
     
+    dirty = []
+    error_cells, hint_cells = set(errors), set(hints)
     for row in range(GRID_SIZE):
         for col in range(GRID_SIZE):
-            num = grid[row][col]
-            if num != 0:
-                text = font.render(str(num), True, BLACK)
-                win.blit(text, (col * CELL_SIZE + (CELL_SIZE/2.5), row * CELL_SIZE + (CELL_SIZE/3)))
-                
+            state = (cell_color((row, col), highlight_cell, selected_cell, error_cells, hint_cells), grid[row][col])
+            if screen_cells.get((row, col)) != state:
+                dirty.append(draw_cell(win, row, col, *state))
+                screen_cells[(row, col)] = state
+    
+    if full or screen_state.get("difficulty") != selected_difficulty_index:
+        dirty.append(draw_panel(win, selected_difficulty_index))
+    
+    if loading is not None and dirty:
+        dirty.append(draw_loading(win))
+    
+    screen_state["loading"] = loading
+    screen_state["difficulty"] = selected_difficulty_index
+    return dirty
+
+# Function to list the conflicting cells filled by the player
+def find_errors(conflicts, initial_grid):
+    return [cell for cell in conflicts.conflicting if not is_initial_cell(cell[0], cell[1], initial_grid)]
+
+# Function to initialize pygame and open the window
+def init_window():
+    global window
+    pygame.init()
+    window = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE+3*BUTTON_GAP+3*BUTTON_HEIGHT))
+    pygame.display.set_caption("Sudoku")
+    return window
+
 # Main loop
 def main():
     global selected_cell
@@ -142,27 +211,68 @@ def main():
     global initial_grid
     global solution_grid
     global selected_difficulty_index
+    global conflicts
+    global loading
+    
+    init_window()
     
+    # Puzzles are generated in the background, a new game only waits if the queue of its difficulty is empty
+    prefetcher = PuzzlePrefetcher(difficulties=[level.lower() for level in difficulty_levels], mode="incremental")
+    
+    clock = pygame.time.Clock()
     running = True
     while running:
-        for event in pygame.event.get():
+        # Display the awaited puzzle as soon as it is ready
+        if loading is not None:
+            try:
+                puzzle = prefetcher.get(loading)
+            except RuntimeError as error:
+                # Keep the current grid, the generation of this difficulty keeps failing
+                print(f"{error}: {error.__cause__!r}", file=sys.stderr)
+                puzzle, loading = None, None
+            if puzzle is not None:
+                solution_grid, grid = puzzle
+                initial_grid = np.copy(grid)
+                conflicts = ConflictTracker(grid)
+                errors = []
+                hints = []
+                selected_cell = None
+                loading = None
+        
+        # Redraw the cells and widgets that changed
+        mouse_pos = pygame.mouse.get_pos()
+        highlight_cell = (mouse_pos[1] // CELL_SIZE, mouse_pos[0] // CELL_SIZE)
+        dirty = render(window, highlight_cell)
+        if dirty:
+            pygame.display.update(dirty)
+        
+        # Sleep until the next event, or until the next poll of the puzzle queue while loading
+        events = [pygame.event.wait(LOADING_POLL_MS if loading is not None else 0)] + pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                screen_state.clear()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if generate_button.collidepoint(event.pos):
-                    difficulty = difficulty_levels[selected_difficulty_index].lower()
-                    solution_grid, grid = generate_grid(difficulty=difficulty)
-                    initial_grid = np.copy(grid)
-                    errors = []
-                    hints = []
+                    loading = difficulty_levels[selected_difficulty_index].lower()
+                elif loading is not None:
+                    # No action on the grid while waiting for a puzzle
+                    continue
                 elif check_button.collidepoint(event.pos):
-                    errors = check_grid(initial_grid, grid)
+                    errors = find_errors(conflicts, initial_grid)
                 elif reset_button.collidepoint(event.pos):
                     reset_grid(initial_grid, grid)
+                    conflicts = ConflictTracker(grid)
                     errors = []
                     hints = []
                 elif hint_button.collidepoint(event.pos):
+                    nb_hints = len(hints)
                     grid, hints = place_hint(solution_grid, grid, hints)
+                    if len(hints) > nb_hints:
+                        row, col = hints[-1]
+                        conflicts.place(row, col, grid[row][col])
+                        errors = find_errors(conflicts, initial_grid)
                 elif slider_rect.collidepoint(event.pos):
                     # Calculate the selected difficulty level
                     relative_x = event.pos[0] - slider_rect.x
@@ -199,25 +309,21 @@ def main():
                 }
 
                 # Check if the key corresponds to a value
-                if event.key in key_to_value:
+                if event.key in key_to_value and selected_cell is not None and loading is None:
                     # Update the cell with the value associated with the key
+                    row, col = selected_cell
                     grid[row][col] = key_to_value[event.key]
-                    # Remove the cell from errors if it is correct
-                    if selected_cell in errors:
-                        errors.remove(selected_cell)
+                    if grid[row][col]:
+                        conflicts.place(row, col, grid[row][col])
+                    else:
+                        conflicts.erase(row, col)
+                    # Update the errors, the edit can also create or clear conflicts in other cells
+                    errors = find_errors(conflicts, initial_grid)
                     selected_cell = None
                 
-        # Highlight the cell under the mouse
-        mouse_pos = pygame.mouse.get_pos()
-        highlight_cell = (mouse_pos[1] // CELL_SIZE, mouse_pos[0] // CELL_SIZE)
-        
-        # Draw the grid and numbers
-        draw_grid(window, highlight_cell, selected_cell) if selected_cell is not None else draw_grid(window, highlight_cell)
-        draw_numbers(window, grid)
-        draw_slider(window, difficulty_levels, selected_difficulty_index)
-        
-        pygame.display.update()
+        clock.tick(FPS)
         
+    prefetcher.close()
     pygame.quit()
     
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import sys
+import os
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.generator.bulk_generator import generate_bulk
+from src.generator.grid_generator import difficulty_levels
+from src.solver.parallel_counting import parallel_count
+from src.solver.solve_service import serve, parse_puzzle, DEFAULT_SOCKET, DEFAULT_PORT, DEFAULT_TIMEOUT
+from src.solver.backends import counting_solvers
+from src.solver.portfolio import Portfolio, BACKENDS, DEFAULT_BACKENDS
+from src.solver.benchmark import run_benchmark, compare_reports, load_thresholds, SOLVERS, CORPORA, THRESHOLDS_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="Sudoku Solver - DQN")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Bulk puzzle generation
+    generate_parser = subparsers.add_parser("generate", help="Generate puzzles in bulk on a process pool")
+    generate_parser.add_argument("--count", type=int, required=True, help="Number of puzzles per difficulty")
+    generate_parser.add_argument("--difficulties", nargs="+", default=list(difficulty_levels), choices=list(difficulty_levels))
+    generate_parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "../data/puzzles.txt"))
+    generate_parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: number of CPUs)")
+    generate_parser.add_argument("--seed", type=int, default=0, help="Base seed, the same seed gives the same puzzles")
+    generate_parser.add_argument("--mode", default="incremental", choices=["incremental", "random"])
+    generate_parser.add_argument("--dedup", default=None, help="Dedup index file: puzzles equivalent to an indexed one are generated again")
+
+    # Solver benchmark
+    benchmark_parser = subparsers.add_parser("benchmark", help="Benchmark the solvers on the pinned corpora")
+    benchmark_parser.add_argument("--output", default=None, help="JSON file of the results (default: print them)")
+    benchmark_parser.add_argument("--solvers", nargs="+", default=None, choices=list(SOLVERS))
+    benchmark_parser.add_argument("--corpora", nargs="+", default=None, choices=CORPORA)
+    benchmark_parser.add_argument("--timeout", type=float, default=10.0, help="Maximum time per puzzle in seconds")
+    benchmark_parser.add_argument("--no-memory", action="store_true", help="Do not measure the peak memory")
+    benchmark_parser.add_argument("--cold-start", action="store_true", help="Also measure the import times in fresh processes")
+
+    # Comparison of two benchmark results
+    compare_parser = subparsers.add_parser("compare", help="Compare two benchmark results, fail above the thresholds")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+
+    # Solution counting
+    count_parser = subparsers.add_parser("count", help="Count the solutions of a puzzle on a process pool")
+    count_parser.add_argument("puzzle", help="Cells of the puzzle row by row (n * n characters): 0 or . for an empty cell, letters from a = 10 on larger boards")
+    count_parser.add_argument("--limit", type=int, default=None, help="Stop after this many solutions (default: all)")
+    count_parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: number of CPUs)")
+    count_parser.add_argument("--depth", type=int, default=None, help="Split depth of the search tree (default: automatic)")
+
+    # Solving service
+    serve_parser = subparsers.add_parser("serve", help="Serve the solvers on a local socket (one JSON object per line)")
+    serve_parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    serve_parser.add_argument("--port", type=int, default=None, help=f"Listen on this TCP port of localhost instead of the Unix socket (default without Unix sockets: {DEFAULT_PORT})")
+    serve_parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: number of CPUs)")
+    serve_parser.add_argument("--solvers", nargs="+", default=counting_solvers(), choices=counting_solvers())
+    serve_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Default time limit of a request in seconds")
+
+    # Solver portfolio
+    race_parser = subparsers.add_parser("race", help="Race solver backends on a puzzle, the first answer wins")
+    race_parser.add_argument("puzzle", help="Cells of the puzzle row by row, as for count")
+    race_parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS, choices=BACKENDS)
+    race_parser.add_argument("--select", action="store_true", help="Run only the backend chosen from the puzzle features")
+    race_parser.add_argument("--timeout", type=float, default=None, help="Maximum time in seconds")
+    race_parser.add_argument("--log", default=None, help="Win-rate log file, read by the selector and updated by the races")
+
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate_bulk(args.output, args.count, args.difficulties, args.workers, args.seed, args.mode, dedup_path=args.dedup)
+    elif args.command == "benchmark":
+        report = run_benchmark(args.solvers, args.corpora, args.timeout, not args.no_memory, cold_start=args.cold_start)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=4)
+        else:
+            print(json.dumps(report, indent=4))
+    elif args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        failures = compare_reports(baseline, current, load_thresholds(args.thresholds))
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            sys.exit(1)
+        print("All results within the thresholds")
+    elif args.command == "count":
+        try:
+            grid = parse_puzzle(args.puzzle)
+        except ValueError as error:
+            parser.error(str(error))
+        print(parallel_count(grid, args.limit, args.workers, args.depth))
+    elif args.command == "race":
+        try:
+            grid = parse_puzzle(args.puzzle)
+        except ValueError as error:
+            parser.error(str(error))
+        portfolio = Portfolio(args.backends, args.log)
+        nb_solutions, backend = portfolio.solve(grid, race=not args.select, timeout=args.timeout)
+        print(f"{nb_solutions} ({backend})")
+        if args.log and not args.select:
+            portfolio.save()
+            print(json.dumps(portfolio.win_rates(), indent=4))
+    elif args.command == "serve":
+        try:
+            asyncio.run(serve(args.socket, port=args.port, workers=args.workers, solvers=args.solvers, default_timeout=args.timeout))
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
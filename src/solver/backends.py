@@ -0,0 +1,82 @@
+import functools
+import importlib
+import sys
+import os
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+# Registry of the solvers and of the heavy libraries some of them need. Nothing is imported before it is used:
+# importing the solvers to call backtracking_solver or check_cell does not pay for PuLP (lp_solver) or SciPy
+# (milp_solver), which take about a second to import.
+
+# Libraries of the solver backends, imported on first use
+BACKENDS = {
+    "pulp": "pulp",  # CBC through PuLP, for lp_solver
+    "highs": "scipy.optimize",  # HiGHS through scipy.optimize.milp, for milp_solver
+    "sparse": "scipy.sparse",  # Constraint matrix of the MIP model
+}
+
+# Solvers by name: module, function and optionally the heuristic of backtracking_solver, imported on first use.
+# Every solver takes the grid and accepts a stats keyword (SolverStats).
+SOLVERS = {
+    "backtracking": ("src.solver.sudoku_solvers", "backtracking_solver"),
+    "backtracking_degree": ("src.solver.sudoku_solvers", "backtracking_solver", "degree_heuristic"),
+    "backtracking_mrv": ("src.solver.sudoku_solvers", "backtracking_solver", "mrv_heuristic"),
+    "backtracking_lcv": ("src.solver.sudoku_solvers", "backtracking_solver", "lcv_heuristic"),
+    "bitmask": ("src.solver.sudoku_solvers", "bitmask_solver"),
+    "dlx": ("src.solver.sudoku_solvers", "dlx_solver"),
+    "propagating": ("src.solver.sudoku_solvers", "propagating_solver"),
+    "lp": ("src.solver.sudoku_solvers", "lp_solver"),
+    "milp": ("src.solver.sudoku_solvers", "milp_solver"),
+}
+
+# Solvers that only tell whether a solution exists: lp_solver returns 1 for any feasible puzzle (even with several
+# solutions) and 2 for an infeasible one, the other solvers return the number of solutions (0, 1 or 2 for more)
+EXISTENCE_ONLY_SOLVERS = {"lp"}
+
+_loaded_backends = {}
+_loaded_solvers = {}
+
+# Function to import the library of a backend the first time it is needed
+def load_backend(name):
+    """
+    Return the module of the backend, importing it on the first call.
+    Raise a ValueError for an unknown backend and an ImportError naming the backend if the library is missing.
+    """
+    if name not in _loaded_backends:
+        if name not in BACKENDS:
+            raise ValueError(f"Invalid backend: {name}")
+        try:
+            _loaded_backends[name] = importlib.import_module(BACKENDS[name])
+        except ImportError as error:
+            raise ImportError(f"The {name} backend needs the {BACKENDS[name]} module: {error}") from error
+    return _loaded_backends[name]
+
+# Function to return a solver function by name
+def get_solver(name):
+    """
+    Return the solver function registered under name (see SOLVERS), importing its module on the first call.
+    """
+    if name not in _loaded_solvers:
+        if name not in SOLVERS:
+            raise ValueError(f"Invalid solver: {name}")
+        module_name, function_name, *heuristic = SOLVERS[name]
+        module = importlib.import_module(module_name)
+        solver = getattr(module, function_name)
+        if heuristic:
+            solver = functools.partial(solver, heuristic=getattr(module, heuristic[0]))
+        _loaded_solvers[name] = solver
+    return _loaded_solvers[name]
+
+# Function to add a solver to the registry
+def register_solver(name, module_name, function_name, heuristic=None):
+    SOLVERS[name] = (module_name, function_name) if heuristic is None else (module_name, function_name, heuristic)
+    _loaded_solvers.pop(name, None)
+
+# Function to return the names of the solvers returning the number of solutions
+def counting_solvers():
+    return [name for name in SOLVERS if name not in EXISTENCE_ONLY_SOLVERS]
+
+def loaded_backends():
+    return sorted(_loaded_backends)
@@ -0,0 +1,98 @@
+import numpy as np
+import math
+
+# Vectorized versions of check_cell / check_grid working on a stack of grids of shape (N, 9, 9)
+# The grids can also be of size k^2 x k^2 with k x k boxes (N, 4, 4), (N, 16, 16), (N, 25, 25)...
+# None of these functions modify their input
+
+# Function to check the shape and values of a stack of grids
+def as_grid_stack(grids):
+    grids = np.asarray(grids)
+    size = grids.shape[1] if grids.ndim == 3 else 0
+    if grids.ndim != 3 or grids.shape[2] != size or size < 4 or math.isqrt(size) ** 2 != size:
+        raise ValueError("Invalid grids: It should be a (N, 9, 9) numpy array (or (N, k^2, k^2)).")
+    if grids.size and (grids.min() < 0 or grids.max() > size):
+        raise ValueError(f"Invalid grids: The values should be between 0 and {size}.")
+    return grids.astype(np.uint8, copy=False)
+
+# Function to encode the grids as booleans (N, n, n, n): one_hot[i, row, col, num - 1] is True if the cell holds num
+def one_hot(grids):
+    grids = as_grid_stack(grids)
+    return grids[..., None] == np.arange(1, grids.shape[1] + 1, dtype=np.uint8)
+
+# Function to count each number in each row, column and box
+def unit_counts(hot):
+    """
+    Count the numbers of every unit from the one-hot grids.
+    Returns three (N, n, n) arrays indexed by [grid, unit, num - 1], boxes are numbered row by row.
+    """
+    n, size = hot.shape[0], hot.shape[1]
+    k = math.isqrt(size)
+    row_counts = hot.sum(axis=2, dtype=np.uint8)
+    col_counts = hot.sum(axis=1, dtype=np.uint8)
+    box_counts = hot.reshape(n, k, k, k, k, size).sum(axis=(2, 4), dtype=np.uint8).reshape(n, size, size)
+    return row_counts, col_counts, box_counts
+
+# Function to spread per-box values (N, n, ...) back over the cells (N, n, n, ...)
+def _box_to_cells(box_values):
+    n, size = box_values.shape[0], box_values.shape[1]
+    k = math.isqrt(size)
+    boxes = box_values.reshape((n, k, 1, k, 1) + box_values.shape[2:])
+    return np.broadcast_to(boxes, (n, k, k, k, k) + box_values.shape[2:]).reshape((n, size, size) + box_values.shape[2:])
+
+def _conflicts(hot, row_counts, col_counts, box_counts):
+    # A filled cell is in conflict if its number appears more than once in its row, column or box
+    duplicated = ((row_counts > 1)[:, :, None, :]
+                  | (col_counts > 1)[:, None, :, :]
+                  | _box_to_cells(box_counts > 1))
+    return (hot & duplicated).any(axis=-1)
+
+def _candidates(grids, row_counts, col_counts, box_counts):
+    # A number is a candidate of an empty cell if it is not in the row, the column or the box
+    used = ((row_counts > 0)[:, :, None, :]
+            | (col_counts > 0)[:, None, :, :]
+            | _box_to_cells(box_counts > 0))
+    legal = ~used & (grids == 0)[..., None]
+    return legal.reshape(grids.shape[0], grids.shape[1] ** 2, grids.shape[1])
+
+def conflict_masks(grids):
+    """
+    Return a (N, n, n) boolean array, True for the filled cells that conflict with another cell.
+    """
+    hot = one_hot(grids)
+    return _conflicts(hot, *unit_counts(hot))
+
+def candidate_masks(grids):
+    """
+    Return a (N, n * n, n) boolean array, True if num - 1 can be placed in the empty cell (cell index = n * row + col).
+    Filled cells have no candidates.
+    """
+    grids = as_grid_stack(grids)
+    return _candidates(grids, *unit_counts(one_hot(grids)))
+
+def validate_grids(grids, complete=True):
+    """
+    Return a (N,) boolean array, True for the grids without conflicts.
+    With complete=True (as check_grid in grid_generator), the grids must also be fully filled.
+    """
+    grids = as_grid_stack(grids)
+    valid = ~conflict_masks(grids).any(axis=(1, 2))
+    if complete:
+        valid &= (grids != 0).all(axis=(1, 2))
+    return valid
+
+def check_grids(grids, complete=True):
+    """
+    Validate a stack of grids in a few array operations.
+    Returns the validity (N,), the conflict masks (N, n, n) and the candidate masks (N, n * n, n).
+    """
+    grids = as_grid_stack(grids)
+    hot = one_hot(grids)
+    counts = unit_counts(hot)
+
+    conflicts = _conflicts(hot, *counts)
+    valid = ~conflicts.any(axis=(1, 2))
+    if complete:
+        valid &= (grids != 0).all(axis=(1, 2))
+
+    return valid, conflicts, _candidates(grids, *counts)
@@ -0,0 +1,272 @@
+import numpy as np
+import hashlib
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.solver.backends import get_solver, SOLVERS as SOLVER_REGISTRY
+from src.solver.solver_stats import SolverStats
+from src.solver.solution_cache import set_solution_cache
+
+# Folder of the pinned corpora: one puzzle of 81 digits per line, "#" for comments
+CORPORA_FOLDER = os.path.join(os.path.dirname(__file__), "../../data/benchmarks/")
+CORPORA = ["easy", "medium", "hard", "expert", "pathological"]
+
+# Default thresholds file for the comparison mode
+THRESHOLDS_PATH = os.path.join(CORPORA_FOLDER, "thresholds.json")
+
+FORMAT_VERSION = 1
+
+# Modules whose import time is measured in a fresh interpreter (cold start of the batch workers, tests and interface)
+COLD_START_MODULES = [
+    "src.solver.sudoku_solvers",
+    "src.generator.grid_generator",
+    "src.generator.bulk_generator",
+    "src.interface.sudoku_interface",
+]
+
+# Heavy libraries that should not be imported by the modules above
+HEAVY_MODULES = ["pulp", "scipy"]
+
+ROOT_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+# Solvers: the solvers of the registry (see backends.SOLVERS), each one returns the number of solutions
+# and fills the SolverStats
+SOLVERS = {name: (lambda grid, stats, name=name: get_solver(name)(grid, stats=stats)) for name in SOLVER_REGISTRY}
+
+# Function to load a corpus
+def load_corpus(name, folder_path=CORPORA_FOLDER):
+    """
+    Return the puzzles of the corpus as a list of 9x9 arrays, and the SHA-1 of the file (its version).
+    """
+    with open(os.path.join(folder_path, f"{name}.txt"), "rb") as f:
+        content = f.read()
+    puzzles = []
+    for line in content.decode().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            puzzles.append(np.array([0 if c == "." else int(c) for c in line]).reshape(9, 9))
+    return puzzles, hashlib.sha1(content).hexdigest()
+
+def _on_timeout(signum, frame):
+    raise TimeoutError
+
+# The timeout of a puzzle uses SIGALRM, which only exists on POSIX systems. Elsewhere (Windows) the puzzles run
+# without a time limit, and the report says so ("timeout_supported": false)
+TIMEOUT_SUPPORTED = hasattr(signal, "SIGALRM")
+
+def _run_with_timeout(function, grid, stats, timeout):
+    # Run function(grid, stats) and stop it after timeout seconds (raises TimeoutError)
+    if not TIMEOUT_SUPPORTED:
+        return function(grid, stats)
+    previous = signal.signal(signal.SIGALRM, _on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return function(grid, stats)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def benchmark_solver(solver, puzzles, timeout=10.0, measure_memory=True):
+    """
+    Run the solver on each puzzle (on a copy) and return the statistics of the corpus:
+    p50/p95/max latency, nodes per second, share of the time spent in the heuristics, peak memory,
+    number of timeouts and of wrong results. Every puzzle of the corpora has a unique solution.
+    """
+    function = SOLVERS[solver]
+    latencies, totals = [], SolverStats()
+    timeouts, wrong, solved = 0, 0, []
+
+    for grid in puzzles:
+        stats = SolverStats()
+        start = time.perf_counter()
+        try:
+            nb_solutions = _run_with_timeout(function, np.copy(grid), stats, timeout)
+        except TimeoutError:
+            timeouts += 1
+            continue
+        elapsed = time.perf_counter() - start
+
+        latencies.append(elapsed)
+        solved.append(grid)
+        if nb_solutions != 1:
+            wrong += 1
+        totals.nodes += stats.nodes
+        totals.wall_time += stats.wall_time
+        totals.heuristic_time += stats.heuristic_time
+
+    # Peak memory in a separate pass, tracemalloc slows down the solvers
+    # (without a SolverStats the solvers would answer from the solution cache, so it is disabled)
+    peak_memory = None
+    if measure_memory and solved:
+        peak_memory = 0
+        previous_cache = set_solution_cache(None)
+        try:
+            for grid in solved:
+                tracemalloc.start()
+                try:
+                    _run_with_timeout(function, np.copy(grid), None, timeout)
+                except TimeoutError:
+                    pass
+                peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+        finally:
+            set_solution_cache(previous_cache)
+
+    latencies_ms = 1000 * np.array(latencies) if latencies else None
+    return {
+        "puzzles": len(puzzles),
+        "timeouts": timeouts,
+        "wrong_results": wrong,
+        "p50_ms": None if latencies_ms is None else float(np.percentile(latencies_ms, 50)),
+        "p95_ms": None if latencies_ms is None else float(np.percentile(latencies_ms, 95)),
+        "max_ms": None if latencies_ms is None else float(latencies_ms.max()),
+        "nodes_per_second": float(totals.nodes / totals.wall_time) if totals.nodes and totals.wall_time > 0 else None,
+        "heuristic_share": float(totals.heuristic_time / totals.wall_time) if totals.wall_time > 0 else None,
+        "peak_memory_kb": None if peak_memory is None else peak_memory / 1024,
+    }
+
+# Function to measure the import time of modules in fresh interpreters
+def measure_cold_start(modules=None, repeat=3):
+    """
+    Import each module in a new Python process, repeat times, and return for each one the best import time (ms),
+    the best time of the whole process (ms, interpreter startup included) and the heavy libraries it imported.
+    """
+    results = {}
+    for module in modules or COLD_START_MODULES:
+        code = (f"import sys, time; start = time.perf_counter(); import {module}; "
+                f"print(time.perf_counter() - start, *[name for name in {HEAVY_MODULES!r} if name in sys.modules])")
+        import_times, process_times = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, "-c", code], cwd=ROOT_FOLDER, capture_output=True, text=True, check=True,
+                                    env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")).stdout.split()
+            process_times.append(time.perf_counter() - start)
+            import_times.append(float(output[0]))
+        results[module] = {
+            "import_ms": 1000 * min(import_times),
+            "process_ms": 1000 * min(process_times),
+            "heavy_modules": output[1:],
+        }
+    return results
+
+def run_benchmark(solvers=None, corpora=None, timeout=10.0, measure_memory=True, folder_path=CORPORA_FOLDER, verbose=True,
+                  cold_start=False):
+    """
+    Benchmark every solver on every corpus and return the results as a JSON-serializable dict.
+    With cold_start=True, the import times of COLD_START_MODULES are measured too.
+    """
+    solvers = solvers or list(SOLVERS)
+    corpora = corpora or CORPORA
+    for solver in solvers:
+        if solver not in SOLVERS:
+            raise ValueError(f"Invalid solver: {solver}")
+
+    report = {
+        "format_version": FORMAT_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "timeout_s": timeout,
+        "timeout_supported": TIMEOUT_SUPPORTED,
+        "corpora": {},
+        "results": {},
+    }
+
+    if verbose and not TIMEOUT_SUPPORTED:
+        print(f"No SIGALRM on {platform.system()}: the puzzles run without the {timeout} s timeout")
+
+    loaded = {}
+    for corpus in corpora:
+        puzzles, version = load_corpus(corpus, folder_path)
+        loaded[corpus] = puzzles
+        report["corpora"][corpus] = {"puzzles": len(puzzles), "sha1": version}
+
+    for solver in solvers:
+        report["results"][solver] = {}
+        for corpus in corpora:
+            stats = benchmark_solver(solver, loaded[corpus], timeout, measure_memory)
+            report["results"][solver][corpus] = stats
+            if verbose:
+                p95 = "-" if stats["p95_ms"] is None else f"{stats['p95_ms']:.2f} ms"
+                print(f"{solver:22s} {corpus:14s} p95 {p95:>12s}  timeouts {stats['timeouts']}")
+
+    if cold_start:
+        report["cold_start"] = measure_cold_start()
+        if verbose:
+            for module, stats in report["cold_start"].items():
+                print(f"{module:37s} import {stats['import_ms']:8.1f} ms  process {stats['process_ms']:8.1f} ms")
+
+    return report
+
+# Thresholds: maximum ratio current / baseline for each metric (minimum ratio for nodes_per_second),
+# optionally overridden per solver. Latency increases smaller than min_ms are ignored (timer noise).
+# cold_start_ms is the maximum ratio of the import times, which are compared when both reports have them.
+DEFAULT_THRESHOLDS = {
+    "default": {"p50_ms": 1.5, "p95_ms": 1.5, "max_ms": 2.0, "peak_memory_kb": 1.5, "nodes_per_second": 1.5},
+    "min_ms": 1.0,
+    "cold_start_ms": 1.5,
+    "solvers": {},
+}
+
+def compare_reports(baseline, current, thresholds=None):
+    """
+    Compare two benchmark reports and return the list of failures (empty if the current report is within the thresholds).
+    A new timeout or wrong result is always a failure. Corpora whose version changed are not compared.
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    min_ms = thresholds.get("min_ms", 0.0)
+    failures = []
+
+    for solver, corpora in current["results"].items():
+        limits = dict(thresholds.get("default", {}), **thresholds.get("solvers", {}).get(solver, {}))
+        for corpus, stats in corpora.items():
+            old = baseline["results"].get(solver, {}).get(corpus)
+            if old is None or baseline["corpora"].get(corpus, {}).get("sha1") != current["corpora"][corpus]["sha1"]:
+                continue
+            name = f"{solver}/{corpus}"
+
+            if stats["timeouts"] > old["timeouts"]:
+                failures.append(f"{name}: timeouts {old['timeouts']} -> {stats['timeouts']}")
+            if stats["wrong_results"] > old["wrong_results"]:
+                failures.append(f"{name}: wrong results {old['wrong_results']} -> {stats['wrong_results']}")
+
+            for metric, ratio in limits.items():
+                before, after = old.get(metric), stats.get(metric)
+                if before is None or after is None:
+                    continue
+                if metric == "nodes_per_second":
+                    if after < before / ratio:
+                        failures.append(f"{name}: {metric} {before:.0f} -> {after:.0f} (limit /{ratio})")
+                elif after > before * ratio and not (metric.endswith("_ms") and after - before < min_ms):
+                    failures.append(f"{name}: {metric} {before:.2f} -> {after:.2f} (limit x{ratio})")
+
+    # Cold start: a slower import, or a heavy library imported again
+    ratio = thresholds.get("cold_start_ms", DEFAULT_THRESHOLDS["cold_start_ms"])
+    for module, stats in current.get("cold_start", {}).items():
+        old = baseline.get("cold_start", {}).get(module)
+        if old is None:
+            continue
+        before, after = old["import_ms"], stats["import_ms"]
+        if after > before * ratio and after - before >= min_ms:
+            failures.append(f"{module}: import_ms {before:.2f} -> {after:.2f} (limit x{ratio})")
+        new_modules = sorted(set(stats["heavy_modules"]) - set(old["heavy_modules"]))
+        if new_modules:
+            failures.append(f"{module}: imports {', '.join(new_modules)}")
+
+    return failures
+
+def load_thresholds(path=THRESHOLDS_PATH):
+    if path is None or not os.path.exists(path):
+        return DEFAULT_THRESHOLDS
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,118 @@
+import numpy as np
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.solver.sudoku_solvers import PropagatingBoard, propagating_solver, grid_box_size
+from src.solver.solver_stats import SolverStats
+
+# Number of subproblems per worker when the split depth is chosen automatically (small chunks balance the load)
+CHUNKS_PER_WORKER = 16
+
+# Number of subproblems submitted in advance for each worker
+TASKS_PER_WORKER = 2
+
+# Number of search nodes between two checks of the cancellation flag in a worker
+CANCEL_CHECK_NODES = 256
+
+# Function to split the search tree of a grid into independent subproblems
+def split_grid(grid, n_subproblems=1, depth=None):
+    """
+    Expand the search tree breadth first, as the propagating search does (propagation, then branching on the cell
+    with the fewest candidates), until there are at least n_subproblems open nodes or depth levels are expanded.
+    Returns the open nodes as grids (their solutions are disjoint and cover all the solutions of the grid),
+    and the number of solutions already found during the expansion.
+    """
+    frontier, solved, level = [np.asarray(grid)], 0, 0
+    while frontier and (level < depth if depth is not None else len(frontier) < n_subproblems):
+        children = []
+        for node in frontier:
+            board = PropagatingBoard(node)
+            if not board.valid or not board.propagate():
+                continue  # No solution
+
+            empty_cells = [idx for idx in range(board.geometry.n_cells) if board.cells[idx] == 0]
+            if not empty_cells:
+                solved += 1
+                continue
+
+            # One child per candidate of the cell with the fewest candidates
+            idx = min(empty_cells, key=lambda idx: board.cand[idx].bit_count())
+            base, mask = board.to_grid(), board.cand[idx]
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                child = base.copy()
+                child.flat[idx] = bit.bit_length()
+                children.append(child)
+        frontier = children
+        level += 1
+    return frontier, solved
+
+# Cancellation flag shared with the workers, set once the global limit is reached
+_cancel_event = None
+
+class _Cancelled(Exception):
+    pass
+
+def _init_worker(event):
+    global _cancel_event
+    _cancel_event = event
+
+def _check_cancelled(stats):
+    if _cancel_event is not None and _cancel_event.is_set():
+        raise _Cancelled
+
+# Function to count the solutions of a subproblem in a worker process
+def _count_task(grid, limit):
+    stats = SolverStats(callback=_check_cancelled, callback_every=CANCEL_CHECK_NODES)
+    try:
+        return propagating_solver(grid, limit=math.inf if limit is None else limit, stats=stats)
+    except _Cancelled:
+        return 0
+
+def parallel_count(grid, limit=None, workers=None, depth=None, chunks_per_worker=CHUNKS_PER_WORKER):
+    """
+    Count the solutions of the grid (any size k^2 x k^2) on a process pool, up to limit solutions (None: all of them).
+    The search tree is split at the given depth (by default, deep enough to get chunks_per_worker subproblems
+    per worker), and the subproblems are handed to the workers as they become free. Each subproblem is counted
+    up to the number of solutions still missing, and once limit is reached the pending subproblems are cancelled
+    and the running ones stop within a few hundred nodes. Returns the count (at most limit).
+    """
+    grid_box_size(grid)
+    if limit is not None and limit <= 0:
+        return 0
+    workers = workers or os.cpu_count()
+
+    subproblems, total = split_grid(grid, chunks_per_worker * workers, depth)
+    if not subproblems or (limit is not None and total >= limit):
+        return total if limit is None else min(total, limit)
+
+    event = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(event,)) as executor:
+        pending = set()
+        next_task = 0
+        while next_task < len(subproblems) or pending:
+            # Keep a bounded number of subproblems in flight, each one limited to the solutions still missing
+            while next_task < len(subproblems) and len(pending) < TASKS_PER_WORKER * workers:
+                remaining = None if limit is None else limit - total
+                pending.add(executor.submit(_count_task, subproblems[next_task], remaining))
+                next_task += 1
+
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                total += future.result()
+
+            # Early cancellation
+            if limit is not None and total >= limit:
+                event.set()
+                for future in pending:
+                    future.cancel()
+                break
+
+    return total if limit is None else min(total, limit)
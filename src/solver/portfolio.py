@@ -0,0 +1,211 @@
+import numpy as np
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.solver.backends import get_solver, counting_solvers
+from src.solver.batch_validation import as_grid_stack, candidate_masks
+from src.solver.solution_cache import set_solution_cache
+
+# Portfolio of solvers: race several of them on a puzzle (one process each, the first answer wins and the others
+# are killed), or pick the single one most likely to win from cheap features of the puzzle. Every race is recorded
+# in a win-rate log by feature bucket, which is what the selector learns from.
+#
+# Every backend answers the same question as backtracking_solver: 0, 1 or 2 (more than one) solutions.
+# lp_solver only tells whether a solution exists, so the LP backend of the portfolio is milp_solver.
+
+# Backends of the portfolio: the solvers of the registry returning the number of solutions (see backends.SOLVERS)
+BACKENDS = counting_solvers()
+DEFAULT_BACKENDS = ["backtracking", "backtracking_mrv", "backtracking_degree", "propagating", "milp"]
+
+# Backend chosen by the selector for a bucket without enough races
+DEFAULT_BACKEND = "propagating"
+MIN_BUCKET_RACES = 5
+
+# Bucket bounds of each feature (see puzzle_features)
+FEATURE_BINS = {
+    "clues": [22, 26, 32],
+    "digit_skew": [0.25, 0.5],
+    "mean_candidates": [2.5, 3.5],
+}
+
+LOG_VERSION = 1
+
+# Seconds between two checks that the racers are still alive
+POLL_INTERVAL = 0.1
+
+# Function to compute the features of a stack of puzzles
+def puzzle_features(grids):
+    """
+    Return the features of each puzzle of a (N, n, n) stack (or of a single grid) as a dictionary of (N,) arrays:
+    the number of clues, the skew of the digit distribution (standard deviation of the number of clues of each digit
+    over its mean, as produced by generate_distribution) and the initial candidate counts of the empty cells
+    (mean, and number of cells with a single candidate).
+    """
+    grids = np.asarray(grids)
+    if grids.ndim == 2:
+        grids = grids[None]
+    grids = as_grid_stack(grids)
+    size = grids.shape[1]
+    digit_counts = (grids.reshape(len(grids), -1, 1) == np.arange(1, size + 1)).sum(axis=1)
+    clues = digit_counts.sum(axis=1)
+    mean_count = np.maximum(clues / size, 1e-9)
+
+    candidates = candidate_masks(grids).sum(axis=2)
+    empty = (grids == 0).reshape(len(grids), -1)
+    n_empty = empty.sum(axis=1)
+    return {
+        "clues": clues,
+        "digit_skew": digit_counts.std(axis=1) / mean_count,
+        "mean_candidates": np.where(n_empty > 0, (candidates * empty).sum(axis=1) / np.maximum(n_empty, 1), 0.0),
+        "singles": ((candidates == 1) & empty).sum(axis=1),
+    }
+
+def feature_bucket(features, index=0):
+    # Bucket of a puzzle, for example "clues1-digit_skew0-mean_candidates2"
+    return "-".join(f"{name}{int(np.searchsorted(bins, features[name][index], side='right'))}"
+                    for name, bins in FEATURE_BINS.items())
+
+def _check_backends(backends):
+    for name in backends:
+        if name not in BACKENDS:
+            raise ValueError(f"Invalid backend: {name}")
+    return backends
+
+# Process groups only exist on POSIX systems. None of the backends starts a process of its own today (milp_solver
+# runs HiGHS in-process), so elsewhere (Windows) killing the racer is enough
+PROCESS_GROUPS = hasattr(os, "setpgid") and hasattr(os, "killpg")
+
+def _run_backend(name, grid, results):
+    # Racer process: its own process group, so that killing it also kills any process started by its solver
+    if PROCESS_GROUPS:
+        os.setpgid(0, 0)
+    set_solution_cache(None)  # A cached answer would not tell which backend is fastest
+    start = time.perf_counter()
+    try:
+        nb_solutions = get_solver(name)(grid)
+    except Exception as error:
+        results.put((name, None, f"{type(error).__name__}: {error}"))
+        return
+    results.put((name, int(nb_solutions), time.perf_counter() - start))
+
+def _kill(process):
+    if not PROCESS_GROUPS:
+        process.kill()
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            process.kill()  # The racer had not created its group yet
+    process.join()
+
+class Portfolio:
+    """
+    Race a set of backends on puzzles and learn which one wins, by feature bucket.
+    With a log_path, the win counts are loaded from the file if it exists, and save() writes them.
+    """
+    def __init__(self, backends=DEFAULT_BACKENDS, log_path=None):
+        _check_backends(backends)
+        self.backends = list(backends)
+        self.log_path = log_path
+        self.wins = {}  # Bucket -> {backend: number of races won}
+        if log_path is not None and os.path.exists(log_path):
+            with open(log_path) as f:
+                log = json.load(f)
+            if log.get("version") != LOG_VERSION:
+                raise ValueError(f"Unsupported win-rate log version: {log.get('version')}")
+            self.wins = log["wins"]
+
+    def race(self, grid, backends=None, timeout=None):
+        """
+        Run the backends concurrently on the puzzle, one process each, and return (number of solutions,
+        winning backend, time in seconds) for the first one to answer. The others are killed.
+        Raise a TimeoutError if no backend answers within timeout seconds, and a ValueError if they all fail.
+        """
+        backends = self.backends if backends is None else _check_backends(backends)
+        grid = np.asarray(grid)
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_run_backend, args=(name, np.copy(grid), results), daemon=True)
+                     for name in backends]
+        start = time.perf_counter()
+        errors = []
+        try:
+            for process in processes:
+                process.start()
+            while len(errors) < len(processes):
+                remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No backend answered within {timeout} s")
+                try:
+                    name, nb_solutions, outcome = results.get(timeout=min(remaining or POLL_INTERVAL, POLL_INTERVAL))
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes) and results.empty():
+                        errors.append("a racer died without answering")
+                        break
+                    continue
+                if nb_solutions is None:
+                    errors.append(f"{name}: {outcome}")
+                    continue
+                self.record(grid, name)
+                return nb_solutions, name, time.perf_counter() - start
+        finally:
+            for process in processes:
+                _kill(process)
+            results.close()
+        raise ValueError(f"Invalid grid: Every backend failed ({'; '.join(errors)})")
+
+    def record(self, grid, winner):
+        # Count a race won by winner in the bucket of the puzzle
+        bucket = self.wins.setdefault(feature_bucket(puzzle_features(grid)), {})
+        bucket[winner] = bucket.get(winner, 0) + 1
+
+    def select(self, grid, features=None, index=0):
+        """
+        Return the backend that won the most races on puzzles of the same bucket, the most races overall if
+        the bucket has fewer than MIN_BUCKET_RACES races, and DEFAULT_BACKEND without races.
+        Only the backends of the portfolio are considered.
+        """
+        features = puzzle_features(grid) if features is None else features
+        for wins in [self.wins.get(feature_bucket(features, index), {}), self.win_counts()]:
+            wins = {name: count for name, count in wins.items() if name in self.backends}
+            if sum(wins.values()) >= MIN_BUCKET_RACES:
+                return max(wins, key=wins.get)
+        return DEFAULT_BACKEND if DEFAULT_BACKEND in self.backends else self.backends[0]
+
+    def solve(self, grid, race=True, timeout=None):
+        """
+        Return (number of solutions, backend): by racing the backends, or with the backend chosen by select().
+        """
+        if race:
+            nb_solutions, winner, _ = self.race(grid, timeout=timeout)
+            return nb_solutions, winner
+        backend = self.select(grid)
+        return get_solver(backend)(np.copy(grid)), backend
+
+    def win_counts(self):
+        counts = {}
+        for wins in self.wins.values():
+            for name, count in wins.items():
+                counts[name] = counts.get(name, 0) + count
+        return counts
+
+    def win_rates(self):
+        # Share of the recorded races won by each backend of the portfolio (among the races they won)
+        counts = {name: count for name, count in self.win_counts().items() if name in self.backends}
+        total = sum(counts.values())
+        return {name: counts.get(name, 0) / total if total else 0.0 for name in self.backends}
+
+    def save(self, path=None):
+        path = path or self.log_path
+        if path is None:
+            raise ValueError("No path to save the win-rate log.")
+        with open(path + ".tmp", "w") as f:
+            json.dump({"version": LOG_VERSION, "wins": self.wins, "win_rates": self.win_rates()}, f, indent=4)
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,158 @@
+import numpy as np
+import os
+import struct
+import sys
+from collections import OrderedDict
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.generator.canonical_form import canonical_form, apply_transform, invert_transform, pack_keys
+
+# Bounded LRU cache of solver results, keyed by the canonical form of the puzzle (see canonical_form): puzzles
+# equivalent under the Sudoku symmetries share an entry, the stored solution is the solution of the canonical form
+# and is transformed back to each puzzle. A lookup costs a canonicalization (about 2 ms on a 9x9 puzzle).
+
+# Default number of entries
+DEFAULT_CAPACITY = 100_000
+
+# File layout: header (magic, version, number of entries), then one record per entry from the least to the most
+# recently used: board size, canonical key, number of solutions (UNKNOWN if not known), canonical solution
+# (zeros if not known)
+MAGIC = b"SUDOKUSC"
+VERSION = 1
+HEADER_FORMAT = "<8sHI"
+UNKNOWN = 255
+
+class SolutionCache:
+    """
+    Map a puzzle to its number of solutions (0, 1 or 2 for more than one) and to a solution, with LRU eviction
+    beyond capacity entries. Either one can be unknown (None): lp_solver only learns a solution, backtracking_solver
+    only a count. With a path, the entries are loaded from the file if it exists, and save() writes them.
+    Only 4x4 and 9x9 puzzles are cached (the boards with a canonical form).
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, path=None):
+        self.capacity = capacity
+        self.path = path
+        self.entries = OrderedDict()  # Canonical key: (number of solutions, canonical solution)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def cacheable(grid):
+        return isinstance(grid, np.ndarray) and grid.ndim == 2 and grid.shape in ((4, 4), (9, 9))
+
+    def _key(self, grid):
+        # Canonical key of the puzzle and the transformation to its canonical form, None for a puzzle
+        # with a repeated number in a row or a column (it has no canonical form and no solution anyway)
+        try:
+            form, transform = canonical_form(grid)
+        except ValueError:
+            return None, None
+        return pack_keys(form[None])[0].tobytes(), transform
+
+    def lookup(self, grid, need_count=False, need_solution=False):
+        """
+        Return (number of solutions, solution grid) if the puzzle is cached with what is needed, else None
+        (a miss). The solution is given for this puzzle, transformed back from the canonical form.
+        """
+        if not self.cacheable(grid):
+            return None
+        key, transform = self._key(grid)
+        entry = None if key is None else self.entries.get(key)
+        if entry is None or (need_count and entry[0] is None) or (need_solution and entry[1] is None and entry[0] != 0):
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        nb_solutions, solution = entry
+        return nb_solutions, None if solution is None else invert_transform(solution, transform)
+
+    def store(self, grid, nb_solutions=None, solution=None):
+        """
+        Record what a solver found for the puzzle: its number of solutions and/or a solution grid.
+        Known values of an existing entry are kept when the new ones are unknown.
+        """
+        if not self.cacheable(grid):
+            return
+        key, transform = self._key(grid)
+        if key is None:
+            return
+        old_count, old_solution = self.entries.pop(key, (None, None))
+        if solution is not None:
+            solution = apply_transform(np.asarray(solution), transform).astype(np.uint8)
+        self.entries[key] = (old_count if nb_solutions is None else nb_solutions,
+                             old_solution if solution is None else solution)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def counters(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def save(self, path=None):
+        """
+        Write the entries to path (by default, the path of the cache), replacing the file atomically.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the solution cache.")
+        records = []
+        for key, (nb_solutions, solution) in self.entries.items():
+            size = 4 if len(key) == 8 else 9
+            solution = np.zeros(size * size, dtype=np.uint8) if solution is None else solution.ravel()
+            count = UNKNOWN if nb_solutions is None else nb_solutions
+            records.append(bytes([size]) + key + bytes([count]) + solution.astype(np.uint8).tobytes())
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(records)))
+            f.write(b"".join(records))
+        os.replace(path + ".tmp", path)
+
+    def load(self, path):
+        # Add the entries of a file written by save(), as the most recently used ones
+        with open(path, "rb") as f:
+            header = f.read(struct.calcsize(HEADER_FORMAT))
+            magic, version, _ = struct.unpack(HEADER_FORMAT, header)
+            if magic != MAGIC:
+                raise ValueError(f"Invalid solution cache: {path}")
+            if version != VERSION:
+                raise ValueError(f"Unsupported solution cache version: {version}")
+            content = f.read()
+        position = 0
+        while position < len(content):
+            size = content[position]
+            key_size = (size * size + 1) // 2
+            key = content[position + 1:position + 1 + key_size]
+            nb_solutions = content[position + 1 + key_size]
+            solution = np.frombuffer(content, dtype=np.uint8, count=size * size, offset=position + 2 + key_size)
+            self.entries[key] = (None if nb_solutions == UNKNOWN else nb_solutions,
+                                 None if not solution.any() else solution.reshape(size, size).copy())
+            position += 2 + key_size + size * size
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+# Cache consulted by the solvers, None to disable it
+_solution_cache = SolutionCache()
+
+def get_solution_cache():
+    return _solution_cache
+
+def set_solution_cache(cache):
+    """
+    Replace the cache consulted by backtracking_solver, lp_solver and place_hint (None disables caching).
+    Returns the previous cache.
+    """
+    global _solution_cache
+    previous, _solution_cache = _solution_cache, cache
+    return previous
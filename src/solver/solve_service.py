@@ -0,0 +1,380 @@
+import numpy as np
+import asyncio
+import json
+import math
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.solver.backends import get_solver, counting_solvers
+from src.solver.sudoku_solvers import grid_box_size, DancingLinks, milp_solver
+from src.solver.solution_cache import set_solution_cache
+
+# Local solving service: one JSON object per line over a Unix socket (or TCP on localhost, the default on Windows),
+# in both directions.
+#
+# Request:      {"id": "a", "puzzles": ["530070000600195000...", ...], "solver": "propagating", "timeout": 10,
+#                "solution": true}  ("puzzle": "..." for a single puzzle)
+# Cancellation: {"id": "a", "cancel": true}
+# Responses, streamed as the puzzles are solved (in any order):
+#               {"id": "a", "index": 0, "nb_solutions": 1, "solution": "534678912...", "time_ms": 2.1}
+#               {"id": "a", "index": 1, "error": "timeout"}
+#               {"id": "a", "done": true, "solved": 1, "errors": 1}  (or {"id": "a", "cancelled": true})
+#
+# Puzzles are strings of n * n cells (0 or . for an empty cell, letters from a = 10 on larger boards) or lists of rows.
+# nb_solutions is 0, 1 or 2 (more than one). The solvers run in a process pool whose workers import the solvers,
+# their backends and the MIP model once, at start. The timeout of a request covers all its puzzles: a puzzle gets
+# the time left and is stopped by its worker when it runs out. Only a bounded number of puzzles is handed to the
+# pool at once, and a connection has a bounded number of open requests: a batch is read from the socket as fast as
+# the workers solve it.
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "sudoku_solver.sock")
+DEFAULT_HOST = "127.0.0.1"
+
+# Without Unix sockets (Windows), the service and the clients use this TCP port by default
+UNIX_SOCKETS = hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+DEFAULT_PORT = 8765
+
+# The workers stop a puzzle at its timeout with SIGALRM, which only exists on POSIX systems. Elsewhere a puzzle
+# runs to the end in its worker, and the front end reports the timeout TIMEOUT_GRACE seconds after it
+TIMER_SUPPORTED = hasattr(signal, "SIGALRM")
+
+# Default solver of a request (the service offers backends.counting_solvers() by default)
+DEFAULT_SOLVER = "propagating"
+DEFAULT_TIMEOUT = 10.0  # Seconds per request
+
+# Puzzles handed to the pool at once, per worker
+TASKS_PER_WORKER = 2
+
+# Open requests per connection and maximum size of a request line
+MAX_OPEN_REQUESTS = 16
+MAX_LINE_BYTES = 1 << 24
+
+# Time given to a worker past the timeout of a puzzle to report it
+TIMEOUT_GRACE = 1.0
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+# Solved grid used to warm up the workers
+WARM_UP_GRID = "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+
+# Function to parse a puzzle given as a string or as a list of rows
+def parse_puzzle(puzzle):
+    """
+    Return the puzzle as a numpy grid, or raise a ValueError if it is not a valid k^2 x k^2 puzzle.
+    """
+    if isinstance(puzzle, str):
+        size = math.isqrt(len(puzzle))
+        if size * size != len(puzzle):
+            raise ValueError(f"Invalid puzzle: {len(puzzle)} cells is not a square board.")
+        try:
+            grid = np.array([0 if c in ".0" else int(c, 36) for c in puzzle]).reshape(size, size)
+        except ValueError:
+            raise ValueError(f"Invalid puzzle: {puzzle}") from None
+    else:
+        try:
+            grid = np.array(puzzle, dtype=int)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid puzzle: It should be a string or a list of rows.") from None
+    size = grid_box_size(grid) ** 2
+    if grid.min() < 0 or grid.max() > size:
+        raise ValueError(f"Invalid puzzle: Its numbers should be between 0 and {size}.")
+    return grid
+
+def format_grid(grid):
+    return "".join(DIGITS[num] for num in np.ravel(grid))
+
+# Worker side
+
+def _on_timeout(signum, frame):
+    raise TimeoutError
+
+def _init_worker(solvers):
+    # Import the solvers and their backends, and run each one once (the MIP model of milp_solver is built)
+    previous_cache = set_solution_cache(None)
+    try:
+        grid = parse_puzzle(WARM_UP_GRID)
+        for name in solvers:
+            get_solver(name)(np.copy(grid))
+    finally:
+        set_solution_cache(previous_cache)
+
+def _find_solution(grid):
+    # Solution grid of a puzzle with a solution
+    if grid.shape == (9, 9):
+        board = DancingLinks(grid)
+        board.count(limit=1)
+        return board.solution_grid()
+    return milp_solver(grid, return_solution=True)[1]
+
+def _solve_task(grid, solver, return_solution, timeout):
+    # Solve one puzzle in a worker, stopped after timeout seconds (if SIGALRM exists)
+    start = time.perf_counter()
+    if TIMER_SUPPORTED:
+        previous = signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        nb_solutions = get_solver(solver)(np.copy(grid))
+        result = {"nb_solutions": int(nb_solutions)}
+        if return_solution and nb_solutions:
+            result["solution"] = format_grid(_find_solution(grid))
+    except TimeoutError:
+        return {"error": "timeout"}
+    except ValueError as error:
+        return {"error": str(error)}
+    finally:
+        if TIMER_SUPPORTED:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    result["time_ms"] = 1000 * (time.perf_counter() - start)
+    return result
+
+# Front end
+
+class SolveService:
+    """
+    asyncio front end of a pool of warm solver workers (see the protocol above).
+    start() creates the pool, warms every worker and listens on a Unix socket (path) or on a TCP port.
+    """
+    def __init__(self, workers=None, solvers=None, default_timeout=DEFAULT_TIMEOUT,
+                 tasks_per_worker=TASKS_PER_WORKER, max_open_requests=MAX_OPEN_REQUESTS):
+        # Only the solvers returning the number of solutions (not lp_solver) follow the reply contract
+        solvers = counting_solvers() if solvers is None else solvers
+        for name in solvers:
+            if name not in counting_solvers():
+                raise ValueError(f"Invalid solver: {name}")
+        self.workers = workers or os.cpu_count()
+        self.solvers = list(solvers)
+        self.default_timeout = default_timeout
+        self.max_tasks = tasks_per_worker * self.workers
+        self.max_open_requests = max_open_requests
+        self.executor = None
+        self.server = None
+        self.slots = None
+        self.running_tasks = 0  # Puzzles handed to the pool and not finished
+        self.peak_tasks = 0
+
+    async def start(self, path=None, host=DEFAULT_HOST, port=0):
+        loop = asyncio.get_running_loop()
+        self.slots = asyncio.Semaphore(self.max_tasks)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.solvers,))
+        # One task per worker: the pool starts a new worker while none is idle, so every worker is warm
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.workers)))
+
+        if path is not None:
+            if os.path.exists(path):
+                os.remove(path)
+            self.server = await asyncio.start_unix_server(self._handle_connection, path, limit=MAX_LINE_BYTES)
+        else:
+            self.server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_LINE_BYTES)
+        return self.server
+
+    def address(self):
+        # Socket path or (host, port) the service listens on
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            await asyncio.to_thread(self.executor.shutdown, wait=True, cancel_futures=True)
+
+    def _parse_request(self, message):
+        # Return the puzzles and the options of a request, or raise a ValueError
+        if "puzzles" in message:
+            puzzles = message["puzzles"]
+            if not isinstance(puzzles, list):
+                raise ValueError("Invalid request: puzzles should be a list.")
+        elif "puzzle" in message:
+            puzzles = [message["puzzle"]]
+        else:
+            raise ValueError("Invalid request: It has no puzzle.")
+        solver = message.get("solver", DEFAULT_SOLVER)
+        if solver not in self.solvers:
+            raise ValueError(f"Invalid solver: {solver}")
+        timeout = message.get("timeout", self.default_timeout)
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError(f"Invalid timeout: {timeout}")
+        return puzzles, solver, float(timeout), bool(message.get("solution", False))
+
+    def _release_slot(self, loop):
+        # Called in a thread of the executor when a worker finishes a puzzle
+        def release():
+            self.running_tasks -= 1
+            self.slots.release()
+        loop.call_soon_threadsafe(release)
+
+    async def _deliver(self, request_id, index, future, timeout, send):
+        # Wait for the result of a puzzle and send it, return True if the puzzle was solved
+        try:
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout + TIMEOUT_GRACE)
+        except asyncio.TimeoutError:
+            future.cancel()
+            result = {"error": "timeout"}
+        except Exception as error:  # For example a worker killed by the system
+            result = {"error": f"{type(error).__name__}: {error}"}
+        await send({"id": request_id, "index": index, **result})
+        return "error" not in result
+
+    async def _run_request(self, request_id, puzzles, solver, timeout, return_solution, send):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        futures, deliveries = [], []
+        errors = 0
+        try:
+            for index, puzzle in enumerate(puzzles):
+                try:
+                    grid = parse_puzzle(puzzle)
+                except ValueError as error:
+                    errors += 1
+                    await send({"id": request_id, "index": index, "error": str(error)})
+                    continue
+
+                # Backpressure: wait for a free slot in the pool
+                await self.slots.acquire()
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self.slots.release()
+                    errors += 1
+                    await send({"id": request_id, "index": index, "error": "timeout"})
+                    continue
+                self.running_tasks += 1
+                self.peak_tasks = max(self.peak_tasks, self.running_tasks)
+                futures.append(self.executor.submit(_solve_task, grid, solver, return_solution, remaining))
+                future = futures[-1]
+                future.add_done_callback(lambda _: self._release_slot(loop))
+                deliveries.append(asyncio.ensure_future(self._deliver(request_id, index, future, remaining, send)))
+
+            solved = sum(await asyncio.gather(*deliveries))
+        finally:
+            # On cancellation, the puzzles not started yet are dropped (a running one stops at its timeout)
+            for future in futures:
+                future.cancel()
+            for delivery in deliveries:
+                delivery.cancel()
+        await send({"id": request_id, "done": True, "solved": solved, "errors": errors + len(deliveries) - solved})
+
+    async def _handle_connection(self, reader, writer):
+        lock = asyncio.Lock()
+        requests = {}  # Open requests of the connection: id -> task
+
+        async def send(message):
+            async with lock:
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # Line above MAX_LINE_BYTES
+                    await send({"id": None, "error": "Invalid request: It is too long."})
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError
+                except ValueError:
+                    await send({"id": None, "error": "Invalid request: It should be a JSON object."})
+                    continue
+
+                request_id = message.get("id")
+                if message.get("cancel"):
+                    task = requests.pop(request_id, None)
+                    if task is not None:
+                        task.cancel()
+                        await send({"id": request_id, "cancelled": True})
+                    continue
+                if request_id in requests:
+                    await send({"id": request_id, "error": "Invalid request: Its id is already in use."})
+                    continue
+                if len(requests) >= self.max_open_requests:
+                    await send({"id": request_id, "error": "Too many open requests"})
+                    continue
+                try:
+                    puzzles, solver, timeout, return_solution = self._parse_request(message)
+                except ValueError as error:
+                    await send({"id": request_id, "error": str(error)})
+                    continue
+
+                task = asyncio.create_task(self._run_request(request_id, puzzles, solver, timeout, return_solution, send))
+                requests[request_id] = task
+                task.add_done_callback(lambda task, request_id=request_id: _close_request(requests, request_id, task))
+            await asyncio.gather(*requests.values(), return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            for task in requests.values():
+                task.cancel()
+            writer.close()
+
+def _close_request(requests, request_id, task):
+    # Forget a finished request, unless its id was reused after a cancellation
+    if requests.get(request_id) is task:
+        del requests[request_id]
+
+async def serve(path=None, host=DEFAULT_HOST, port=None, workers=None, solvers=None, default_timeout=DEFAULT_TIMEOUT):
+    """
+    Run the service until it is interrupted: on the Unix socket path, or on the TCP port if a port is given
+    (DEFAULT_PORT without Unix sockets).
+    """
+    service = SolveService(workers, solvers, default_timeout)
+    if port is None and not UNIX_SOCKETS:
+        port = DEFAULT_PORT
+    if port is None:
+        path = path or DEFAULT_SOCKET
+    await service.start(path if port is None else None, host, port or 0)
+    print(f"Solving service listening on {service.address()} with {service.workers} workers", flush=True)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+# Client side
+
+async def stream_results(puzzles, path=None, host=DEFAULT_HOST, port=None, request_id=0, **options):
+    """
+    Send a batch of puzzles to the service and yield the results as they arrive (dictionaries of the protocol),
+    until the final message ({"done": true} or an error about the whole request). options: solver, timeout, solution.
+    """
+    if port is None and not UNIX_SOCKETS:
+        port = DEFAULT_PORT
+    if port is None:
+        reader, writer = await asyncio.open_unix_connection(path or DEFAULT_SOCKET, limit=MAX_LINE_BYTES)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE_BYTES)
+    try:
+        puzzles = [format_grid(puzzle) if isinstance(puzzle, np.ndarray) else puzzle for puzzle in puzzles]
+        writer.write(json.dumps({"id": request_id, "puzzles": puzzles, **options}).encode() + b"\n")
+        await writer.drain()
+        while line := await reader.readline():
+            message = json.loads(line)
+            yield message
+            if message.get("done") or "index" not in message:
+                break
+    finally:
+        writer.close()
+
+def solve_batch(puzzles, path=None, host=DEFAULT_HOST, port=None, **options):
+    """
+    Solve a batch of puzzles with the service and return the results in the order of the puzzles.
+    """
+    async def collect():
+        results = [None] * len(puzzles)
+        async for message in stream_results(puzzles, path, host, port, **options):
+            if "index" in message:
+                results[message["index"]] = message
+            elif not message.get("done"):
+                raise ValueError(message.get("error"))
+        return results
+    return asyncio.run(collect())
@@ -0,0 +1,68 @@
+import time
+
+class SolverStats:
+    """
+    Opt-in record of the work done by a solver: pass an instance with stats=... to a solver and read it afterwards.
+    The counters add up over successive calls (use reset() in between to profile a single puzzle).
+    If a callback is given, it is called with the stats every callback_every nodes, during the search.
+    """
+    def __init__(self, callback=None, callback_every=1000):
+        self.callback = callback
+        self.callback_every = callback_every
+        self._start = None
+        self.reset()
+
+    def reset(self):
+        self.solver = None  # Name of the last solver
+        self.nodes = 0  # Search nodes visited
+        self.backtracks = 0  # Assignments undone
+        self.max_depth = 0  # Deepest search node
+        self.candidate_checks = 0  # Candidate values tested
+        self.heuristic_time = 0.0  # Time spent ordering cells or values (seconds)
+        self.wall_time = 0.0  # Total time of the solver calls (seconds)
+        self.cpu_time = 0.0  # CPU time of this process during the solver calls (seconds)
+        self.status = None  # Status reported by an external solver (LP)
+
+    @property
+    def search_time(self):
+        # Time spent outside the heuristics
+        return self.wall_time - self.heuristic_time
+
+    def begin(self, solver):
+        # Start timing, return False if a solver call is already being timed (recursive call)
+        if self._start is not None:
+            return False
+        self.solver = solver
+        self._start = (time.perf_counter(), time.process_time())
+        return True
+
+    def end(self):
+        wall_start, cpu_start = self._start
+        self.wall_time += time.perf_counter() - wall_start
+        self.cpu_time += time.process_time() - cpu_start
+        self._start = None
+
+    def node(self, depth):
+        # Record a search node at the given depth
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.callback is not None and self.nodes % self.callback_every == 0:
+            self.callback(self)
+
+    def as_dict(self):
+        return {
+            "solver": self.solver,
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "candidate_checks": self.candidate_checks,
+            "heuristic_time": self.heuristic_time,
+            "search_time": self.search_time,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "status": self.status,
+        }
+
+    def __repr__(self):
+        return f"SolverStats({', '.join(f'{key}={value}' for key, value in self.as_dict().items())})"
@@ -1,5 +1,26 @@
-import pulp
 import numpy as np
+import math
+import time
+import sys
+import os
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+# PuLP and SciPy are only imported by the solvers that use them, on their first call
+from src.solver.backends import load_backend
+from src.solver.solution_cache import get_solution_cache
+
+# Grids are n x n numpy arrays with k x k boxes, n = k * k (4x4, 9x9, 16x16, 25x25...), numbers from 1 to n
+
+# Function to return the box size k of a grid, or raise a ValueError if the grid is not a k^2 x k^2 numpy array
+def grid_box_size(grid):
+    if not (isinstance(grid, np.ndarray) and grid.ndim == 2 and grid.shape[0] == grid.shape[1]):
+        raise ValueError("Invalid grid: It should be a square numpy array.")
+    k = math.isqrt(grid.shape[0])
+    if k < 2 or k * k != grid.shape[0]:
+        raise ValueError(f"Invalid grid: Its size should be k^2 x k^2 (4x4, 9x9, 16x16...), not {grid.shape[0]}x{grid.shape[0]}.")
+    return k
 
 # Function to check if a cell is valid, i.e., if the number can be placed in the cell
 def check_cell(grid, row, col, num):
@@ -11,20 +32,19 @@ def check_cell(grid, row, col, num):
     if num in grid[:, col]:
         return False
     
-    # Verify the 3x3 grid
-    start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-    for i in range(start_row, start_row + 3):
-        for j in range(start_col, start_col + 3):
-            if grid[i][j] == num:
-                return False
+    # Verify the box
+    k = math.isqrt(len(grid))
+    start_row, start_col = k * (row // k), k * (col // k)
+    if num in grid[start_row:start_row + k, start_col:start_col + k]:
+        return False
 
     return True
 
 # Function to return the errors in the grid
 def check_grid(initial_grid, grid):
     errors = []
-    for i in range(9):
-        for j in range(9):
+    for i in range(len(grid)):
+        for j in range(len(grid)):
             num = grid[i][j]
             if num != 0 and initial_grid[i][j] == 0:
                 grid[i][j] = 0
@@ -35,80 +55,142 @@ def check_grid(initial_grid, grid):
 
 # Function to place a hint in the grid
 def place_hint(solution_grid, grid, hints):
+    # Without a solution grid, take it from the solution cache or solve the grid
+    if solution_grid is None:
+        solution_grid = _cached_solution(grid)
+        if solution_grid is None:
+            return grid, hints
+
     # Count the number of each digit in the grid
-    count = [0] * 10
-    for i in range(9):
-        for j in range(9):
+    size = len(grid)
+    count = [0] * (size + 1)
+    for i in range(size):
+        for j in range(size):
             count[grid[i][j]] += 1
     
     # Find the digit with the least occurrences
     min_count = min(count[1:])
     least_present_digit = count[1:].index(min_count) + 1
-    if min_count == 9:
+    if min_count == size:
         return grid, hints
     
     # Find the first cell with the digit
-    for i in range(9):
-        for j in range(9):
+    for i in range(size):
+        for j in range(size):
             if grid[i][j] == 0 and solution_grid[i][j] == least_present_digit:
                 hints.append((i,j))
                 grid[i][j] = least_present_digit
                 return grid, hints
             
+# Function to return a solution of the grid, from the solution cache if possible, None if there is no solution
+def _cached_solution(grid):
+    cache = get_solution_cache()
+    entry = cache.lookup(grid, need_solution=True) if cache is not None else None
+    if entry is not None:
+        return entry[1]
+    nb_solutions, solution = milp_solver(grid, return_solution=True)
+    if cache is not None:
+        cache.store(grid, nb_solutions, solution)
+    return solution
+
 # Sudoku Solvers
 
 
-def backtracking_solver(grid, solution_count=0, heuristic=None):
+def backtracking_solver(grid, solution_count=0, heuristic=None, propagate=False, stats=None, use_cache=True, _depth=0):
     """
     Solve the Sudoku grid using the backtracking algorithm and count the number of solutions.
     If more than one solution is found, stop and return 2.
+    With propagate=True, the search applies constraint propagation after every assignment
+    and picks the next cell by live candidate count (see propagating_solver); heuristic is then ignored.
+    If a SolverStats is given, it records the work done by the search.
+    With use_cache and without a SolverStats, the verdict of a puzzle (or of an equivalent one) already solved
+    comes from the solution cache (see solution_cache). The grid can be of any size k^2 x k^2.
     """
     # Check if the grid is valid
-    if not (isinstance(grid, np.ndarray) and grid.ndim == 2 and grid.shape == (9, 9)):
-        raise ValueError("Invalid grid: It should be a 9x9 numpy array.")
+    size = grid_box_size(grid) ** 2
+    
+    # Propagating search mode
+    if propagate:
+        return propagating_solver(grid, stats=stats)
+
+    # The top-level call consults the solution cache, and records its verdict
+    cache = get_solution_cache()
+    if use_cache and _depth == 0 and solution_count == 0 and stats is None and cache is not None:
+        entry = cache.lookup(grid, need_count=True)
+        if entry is not None:
+            return entry[0]
+        puzzle = np.copy(grid)  # The search leaves the grid filled when it stops at a second solution
+        nb_solutions = backtracking_solver(grid, heuristic=heuristic, use_cache=False)
+        cache.store(puzzle, nb_solutions)
+        return nb_solutions
+    
+    # The top-level call times the whole search
+    if stats is not None:
+        if stats.begin("backtracking"):
+            try:
+                return backtracking_solver(grid, solution_count, heuristic, propagate, stats, use_cache=False, _depth=_depth)
+            finally:
+                stats.end()
+        stats.node(_depth)
+        heuristic_start = time.perf_counter()
     
     # If a heuristic is provided, apply the function to determine the order of empty cells
     empty_cells = []
-    for row in range(9):
-        for col in range(9):
+    for row in range(size):
+        for col in range(size):
             if grid[row][col] == 0:
                 empty_cells.append((row, col))
     
     # Apply the heuristic to order the empty cells
     if heuristic and heuristic in [degree_heuristic, mrv_heuristic]:
         empty_cells = heuristic(grid, empty_cells)
+    
+    if stats is not None:
+        stats.heuristic_time += time.perf_counter() - heuristic_start
 
     # Try to fill the grid following the order of sorted empty cells
     for row, col in empty_cells:
         if heuristic and heuristic == lcv_heuristic:
+            if stats is not None:
+                heuristic_start = time.perf_counter()
             values_to_try = lcv_heuristic(grid, row, col)
+            if stats is not None:
+                stats.heuristic_time += time.perf_counter() - heuristic_start
             
             for num in values_to_try:  # Test values sorted by LCV
+                if stats is not None:
+                    stats.candidate_checks += 1
                 if check_cell(grid, row, col, num):
                     grid[row][col] = num  # Place the number
                     
                     # Recurse to solve the rest of the grid
-                    solution_count = backtracking_solver(grid, solution_count, heuristic)
+                    solution_count = backtracking_solver(grid, solution_count, heuristic, stats=stats, use_cache=False, _depth=_depth + 1)
                     
                     if solution_count == 2:  # If more than one solution is found, stop
                         return 2
                     
                     grid[row][col] = 0  # Backtrack, undo the move
+                    if stats is not None:
+                        stats.backtracks += 1
         
         else:
                         
-            # Try all numbers from 1 to 9
-            for num in range(1, 10):
+            # Try all numbers from 1 to size
+            for num in range(1, size + 1):
+                if stats is not None:
+                    stats.candidate_checks += 1
                 if check_cell(grid, row, col, num):
                     grid[row][col] = num  # Place the number
                     
                     # Recurse to solve the rest of the grid
-                    solution_count = backtracking_solver(grid, solution_count, heuristic)
+                    solution_count = backtracking_solver(grid, solution_count, heuristic, stats=stats, use_cache=False, _depth=_depth + 1)
                     
                     if solution_count == 2:  # If more than one solution is found, stop
                         return 2
                     
                     grid[row][col] = 0  # Backtrack, undo the move
+                    if stats is not None:
+                        stats.backtracks += 1
         return solution_count  # No valid value for this cell
 
     # If all cells are filled, a solution has been found
@@ -121,72 +203,822 @@ def backtracking_solver(grid, solution_count=0, heuristic=None):
 
     return solution_count  # Only one solution found
 
-def lp_solver(grid):
+def lp_solver(grid, stats=None, use_cache=True):
     """
     Solve the Sudoku grid using Linear Programming (LP).
+    If a SolverStats is given, it records the time and the status of the solver
+    (CBC runs in a subprocess, so its CPU time is not included). The grid can be of any size k^2 x k^2.
+    With use_cache and without a SolverStats, a puzzle (or an equivalent one) already solved is answered
+    from the solution cache.
     """
+    if stats is not None and stats.begin("lp"):
+        try:
+            return lp_solver(grid, stats, use_cache)
+        finally:
+            stats.end()
+
+    # Any cached entry tells whether the puzzle has a solution
+    cache = get_solution_cache() if use_cache and stats is None else None
+    if cache is not None:
+        entry = cache.lookup(grid)
+        if entry is not None:
+            return 1 if entry[0] != 0 else 2
+
+    k = grid_box_size(np.asarray(grid))
+    size = k * k
+    numbers = range(1, size + 1)
+    pulp = load_backend("pulp")
+
     # Create a linear programming problem
     prob = pulp.LpProblem("Sudoku", pulp.LpMinimize)
 
     # Create a dictionary of variables for the grid
     # x[i][j][k] will be 1 if cell (i,j) contains the number k, 0 otherwise
     x = {}
-    for i in range(9):
-        for j in range(9):
-            for k in range(1, 10):
-                x[i, j, k] = pulp.LpVariable(f"x_{i}_{j}_{k}", cat='Binary')
+    for i in range(size):
+        for j in range(size):
+            for num in numbers:
+                x[i, j, num] = pulp.LpVariable(f"x_{i}_{j}_{num}", cat='Binary')
 
     # Add the constraints for each cell to have exactly one number
-    for i in range(9):
-        for j in range(9):
-            prob += pulp.lpSum(x[i, j, k] for k in range(1, 10)) == 1
+    for i in range(size):
+        for j in range(size):
+            prob += pulp.lpSum(x[i, j, num] for num in numbers) == 1
 
     # Add the constraints for each number to appear exactly once in each row
-    for i in range(9):
-        for k in range(1, 10):
-            prob += pulp.lpSum(x[i, j, k] for j in range(9)) == 1
+    for i in range(size):
+        for num in numbers:
+            prob += pulp.lpSum(x[i, j, num] for j in range(size)) == 1
 
     # Add the constraints for each number to appear exactly once in each column
-    for j in range(9):
-        for k in range(1, 10):
-            prob += pulp.lpSum(x[i, j, k] for i in range(9)) == 1
+    for j in range(size):
+        for num in numbers:
+            prob += pulp.lpSum(x[i, j, num] for i in range(size)) == 1
 
-    # Add the constraints for each number to appear exactly once in each 3x3 subgrid
-    for k in range(1, 10):
-        for i in range(3):
-            for j in range(3):
-                prob += pulp.lpSum(x[3*i + m, 3*j + n, k] for m in range(3) for n in range(3)) == 1
+    # Add the constraints for each number to appear exactly once in each kxk box
+    for num in numbers:
+        for i in range(k):
+            for j in range(k):
+                prob += pulp.lpSum(x[k*i + m, k*j + n, num] for m in range(k) for n in range(k)) == 1
 
     # Add the initial clues from the grid as constraints
-    for i in range(9):
-        for j in range(9):
+    for i in range(size):
+        for j in range(size):
             if grid[i][j] != 0:
                 prob += x[i, j, grid[i][j]] == 1
-                for k in range(1, 10):
-                    if k != grid[i][j]:
-                        prob += x[i, j, k] == 0
+                for num in numbers:
+                    if num != grid[i][j]:
+                        prob += x[i, j, num] == 0
 
     # Solve the problem
     prob.solve(pulp.PULP_CBC_CMD(msg=False))
+    if stats is not None:
+        stats.status = pulp.LpStatus[prob.status]
 
     # Extract the solution grid
-    solution = np.zeros((9, 9), dtype=int)
-    for i in range(9):
-        for j in range(9):
-            for k in range(1, 10):
-                if pulp.value(x[i, j, k]) == 1:
-                    solution[i][j] = k
+    solution = np.zeros((size, size), dtype=int)
+    for i in range(size):
+        for j in range(size):
+            for num in numbers:
+                if pulp.value(x[i, j, num]) == 1:
+                    solution[i][j] = num
                     break
 
     # If there's more than one solution, return 2
     if pulp.LpStatus[prob.status] != "Optimal":
+        if cache is not None:
+            cache.store(grid, nb_solutions=0)
         return 2
+    if cache is not None:
+        cache.store(grid, solution=solution)
 
     '''print("Solution found:")
     print(solution)'''
 
     return 1
 
+class LPModel:
+    """
+    Sudoku MIP built once and reused for every puzzle of a given size n = box_size^2.
+    Variable n * (n * row + col) + num - 1 is 1 if the cell (row, col) contains num. For a puzzle, only the lower
+    bounds of the clue variables change. The model is solved in-process by HiGHS (scipy.optimize.milp), so no
+    solver process is spawned. Uniqueness is checked with a second solve excluding the first solution (no-good cut).
+    """
+    def __init__(self, box_size=3):
+        self.highs = load_backend("highs")
+        sparse = load_backend("sparse")
+        self.size = n = box_size * box_size
+        n_vars, n_cells = n ** 3, n * n
+
+        # One "exactly one" constraint per cell, per (row, num), per (column, num) and per (box, num)
+        var = np.arange(n_vars)
+        idx, num = var // n, var % n
+        row, col = idx // n, idx % n
+        box = box_size * (row // box_size) + col // box_size
+        constraint_rows = np.concatenate([idx, n_cells + n * row + num, 2 * n_cells + n * col + num, 3 * n_cells + n * box + num])
+        constraint_cols = np.tile(var, 4)
+        self.matrix = sparse.csr_matrix((np.ones(4 * n_vars), (constraint_rows, constraint_cols)), shape=(4 * n_cells, n_vars))
+        self.constraints = self.highs.LinearConstraint(self.matrix, 1, 1)
+        self.cost = np.zeros(n_vars)
+        self.integrality = np.ones(n_vars)
+        self.upper = np.ones(n_vars)
+
+    def _solve(self, lower, cut=None, stats=None):
+        # Solve with the given lower bounds, and optionally exclude a previous solution; None if infeasible
+        highs = self.highs
+        constraints = [self.constraints]
+        if cut is not None:
+            # The variables at 1 in the excluded solution cannot all be 1 again
+            constraints.append(highs.LinearConstraint(cut[None, :], -np.inf, cut.sum() - 1))
+        result = highs.milp(self.cost, constraints=constraints, integrality=self.integrality,
+                            bounds=highs.Bounds(lower, self.upper))
+        if stats is not None:
+            # Branch-and-bound nodes of HiGHS
+            stats.nodes += int(getattr(result, "mip_node_count", 0) or 0)
+            stats.status = result.message
+        if result.status != 0 or result.x is None:
+            return None
+        return np.round(result.x).astype(int)
+
+    def _lower_bounds(self, grid):
+        grid = np.asarray(grid).ravel()
+        lower = np.zeros(self.size ** 3)
+        clues = np.nonzero(grid)[0]
+        lower[self.size * clues + grid[clues] - 1] = 1
+        return lower
+
+    def solve(self, grid, stats=None):
+        # Return a solution grid of the puzzle, None if there is no solution
+        x = self._solve(self._lower_bounds(grid), stats=stats)
+        if x is None:
+            return None
+        return self._to_grid(x)
+
+    def check(self, grid, stats=None):
+        # Return the number of solutions (0, 1 or 2 for more than one) and the first solution grid found
+        lower = self._lower_bounds(grid)
+        x = self._solve(lower, stats=stats)
+        if x is None:
+            return 0, None
+        if self._solve(lower, cut=x, stats=stats) is not None:
+            return 2, self._to_grid(x)
+        return 1, self._to_grid(x)
+
+    def _to_grid(self, x):
+        return (np.nonzero(x)[0] % self.size + 1).reshape(self.size, self.size)
+
+# Shared LPModel of each box size
+_lp_models = {}
+
+def milp_solver(grid, return_solution=False, stats=None):
+    """
+    Count the solutions of the Sudoku grid (0, 1 or 2 for more than one) with the shared LPModel.
+    Unlike lp_solver, a second solution is really looked for. With return_solution=True, also return the solution grid.
+    If a SolverStats is given, it records the time, the branch-and-bound nodes and the status of HiGHS.
+    The grid can be of any size k^2 x k^2.
+    """
+    # Check if the grid is valid
+    box_size = grid_box_size(grid)
+
+    if stats is not None and stats.begin("milp"):
+        try:
+            return milp_solver(grid, return_solution, stats)
+        finally:
+            stats.end()
+
+    if box_size not in _lp_models:
+        _lp_models[box_size] = LPModel(box_size)
+    nb_solutions, solution = _lp_models[box_size].check(grid, stats)
+
+    if return_solution:
+        return nb_solutions, solution
+    return nb_solutions
+
+# Bitmask engine
+
+# Full candidate mask: bit (num - 1) is set when num can still be placed
+ALL_DIGITS = (1 << 9) - 1
+
+# Row, column and box index of each of the 81 cells (cell index = 9 * row + col)
+CELL_ROW = [idx // 9 for idx in range(81)]
+CELL_COL = [idx % 9 for idx in range(81)]
+CELL_BOX = [3 * (idx // 27) + (idx % 9) // 3 for idx in range(81)]
+
+# Number of set bits and list of digits for every candidate mask
+MASK_POPCOUNT = [bin(mask).count("1") for mask in range(ALL_DIGITS + 1)]
+MASK_DIGITS = [[num for num in range(1, 10) if mask & (1 << (num - 1))] for mask in range(ALL_DIGITS + 1)]
+
+class BitmaskBoard:
+    """
+    Sudoku grid whose row, column and 3x3 box occupancy is kept as integer bitmasks.
+    Placing or removing a number updates the three masks in place, so the candidates of a cell are a few bit operations.
+    """
+    def __init__(self, grid):
+        self.cells = [int(num) for num in np.asarray(grid).ravel()]
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.valid = True  # False if the initial clues already conflict
+
+        for idx, num in enumerate(self.cells):
+            if num != 0:
+                if not self.candidates(idx) & (1 << (num - 1)):
+                    self.valid = False
+                self.cells[idx] = 0
+                self.place(idx, num)
+
+    def candidates(self, idx):
+        # Mask of the numbers that can be placed in the cell
+        return ALL_DIGITS & ~(self.rows[CELL_ROW[idx]] | self.cols[CELL_COL[idx]] | self.boxes[CELL_BOX[idx]])
+
+    def place(self, idx, num):
+        bit = 1 << (num - 1)
+        self.cells[idx] = num
+        self.rows[CELL_ROW[idx]] |= bit
+        self.cols[CELL_COL[idx]] |= bit
+        self.boxes[CELL_BOX[idx]] |= bit
+
+    def remove(self, idx):
+        # Undo a placement, the cell must currently hold a number
+        bit = ~(1 << (self.cells[idx] - 1))
+        self.cells[idx] = 0
+        self.rows[CELL_ROW[idx]] &= bit
+        self.cols[CELL_COL[idx]] &= bit
+        self.boxes[CELL_BOX[idx]] &= bit
+
+    def empty_cells(self):
+        return [idx for idx in range(81) if self.cells[idx] == 0]
+
+    def to_grid(self):
+        return np.array(self.cells, dtype=int).reshape(9, 9)
+
+def bitmask_solver(grid, limit=2, stats=None):
+    """
+    Count the solutions of the Sudoku grid with a backtracking search on a BitmaskBoard.
+    The next cell is the one with the fewest candidates. The search stops once limit solutions are found,
+    so with the default limit it follows the contract of backtracking_solver: 0, 1 or 2 (more than one).
+    The grid is not modified. If a SolverStats is given, it records the work done by the search.
+    """
+    # Check if the grid is valid
+    if not (isinstance(grid, np.ndarray) and grid.ndim == 2 and grid.shape == (9, 9)):
+        raise ValueError("Invalid grid: It should be a 9x9 numpy array.")
+
+    if stats is not None and stats.begin("bitmask"):
+        try:
+            return bitmask_solver(grid, limit, stats)
+        finally:
+            stats.end()
+
+    board = BitmaskBoard(grid)
+    if not board.valid:
+        return 0
+
+    return _bitmask_search(board, board.empty_cells(), limit, 0, stats)
+
+def _bitmask_search(board, empty_cells, limit, solution_count, stats=None, depth=0):
+    if stats is not None:
+        stats.node(depth)
+        heuristic_start = time.perf_counter()
+
+    # All cells are filled, a solution has been found
+    if not empty_cells:
+        return solution_count + 1
+
+    # Pick the empty cell with the fewest candidates
+    best_pos, best_mask, best_count = -1, 0, 10
+    for pos, idx in enumerate(empty_cells):
+        mask = board.candidates(idx)
+        count = MASK_POPCOUNT[mask]
+        if count < best_count:
+            best_pos, best_mask, best_count = pos, mask, count
+            if count <= 1:
+                break
+
+    if stats is not None:
+        stats.heuristic_time += time.perf_counter() - heuristic_start
+
+    if best_count == 0:
+        return solution_count  # Dead end
+
+    # Remove the chosen cell from the list (swap with the last one) and restore it afterwards
+    idx = empty_cells[best_pos]
+    empty_cells[best_pos] = empty_cells[-1]
+    empty_cells.pop()
+
+    for num in MASK_DIGITS[best_mask]:
+        board.place(idx, num)
+        solution_count = _bitmask_search(board, empty_cells, limit, solution_count, stats, depth + 1)
+        board.remove(idx)
+        if stats is not None:
+            stats.candidate_checks += 1
+            stats.backtracks += 1
+        if solution_count >= limit:
+            break
+
+    empty_cells.append(idx)
+    empty_cells[best_pos], empty_cells[-1] = empty_cells[-1], empty_cells[best_pos]
+
+    return solution_count
+
+# Dancing Links (Algorithm X)
+
+# The exact cover matrix has 729 rows (cell, number) and 324 columns:
+# 81 "cell is filled", 81 "row has number", 81 "column has number" and 81 "box has number"
+DLX_COLUMNS = 324
+DLX_ROWS = 729
+
+_dlx_template = None
+
+def _build_dlx_template():
+    # Node 0 is the root, nodes 1..324 are the column headers, then 4 nodes per matrix row
+    n_nodes = 1 + DLX_COLUMNS + 4 * DLX_ROWS
+    left = [0] * n_nodes
+    right = [0] * n_nodes
+    up = list(range(n_nodes))
+    down = list(range(n_nodes))
+    column = [0] * n_nodes
+    row_of = [-1] * n_nodes
+    size = [0] * (DLX_COLUMNS + 1)
+
+    # Circular list of the column headers
+    for c in range(DLX_COLUMNS + 1):
+        left[c] = c - 1 if c > 0 else DLX_COLUMNS
+        right[c] = c + 1 if c < DLX_COLUMNS else 0
+
+    for row in range(DLX_ROWS):
+        idx, num = divmod(row, 9)
+        r, c, b = CELL_ROW[idx], CELL_COL[idx], CELL_BOX[idx]
+        columns = [1 + idx, 82 + 9 * r + num, 163 + 9 * c + num, 244 + 9 * b + num]
+        first = 1 + DLX_COLUMNS + 4 * row
+        for k, col in enumerate(columns):
+            node = first + k
+            left[node] = first + (k - 1) % 4
+            right[node] = first + (k + 1) % 4
+            column[node] = col
+            row_of[node] = row
+            # Append the node at the bottom of its column
+            up[node] = up[col]
+            down[node] = col
+            down[up[col]] = node
+            up[col] = node
+            size[col] += 1
+
+    return left, right, up, down, column, row_of, size
+
+class DancingLinks:
+    """
+    Sudoku as an exact cover problem, stored as a Dancing Links structure (Knuth's Algorithm X).
+    The clues of the grid are selected when the structure is built.
+    """
+    def __init__(self, grid):
+        global _dlx_template
+        if _dlx_template is None:
+            _dlx_template = _build_dlx_template()
+        left, right, up, down, column, row_of, size = _dlx_template
+
+        # The template is never modified, each instance works on its own copy
+        self.left = left[:]
+        self.right = right[:]
+        self.up = up[:]
+        self.down = down[:]
+        self.column = column
+        self.row_of = row_of
+        self.size = size[:]
+
+        self.clues = []  # Matrix rows of the clues
+        self.partial = []  # Matrix rows chosen by the current search branch
+        self.solution = None  # Matrix rows of the first solution found
+        self.valid = True  # False if the initial clues already conflict
+
+        for idx, num in enumerate(np.asarray(grid).ravel()):
+            if num != 0:
+                self._select(9 * idx + int(num) - 1)
+
+    def _select(self, row):
+        node = 1 + DLX_COLUMNS + 4 * row
+        for k in range(4):
+            col = self.column[node + k]
+            if self.right[self.left[col]] != col:  # Column already covered by another clue
+                self.valid = False
+                return
+        for k in range(4):
+            self._cover(self.column[node + k])
+        self.clues.append(row)
+
+    def _cover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def count(self, limit=2, stats=None):
+        # Count the solutions, stopping as soon as limit solutions are found
+        if stats is not None and stats.begin("dlx"):
+            try:
+                return self.count(limit, stats)
+            finally:
+                stats.end()
+        if not self.valid:
+            return 0
+        return self._search(limit, 0, stats)
+
+    def _search(self, limit, solution_count, stats=None):
+        right, down, size, column = self.right, self.down, self.size, self.column
+        if stats is not None:
+            stats.node(len(self.partial))
+            heuristic_start = time.perf_counter()
+
+        # Every column is covered, a solution has been found
+        if right[0] == 0:
+            if self.solution is None:
+                self.solution = self.clues + self.partial
+            return solution_count + 1
+
+        # Choose the column with the fewest rows
+        best, best_size = 0, DLX_ROWS + 1
+        col = right[0]
+        while col != 0:
+            if size[col] < best_size:
+                best, best_size = col, size[col]
+                if best_size <= 1:
+                    break
+            col = right[col]
+
+        if stats is not None:
+            stats.heuristic_time += time.perf_counter() - heuristic_start
+
+        if best_size == 0:
+            return solution_count  # Dead end
+
+        self._cover(best)
+        i = down[best]
+        while i != best:
+            self.partial.append(self.row_of[i])
+            j = right[i]
+            while j != i:
+                self._cover(column[j])
+                j = right[j]
+
+            solution_count = self._search(limit, solution_count, stats)
+
+            j = self.left[i]
+            while j != i:
+                self._uncover(column[j])
+                j = self.left[j]
+            self.partial.pop()
+            if stats is not None:
+                stats.candidate_checks += 1
+                stats.backtracks += 1
+
+            if solution_count >= limit:
+                break
+            i = down[i]
+        self._uncover(best)
+
+        return solution_count
+
+    def solution_grid(self):
+        # Grid of the first solution found, None if no solution was found
+        if self.solution is None:
+            return None
+        solution = np.zeros((9, 9), dtype=int)
+        for row in self.solution:
+            idx, num = divmod(row, 9)
+            solution[idx // 9][idx % 9] = num + 1
+        return solution
+
+def dlx_solver(grid, limit=2, stats=None):
+    """
+    Count the solutions of the Sudoku grid with Dancing Links (exact cover on the 324-column Sudoku matrix).
+    The count stops as soon as limit solutions are found: with the default limit, 0, 1 or 2 (more than one).
+    The grid is not modified. If a SolverStats is given, it records the work done by the search.
+    """
+    # Check if the grid is valid
+    if not (isinstance(grid, np.ndarray) and grid.ndim == 2 and grid.shape == (9, 9)):
+        raise ValueError("Invalid grid: It should be a 9x9 numpy array.")
+
+    if stats is not None and stats.begin("dlx"):
+        try:
+            return DancingLinks(grid).count(limit, stats)
+        finally:
+            stats.end()
+    return DancingLinks(grid).count(limit)
+
+# Constraint propagation
+
+class BoardGeometry:
+    """
+    Index tables of a n x n board with k x k boxes (n = k * k, cell index = n * row + col), built once per size.
+    Candidates are kept as n-bit integer masks, which stay small ints up to 25 numbers.
+    """
+    def __init__(self, box_size):
+        k, n = box_size, box_size * box_size
+        self.box_size, self.size, self.n_cells = k, n, n * n
+        self.all_digits = (1 << n) - 1
+
+        # The 3n units (rows, columns, boxes) and the peers of each cell
+        self.units = ([[n * r + c for c in range(n)] for r in range(n)]
+                      + [[n * r + c for r in range(n)] for c in range(n)]
+                      + [[n * (k * (b // k) + i) + k * (b % k) + j for i in range(k) for j in range(k)] for b in range(n)])
+        peers = [set() for _ in range(n * n)]
+        for unit in self.units:
+            for idx in unit:
+                peers[idx].update(unit)
+        self.peers = [sorted(peers[idx] - {idx}) for idx in range(n * n)]
+
+        self.row_segments = self._build_segments(transpose=False)
+        self.col_segments = self._build_segments(transpose=True)
+
+    def _build_segments(self, transpose):
+        # Intersection of each row (or column) with each box: segments[line][b] = (cells, rest of the line, rest of the box)
+        k, n = self.box_size, self.size
+        def cell(line, pos):
+            return n * pos + line if transpose else n * line + pos
+        segments = []
+        for line in range(n):
+            line_segments = []
+            for b in range(k):
+                cells = [cell(line, k * b + j) for j in range(k)]
+                line_rest = [cell(line, pos) for pos in range(n) if pos // k != b]
+                box_rest = [cell(other, k * b + j) for other in range(k * (line // k), k * (line // k) + k) if other != line for j in range(k)]
+                line_segments.append((cells, line_rest, box_rest))
+            segments.append(line_segments)
+        return segments
+
+_geometries = {}
+
+# Function to get the shared BoardGeometry of a box size
+def board_geometry(box_size):
+    if box_size not in _geometries:
+        _geometries[box_size] = BoardGeometry(box_size)
+    return _geometries[box_size]
+
+# Function to return, for each mask, the bits that none of the other masks have
+def _exclusive_bits(masks):
+    once = twice = 0
+    for mask in masks:
+        twice |= once & mask
+        once |= mask
+    single = once & ~twice
+    return [mask & single for mask in masks]
+
+class PropagatingBoard:
+    """
+    Sudoku grid (of any size k^2 x k^2) with the candidate mask of every empty cell, reduced by constraint propagation
+    (naked singles, hidden singles and box/line reduction).
+    Every change is recorded on an undo trail, so the search backtracks without copying the state.
+    """
+    def __init__(self, grid):
+        grid = np.asarray(grid)
+        self.geometry = board_geometry(grid_box_size(grid))
+        self.cells = [0] * self.geometry.n_cells
+        self.cand = [self.geometry.all_digits] * self.geometry.n_cells
+        self.trail = []  # (cell index, previous candidates, previous number)
+        self.nodes = 0  # Number of search nodes visited
+        self.node_budget = None  # Value of nodes at which the search gives up
+        self.aborted = False  # True if the last search gave up
+        self.valid = True  # False if the initial clues already conflict
+
+        for idx, num in enumerate(grid.ravel()):
+            if num != 0 and not self.assign(idx, int(num)):
+                self.valid = False
+                break
+        self.trail = []  # The clues are never undone
+
+    def assign(self, idx, num):
+        # Place num in the cell and remove it from the candidates of the peers, False on contradiction
+        bit = 1 << (num - 1)
+        cand, cells, trail = self.cand, self.cells, self.trail
+        if not cand[idx] & bit:
+            return False
+        trail.append((idx, cand[idx], 0))
+        cells[idx] = num
+        cand[idx] = 0
+        for peer in self.geometry.peers[idx]:
+            mask = cand[peer]
+            if mask & bit:
+                trail.append((peer, mask, 0))
+                cand[peer] = mask & ~bit
+                if mask == bit:
+                    return False  # No candidate left for the peer
+        return True
+
+    def unassign(self, idx):
+        # Empty a filled cell and give its number back to the peers it was removed from (recorded on the trail).
+        # Only valid when the candidates are the plain eliminations by the placed numbers (no propagation pending)
+        cand, cells, trail, peers = self.cand, self.cells, self.trail, self.geometry.peers
+        num = cells[idx]
+        bit = 1 << (num - 1)
+        trail.append((idx, cand[idx], num))
+        cells[idx] = 0
+        mask = self.geometry.all_digits
+        for peer in peers[idx]:
+            if cells[peer]:
+                mask &= ~(1 << (cells[peer] - 1))
+        cand[idx] = mask
+        for peer in peers[idx]:
+            if cells[peer] == 0 and not cand[peer] & bit and all(cells[other] != num for other in peers[peer]):
+                trail.append((peer, cand[peer], 0))
+                cand[peer] |= bit
+
+    def eliminate(self, cells, mask):
+        # Remove the numbers of mask from the candidates of the cells, False on contradiction
+        cand, trail, mask = self.cand, self.trail, int(mask)
+        for idx in cells:
+            old = cand[idx]
+            if old & mask:
+                trail.append((idx, old, 0))
+                cand[idx] = old & ~mask
+                if cand[idx] == 0:
+                    return False
+        return True
+
+    def undo(self, mark):
+        # Restore the state recorded when the trail had mark entries
+        cand, cells, trail = self.cand, self.cells, self.trail
+        while len(trail) > mark:
+            idx, old_cand, old_num = trail.pop()
+            cand[idx] = old_cand
+            cells[idx] = old_num
+
+    def propagate(self):
+        # Apply the propagation rules until nothing changes, False on contradiction
+        # A mask has a single number when mask & (mask - 1) == 0, and that number is mask.bit_length()
+        cand, cells, geometry = self.cand, self.cells, self.geometry
+        k, all_digits = geometry.box_size, geometry.all_digits
+        while True:
+            changed = False
+
+            # Naked singles: a cell with a single candidate
+            for idx in range(geometry.n_cells):
+                if cells[idx] == 0:
+                    mask = cand[idx]
+                    if mask == 0:
+                        return False
+                    if mask & (mask - 1) == 0:
+                        if not self.assign(idx, mask.bit_length()):
+                            return False
+                        changed = True
+
+            # Hidden singles: a number with a single possible cell in a unit
+            for unit in geometry.units:
+                once = twice = placed = 0
+                for idx in unit:
+                    mask = cand[idx]
+                    twice |= once & mask
+                    once |= mask
+                    if cells[idx] != 0:
+                        placed |= 1 << (cells[idx] - 1)
+                if once | placed != all_digits:
+                    return False  # A number has no place left in the unit
+                singles = once & ~twice
+                if singles:
+                    for idx in unit:
+                        mask = cand[idx] & singles
+                        if mask:
+                            if mask & (mask - 1):
+                                return False  # The cell would need two numbers
+                            if not self.assign(idx, mask.bit_length()):
+                                return False
+                            changed = True
+
+            if changed:
+                continue
+
+            # Box/line reduction on the intersections of the lines and the boxes
+            n_trail = len(self.trail)
+            for segments in (geometry.row_segments, geometry.col_segments):
+                masks = []
+                for line in segments:
+                    line_masks = []
+                    for segment_cells, _, _ in line:
+                        mask = 0
+                        for idx in segment_cells:
+                            mask |= cand[idx]
+                        line_masks.append(mask)
+                    masks.append(line_masks)
+
+                # Claiming: in a line, a number only possible inside one box is removed from the rest of the box
+                for line, line_masks in enumerate(masks):
+                    for b, only in enumerate(_exclusive_bits(line_masks)):
+                        if only and not self.eliminate(segments[line][b][2], only):
+                            return False
+
+                # Pointing: in a box, a number only possible inside one line is removed from the rest of the line
+                for band in range(k):
+                    for b in range(k):
+                        for i, only in enumerate(_exclusive_bits([masks[k * band + i][b] for i in range(k)])):
+                            if only and not self.eliminate(segments[k * band + i][b][1], only):
+                                return False
+
+            if len(self.trail) == n_trail:
+                return True
+
+    def count(self, limit=2, max_nodes=None, stats=None):
+        # Count the solutions from the current state (stopping at limit), None if more than max_nodes nodes are needed
+        if stats is not None and stats.begin("propagating"):
+            try:
+                return self.count(limit, max_nodes, stats)
+            finally:
+                stats.end()
+        if not self.valid:
+            return 0
+        self.node_budget = None if max_nodes is None else self.nodes + max_nodes
+        self.aborted = False
+
+        mark = len(self.trail)
+        solution_count = _propagating_search(self, limit, 0, stats)
+        self.undo(mark)
+
+        return None if self.aborted else solution_count
+
+    def to_grid(self):
+        return np.array(self.cells, dtype=int).reshape(self.geometry.size, self.geometry.size)
+
+def propagating_solver(grid, limit=2, max_nodes=None, stats=None):
+    """
+    Count the solutions of the Sudoku grid with constraint propagation after every assignment.
+    The next cell is the one with the fewest live candidates (dynamic MRV) and the search undoes its changes with a trail.
+    The count stops as soon as limit solutions are found. The grid is not modified and can be of any size k^2 x k^2.
+    If max_nodes is given and the search needs more nodes, return None.
+    If a SolverStats is given, it records the work done by the search.
+    """
+    # Check if the grid is valid
+    grid_box_size(grid)
+
+    if stats is not None and stats.begin("propagating"):
+        try:
+            return PropagatingBoard(grid).count(limit, max_nodes, stats)
+        finally:
+            stats.end()
+    return PropagatingBoard(grid).count(limit, max_nodes)
+
+def _propagating_search(board, limit, solution_count, stats=None, depth=0):
+    board.nodes += 1
+    if stats is not None:
+        stats.node(depth)
+    if board.node_budget is not None and board.nodes > board.node_budget:
+        board.aborted = True
+        return limit  # Give up, the callers stop at limit
+    if not board.propagate():
+        return solution_count  # Contradiction
+
+    # Pick the empty cell with the fewest live candidates
+    if stats is not None:
+        heuristic_start = time.perf_counter()
+    best_idx, best_count = -1, board.geometry.size + 1
+    cand, cells = board.cand, board.cells
+    for idx in range(board.geometry.n_cells):
+        if cells[idx] == 0 and cand[idx].bit_count() < best_count:
+            best_idx, best_count = idx, cand[idx].bit_count()
+            if best_count == 2:
+                break
+    if stats is not None:
+        stats.heuristic_time += time.perf_counter() - heuristic_start
+
+    # All cells are filled, a solution has been found
+    if best_idx == -1:
+        return solution_count + 1
+
+    # Try the candidates from the lowest number
+    mask = cand[best_idx]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        mark = len(board.trail)
+        if board.assign(best_idx, bit.bit_length()):
+            solution_count = _propagating_search(board, limit, solution_count, stats, depth + 1)
+        board.undo(mark)
+        if stats is not None:
+            stats.candidate_checks += 1
+            stats.backtracks += 1
+        if solution_count >= limit:
+            break
+
+    return solution_count
+
 # Heuristic functions
 
 def degree_heuristic(grid, empty_cells):
@@ -194,7 +1026,7 @@ def degree_heuristic(grid, empty_cells):
     Degree Heuristic: prioritise les variables impliquées dans le plus grand nombre de contraintes.
     """
     # Sort the empty cells by the number of constraints
-    empty_cells.sort(key=lambda x: sum(1 for r in range(9) if grid[r][x[1]] != 0) + sum(1 for c in range(9) if grid[x[0]][c] != 0), reverse=True)
+    empty_cells.sort(key=lambda x: sum(1 for r in range(len(grid)) if grid[r][x[1]] != 0) + sum(1 for c in range(len(grid)) if grid[x[0]][c] != 0), reverse=True)
     return empty_cells
 
 def mrv_heuristic(grid, empty_cells):
@@ -202,7 +1034,7 @@ def mrv_heuristic(grid, empty_cells):
     Minimum Remaining Values (MRV) Heuristic: prioritise les variables avec le moins de valeurs restantes.
     """
     # Sort the empty cells by the number of remaining values
-    empty_cells.sort(key=lambda x: len([num for num in range(1, 10) if check_cell(grid, x[0], x[1], num)]))
+    empty_cells.sort(key=lambda x: len([num for num in range(1, len(grid) + 1) if check_cell(grid, x[0], x[1], num)]))
     return empty_cells
 
 def lcv_heuristic(grid, row, col):
@@ -210,10 +1042,10 @@ def lcv_heuristic(grid, row, col):
     Least Constraining Value (LCV) Heuristic: prioritize the values that rule out the fewest values in neighboring cells.
     """
     lcv = []
-    for num in range(1, 10):
+    for num in range(1, len(grid) + 1):
         if check_cell(grid, row, col, num):
             count = 0
-            for i in range(9):
+            for i in range(len(grid)):
                 if grid[row][i] == 0 and check_cell(grid, row, i, num):
                     count += 1
                 if grid[i][col] == 0 and check_cell(grid, i, col, num):
@@ -0,0 +1,163 @@
+import numpy as np
+import json
+import os
+import re
+import struct
+
+# File layout:
+#   header: magic, version, packing, difficulty, header size, record size, metadata (JSON, padded with spaces)
+#   records: one fixed-size record per (puzzle, solution) pair, appended at the end of the file
+# The number of records is given by the file size, so appending never rewrites the header.
+
+MAGIC = b"SUDOKUST"
+VERSION = 1
+HEADER_FORMAT = "<8sHBBII"  # magic, version, packing, difficulty, header size, record size
+HEADER_SIZE = 256  # Default header size, including the metadata
+
+# Packing of a record
+#   "uint8": 81 bytes for the puzzle then 81 bytes for the solution
+#   "nibble": 81 bytes, puzzle in the high nibble and solution in the low nibble of each cell
+PACKINGS = {"uint8": 0, "nibble": 1}
+RECORD_SIZES = {"uint8": 162, "nibble": 81}
+
+# Difficulty codes, 0 for a store mixing difficulties
+DIFFICULTIES = {None: 0, "easy": 1, "medium": 2, "hard": 3, "expert": 4}
+
+class PuzzleStore:
+    """
+    Append-only file of (puzzle, solution) pairs stored in fixed-size records.
+    The records are read through numpy.memmap, so indexing and slicing only read the selected records.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            fixed = f.read(struct.calcsize(HEADER_FORMAT))
+            magic, version, packing, difficulty, header_size, record_size = struct.unpack(HEADER_FORMAT, fixed)
+            if magic != MAGIC:
+                raise ValueError(f"Invalid puzzle store: {path}")
+            if version != VERSION:
+                raise ValueError(f"Unsupported puzzle store version: {version}")
+            metadata = f.read(header_size - len(fixed)).decode().strip()
+
+        self.packing = {code: name for name, code in PACKINGS.items()}[packing]
+        self.difficulty = {code: name for name, code in DIFFICULTIES.items()}[difficulty]
+        self.header_size = header_size
+        self.record_size = record_size
+        self.metadata = json.loads(metadata) if metadata else {}
+        self._records = None
+
+    @classmethod
+    def create(cls, path, difficulty=None, packing="nibble", metadata=None, overwrite=False):
+        """
+        Create an empty store and return it. metadata is a JSON-serializable dict kept in the header.
+        """
+        if packing not in PACKINGS:
+            raise ValueError(f"Invalid packing: {packing}")
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Invalid difficulty: {difficulty}")
+        if os.path.exists(path) and not overwrite:
+            raise FileExistsError(f"Puzzle store already exists: {path}")
+
+        metadata = json.dumps(metadata or {}).encode()
+        header_size = HEADER_SIZE
+        fixed_size = struct.calcsize(HEADER_FORMAT)
+        while fixed_size + len(metadata) > header_size:
+            header_size *= 2
+
+        fixed = struct.pack(HEADER_FORMAT, MAGIC, VERSION, PACKINGS[packing], DIFFICULTIES[difficulty], header_size, RECORD_SIZES[packing])
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(fixed + metadata.ljust(header_size - fixed_size))
+
+        return cls(path)
+
+    def __len__(self):
+        return (os.path.getsize(self.path) - self.header_size) // self.record_size
+
+    @property
+    def records(self):
+        # Raw records as a (N, record_size) uint8 memmap, reopened after each append
+        n = len(self)
+        if self._records is None or self._records.shape[0] != n:
+            if n == 0:
+                return np.zeros((0, self.record_size), dtype=np.uint8)
+            self._records = np.memmap(self.path, dtype=np.uint8, mode="r", offset=self.header_size, shape=(n, self.record_size))
+        return self._records
+
+    def encode(self, puzzles, solutions):
+        # Pack (N, 9, 9) puzzles and solutions into (N, record_size) records
+        puzzles = np.asarray(puzzles, dtype=np.uint8).reshape(-1, 81)
+        solutions = np.asarray(solutions, dtype=np.uint8).reshape(-1, 81)
+        if puzzles.shape != solutions.shape:
+            raise ValueError("Invalid grids: There should be as many puzzles as solutions.")
+        if self.packing == "nibble":
+            return (puzzles << 4) | solutions
+        return np.concatenate([puzzles, solutions], axis=1)
+
+    def decode(self, records):
+        # Unpack records into (N, 9, 9) puzzles and solutions
+        if self.packing == "nibble":
+            return (records >> 4).reshape(-1, 9, 9), (records & 0x0F).reshape(-1, 9, 9)
+        return records[:, :81].reshape(-1, 9, 9), records[:, 81:].reshape(-1, 9, 9)
+
+    def append(self, puzzles, solutions):
+        """
+        Append puzzles and solutions, given as (9, 9) grids or (N, 9, 9) stacks, at the end of the store.
+        """
+        records = self.encode(puzzles, solutions)
+        with open(self.path, "ab") as f:
+            f.write(records.tobytes())
+
+    def __getitem__(self, key):
+        """
+        Return the puzzles and solutions of the selected records (an index, a slice or an array of indices)
+        as two (N, 9, 9) uint8 arrays (or two (9, 9) arrays for an integer index).
+        With the uint8 packing, slices are views of the file.
+        """
+        if isinstance(key, (int, np.integer)):
+            puzzles, solutions = self.decode(self.records[[key]])
+            return puzzles[0], solutions[0]
+        return self.decode(self.records[key])
+
+    @property
+    def puzzles(self):
+        return self[:][0]
+
+    @property
+    def solutions(self):
+        return self[:][1]
+
+# Function to import the text grids saved by save_grid into a store
+def import_grids(store, folder_path=None):
+    """
+    Append the grids of the folder (solution_{difficulty}_{n}.txt and grid_{difficulty}_{n}.txt) to the store.
+    Only the files of the store difficulty are imported, unless the store mixes difficulties.
+    A solution without a puzzle file of the same number is imported with an empty puzzle.
+    Returns the number of imported pairs.
+    """
+    if folder_path is None:
+        folder_path = os.path.join(os.path.dirname(__file__), "../../data/grids/")
+
+    pattern = re.compile(r"^(solution|grid)_(\w+?)_(\d+)\.txt$")
+    files = {}
+    for file_name in os.listdir(folder_path):
+        match = pattern.match(file_name)
+        if match and match.group(2) in DIFFICULTIES and store.difficulty in (None, match.group(2)):
+            kind, difficulty, number = match.group(1), match.group(2), int(match.group(3))
+            files.setdefault((difficulty, number), {})[kind] = os.path.join(folder_path, file_name)
+
+    puzzles, solutions = [], []
+    for key in sorted(files, key=lambda k: (DIFFICULTIES[k[0]], k[1])):
+        if "solution" not in files[key]:
+            continue
+        solution = np.loadtxt(files[key]["solution"], dtype=np.uint8).reshape(9, 9)
+        if "grid" in files[key]:
+            puzzle = np.loadtxt(files[key]["grid"], dtype=np.uint8).reshape(9, 9)
+        else:
+            puzzle = np.zeros((9, 9), dtype=np.uint8)
+        puzzles.append(puzzle)
+        solutions.append(solution)
+
+    if puzzles:
+        store.append(np.stack(puzzles), np.stack(solutions))
+    return len(puzzles)
@@ -0,0 +1,161 @@
+import math
+
+# Incremental scoring of a board: the number of times each number appears in each row, column and box
+# is kept up to date, so a placement or an erasure is scored in constant time (no rescan of the board).
+# Conflicts are counted as pairs of equal numbers in the same unit (a number 3 times in a row makes 3 pairs).
+
+# Default shaped rewards
+DEFAULT_REWARDS = {
+    "place": 0.1,  # Number placed in an empty cell
+    "erase": -0.1,  # Number erased
+    "conflict": -1.0,  # Per conflict created (the opposite per conflict removed)
+    "solved": 10.0,  # Bonus when the board is complete without conflict
+    "invalid": -1.0,  # Move on a cell of the initial grid or out of range, the board is not changed
+}
+
+class UnitCounts:
+    """
+    Counts of each number in each row, column and box of a n x n board (n = k * k), with the number of conflicts
+    and of filled cells. grid is a list of lists or an array, it is copied.
+    """
+    def __init__(self, grid):
+        self.size = len(grid)
+        self.box_size = math.isqrt(self.size)
+        if self.box_size * self.box_size != self.size:
+            raise ValueError(f"Invalid grid: size {self.size} is not a square.")
+
+        self.grid = [[int(grid[i][j]) for j in range(self.size)] for i in range(self.size)]
+        self.rows = [[0] * (self.size + 1) for _ in range(self.size)]
+        self.cols = [[0] * (self.size + 1) for _ in range(self.size)]
+        self.boxes = [[0] * (self.size + 1) for _ in range(self.size)]
+        self.conflicts = 0
+        self.filled = 0
+
+        for i in range(self.size):
+            for j in range(self.size):
+                num = self.grid[i][j]
+                if num:
+                    if not 1 <= num <= self.size:
+                        raise ValueError(f"Invalid grid: number {num} at ({i}, {j}).")
+                    self._add(i, j, num)
+
+    def box(self, row, col):
+        return self.box_size * (row // self.box_size) + col // self.box_size
+
+    @property
+    def solved(self):
+        return self.filled == self.size * self.size and self.conflicts == 0
+
+    def _add(self, row, col, num):
+        # Count num at (row, col), return the number of conflicts created
+        num = int(num)
+        row_counts, col_counts, box_counts = self.rows[row], self.cols[col], self.boxes[self.box(row, col)]
+        delta = row_counts[num] + col_counts[num] + box_counts[num]
+        row_counts[num] += 1
+        col_counts[num] += 1
+        box_counts[num] += 1
+        self.grid[row][col] = num
+        self.conflicts += delta
+        self.filled += 1
+        return delta
+
+    def _remove(self, row, col):
+        # Remove the number at (row, col), return the number of conflicts removed
+        num = self.grid[row][col]
+        row_counts, col_counts, box_counts = self.rows[row], self.cols[col], self.boxes[self.box(row, col)]
+        row_counts[num] -= 1
+        col_counts[num] -= 1
+        box_counts[num] -= 1
+        delta = row_counts[num] + col_counts[num] + box_counts[num]
+        self.grid[row][col] = 0
+        self.conflicts -= delta
+        self.filled -= 1
+        return delta
+
+    def place(self, row, col, num):
+        """
+        Place num at (row, col), replacing the current number if any. Return the change in the number of conflicts.
+        """
+        delta = -self._remove(row, col) if self.grid[row][col] else 0
+        return delta + self._add(row, col, num)
+
+    def erase(self, row, col):
+        """
+        Erase the number at (row, col). Return the change in the number of conflicts (0 or negative).
+        """
+        return -self._remove(row, col) if self.grid[row][col] else 0
+
+class RewardTracker(UnitCounts):
+    """
+    Score the moves of an agent on a puzzle: place and erase return (reward, conflict delta, solved) for the move.
+    The numbers of the initial grid cannot be changed.
+    """
+    def __init__(self, initial_grid, rewards=None):
+        super().__init__(initial_grid)
+        self.rewards = dict(DEFAULT_REWARDS, **(rewards or {}))
+        self.fixed = [[num != 0 for num in row] for row in self.grid]
+
+    def _valid_move(self, row, col, num=1):
+        return 0 <= row < self.size and 0 <= col < self.size and 1 <= num <= self.size and not self.fixed[row][col]
+
+    def place(self, row, col, num):
+        if not self._valid_move(row, col, num):
+            return self.rewards["invalid"], 0, self.solved
+        reward = self.rewards["place"] if self.grid[row][col] == 0 else 0.0
+        delta = super().place(row, col, num)
+        solved = self.solved
+        reward += self.rewards["conflict"] * delta + (self.rewards["solved"] if solved else 0.0)
+        return reward, delta, solved
+
+    def erase(self, row, col):
+        if not self._valid_move(row, col) or self.grid[row][col] == 0:
+            return self.rewards["invalid"], 0, self.solved
+        delta = super().erase(row, col)
+        return self.rewards["erase"] + self.rewards["conflict"] * delta, delta, False
+
+class ConflictTracker(UnitCounts):
+    """
+    Keep the set of conflicting cells (cells whose number is repeated in their row, column or box) up to date.
+    A placement or an erasure only revisits the cells holding the same number in the same row, column and box,
+    so other cells gaining or losing a conflict are updated too, without scanning the board.
+    """
+    def __init__(self, grid):
+        self.size = len(grid)
+        # Cells holding each number, per unit (rows, then columns, then boxes)
+        self.positions = [[set() for _ in range(self.size + 1)] for _ in range(3 * self.size)]
+        self.conflicting = set()
+        super().__init__(grid)
+
+    def _units(self, row, col):
+        return row, self.size + col, 2 * self.size + self.box(row, col)
+
+    def _in_conflict(self, row, col):
+        num = self.grid[row][col]
+        return num != 0 and (self.rows[row][num] > 1 or self.cols[col][num] > 1 or self.boxes[self.box(row, col)][num] > 1)
+
+    def _refresh(self, row, col, num):
+        # Update the status of the cells holding num in the units of (row, col), and of (row, col) itself
+        cells = {(row, col)}
+        for unit in self._units(row, col):
+            cells.update(self.positions[unit][num])
+        for cell in cells:
+            if self._in_conflict(*cell):
+                self.conflicting.add(cell)
+            else:
+                self.conflicting.discard(cell)
+
+    def _add(self, row, col, num):
+        delta = super()._add(row, col, num)
+        for unit in self._units(row, col):
+            self.positions[unit][int(num)].add((row, col))
+        if delta:
+            self._refresh(row, col, int(num))
+        return delta
+
+    def _remove(self, row, col):
+        num = self.grid[row][col]
+        delta = super()._remove(row, col)
+        for unit in self._units(row, col):
+            self.positions[unit][num].discard((row, col))
+        self._refresh(row, col, num)
+        return delta
@@ -0,0 +1,132 @@
+import sys
+import os
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+
+from src.dqn.sudoku_dataset import iter_csv_chunks, load_dataset, iter_minibatches, convert_csv
+from src.generator.solution_factory import generate_solutions, transform_grids
+from src.dqn.sudoku_env import SudokuEnv
+from src.dqn.replay_buffer import ReplayBuffer, pack_boards, unpack_boards
+from src.solver.batch_validation import candidate_masks
+
+def write_csv(path, puzzles, solutions, header="puzzle,solution", newline="\n"):
+    with open(path, "w", newline="") as f:
+        f.write(header + newline)
+        rows = [f"{''.join(map(str, p.ravel()))},{''.join(map(str, s.ravel()))}" for p, s in zip(puzzles, solutions)]
+        f.write(newline.join(rows))  # No line ending after the last row
+
+def test_csv_loader(tmp_path):
+    rng = np.random.default_rng(0)
+    solutions = generate_solutions(1000, rng=rng)
+    puzzles = solutions * (rng.random(solutions.shape) < 0.4)
+
+    csv_path = str(tmp_path / "sudoku.csv")
+    write_csv(csv_path, puzzles, solutions, newline="\r\n")
+    chunks = [(p.copy(), s.copy()) for p, s in iter_csv_chunks(csv_path, chunk_size=300)]
+    assert [len(p) for p, _ in chunks] == [300, 300, 300, 100]
+    assert np.array_equal(np.concatenate([p for p, _ in chunks]), puzzles)
+    assert np.array_equal(np.concatenate([s for _, s in chunks]), solutions)
+
+    # Columns in the other order, "." for empty cells
+    write_csv(csv_path, solutions[:5], puzzles[:5], header="solutions,quizzes")
+    with open(csv_path) as f:
+        content = f.read()
+    with open(csv_path, "w") as f:
+        f.write(content.replace("0", "."))
+    loaded_puzzles, loaded_solutions = next(iter_csv_chunks(csv_path))
+    assert np.array_equal(loaded_puzzles, puzzles[:5]) and np.array_equal(loaded_solutions, solutions[:5])
+
+    # Puzzles equivalent to a previous row are skipped with a dedup index
+    write_csv(csv_path, np.concatenate([puzzles[:50], transform_grids(puzzles[:50], rng)]), np.concatenate([solutions[:50]] * 2))
+    store = convert_csv(csv_path, str(tmp_path / "dedup.store"), chunk_size=30, verbose=False, dedup_path=str(tmp_path / "dedup.index"))
+    assert len(store) == 50 and np.array_equal(store.puzzles, puzzles[:50])
+
+def test_dataset_minibatches(tmp_path):
+    rng = np.random.default_rng(1)
+    solutions = generate_solutions(500, rng=rng)
+    puzzles = solutions * (rng.random(solutions.shape) < 0.4)
+    csv_path = str(tmp_path / "sudoku.csv")
+    write_csv(csv_path, puzzles, solutions)
+
+    store = load_dataset(csv_path, chunk_size=128)
+    assert len(store) == 500 and os.path.exists(str(tmp_path / "sudoku.store"))
+
+    # One epoch covers every pair once, with puzzles and solutions still aligned
+    batches = list(iter_minibatches(store, 64, rng=rng))
+    assert [len(p) for p, _ in batches] == [64] * 7 + [52]
+    seen_puzzles = np.concatenate([p for p, _ in batches]).reshape(500, 81)
+    seen_solutions = np.concatenate([s for _, s in batches]).reshape(500, 81)
+    order = np.lexsort(seen_solutions.T)
+    expected = np.lexsort(solutions.reshape(500, 81).T)
+    assert np.array_equal(seen_solutions[order], solutions.reshape(500, 81)[expected])
+    assert np.array_equal(seen_puzzles[order], puzzles.reshape(500, 81)[expected])
+    assert len(list(iter_minibatches(store, 64, drop_last=True))) == 7
+
+def test_sudoku_env():
+    rng = np.random.default_rng(2)
+    solutions = generate_solutions(64, rng=rng)
+    # 30 empty cells on every board, so that all the boards are solved at the same step
+    holes = np.argsort(rng.random((64, 81)), axis=1)[:, :30]
+    puzzles = solutions.reshape(64, 81).copy()
+    puzzles[np.arange(64)[:, None], holes] = 0
+    puzzles = puzzles.reshape(64, 9, 9)
+    # The source gives the puzzles, then empty grids
+    sources = [puzzles, np.zeros_like(puzzles)]
+    env = SudokuEnv(64, lambda k, rng: sources.pop(0)[:k], rng=rng)
+    boards, masks = env.reset()
+    assert np.array_equal(boards, puzzles)
+    assert np.array_equal(masks, candidate_masks(puzzles).reshape(64, 729))
+
+    # An illegal action (filled cell) does not change the board
+    filled = np.argmax(puzzles.reshape(64, 81) != 0, axis=1)
+    _, rewards, dones, _, _ = env.step(9 * filled)
+    assert np.array_equal(env.boards, puzzles) and (rewards == -1).all() and not dones.any()
+
+    # Following the solutions solves every board
+    total = np.zeros(64)
+    for _ in range(81):
+        empty = env.boards.reshape(64, 81) == 0
+        if not empty.any():
+            break
+        cells = np.argmax(empty, axis=1)
+        actions = 9 * cells + solutions.reshape(64, 81)[np.arange(64), cells] - 1
+        boards, rewards, dones, masks, info = env.step(actions)
+        total += rewards
+        if dones.any():
+            break
+    assert dones.all() and info["solved"].all() and np.array_equal(info["final_boards"], solutions)
+    assert (total == 30 + 10).all()
+
+    # The finished boards were reset from the source (here empty grids)
+    assert (boards == 0).all() and masks.all()
+
+def test_replay_buffer():
+    rng = np.random.default_rng(0)
+    boards = generate_solutions(20, rng=rng) * (rng.random((20, 9, 9)) < 0.5)
+    for packing in ["nibble", "uint8"]:
+        assert np.array_equal(unpack_boards(pack_boards(boards, packing), packing), boards)
+
+    # Ring buffer: the 30 transitions overwrite the 10 oldest ones
+    buffer = ReplayBuffer(20, rng=rng)
+    actions = np.arange(30) * 24
+    for start in range(0, 30, 6):
+        part = slice(start, start + 6)
+        buffer.add(np.roll(boards, start, axis=0)[:6], actions[part], actions[part] / 10, boards[:6], actions[part] % 2 == 0)
+    assert len(buffer) == 20 and buffer.position == 10
+    assert buffer.states.shape == (20, 41)
+    batch = buffer.sample(64)
+    assert batch["states"].shape == (64, 9, 9) and batch["states"].dtype == np.uint8
+    assert set(batch["actions"]) <= set(actions[10:])
+    assert np.allclose(batch["rewards"], batch["actions"] / 10)
+    assert np.array_equal(batch["dones"], batch["actions"] % 2 == 0)
+
+    # Prioritized sampling follows the priorities
+    buffer = ReplayBuffer(100, prioritized=True, alpha=1.0, rng=rng)
+    buffer.add(boards[:10].repeat(10, axis=0), np.arange(100), np.zeros(100), boards[:10].repeat(10, axis=0), np.zeros(100))
+    buffer.update_priorities(np.arange(100), np.where(np.arange(100) < 50, 0.0, 1.0))
+    batch = buffer.sample(1000)
+    assert (batch["indices"] >= 50).all()
+    assert np.allclose(batch["weights"], 1.0)
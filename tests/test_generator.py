@@ -0,0 +1,178 @@
+import sys
+import os
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pytest
+
+from src.generator.grid_generator import generate_grid, dig_holes
+from src.generator.solution_factory import load_seed_grids, generate_solutions, transform_grids
+from src.generator.bulk_generator import generate_bulk, read_done
+from src.generator.puzzle_prefetcher import PuzzlePrefetcher, MAX_FAILURES
+from src.generator.canonical_form import canonicalize, canonical_form, apply_transform, invert_transform, DedupIndex
+from src.solver.sudoku_solvers import dlx_solver, propagating_solver, milp_solver
+from src.solver.batch_validation import validate_grids
+from src.solver.benchmark import load_corpus
+
+def test_incremental_generation():
+    np.random.seed(0)
+    for difficulty in ["easy", "expert"]:
+        solution_grid, grid = generate_grid(difficulty=difficulty, mode="incremental")
+        assert validate_grids(solution_grid[None])[0]
+
+        # The puzzle is a unique sub-grid of the solution
+        clues = grid != 0
+        assert np.array_equal(grid[clues], solution_grid[clues])
+        assert dlx_solver(grid) == 1
+
+def test_random_generation():
+    np.random.seed(5)
+    for difficulty in ["easy", "medium"]:
+        solution_grid, grid = generate_grid(difficulty=difficulty, mode="random")
+        clues = grid != 0
+        assert np.array_equal(grid[clues], solution_grid[clues])
+        assert dlx_solver(grid) == 1
+    
+    # Random removals rarely give a unique expert puzzle, the retries are bounded
+    np.random.seed(0)
+    with pytest.raises(RuntimeError):
+        generate_grid(difficulty="expert", mode="random")
+    with pytest.raises(ValueError):
+        generate_grid(difficulty="easy", mode="unknown")
+
+def test_dig_holes_budget():
+    np.random.seed(1)
+    solution_grid, _ = generate_grid(difficulty="easy", mode="incremental")
+
+    # Without any search node, only the removals proven by propagation alone are kept
+    grid = dig_holes(solution_grid, "expert", max_nodes=0)
+    assert dlx_solver(grid) == 1
+
+def test_solution_factory():
+    rng = np.random.default_rng(0)
+    seed_grids = load_seed_grids()
+    assert validate_grids(seed_grids).all()
+
+    solutions = generate_solutions(5000, seed_grids, rng)
+    assert solutions.shape == (5000, 9, 9) and solutions.dtype == np.uint8
+    assert validate_grids(solutions).all()
+
+    # Puzzles keep their empty cells and their uniqueness
+    _, grid = generate_grid(difficulty="hard", mode="incremental")
+    puzzles = transform_grids(np.repeat(grid[None], 5, axis=0), rng)
+    for puzzle in puzzles:
+        assert (puzzle == 0).sum() == (grid == 0).sum()
+        assert dlx_solver(puzzle.astype(int)) == 1
+
+def test_bulk_generation(tmp_path):
+    output_path = str(tmp_path / "puzzles.txt")
+    assert generate_bulk(output_path, 3, ["easy", "hard"], workers=2, seed=7, verbose=False) == 6
+    with open(output_path) as f:
+        lines = sorted(f.readlines())
+
+    # Simulate an interruption in the middle of a line, the run is resumed with the same puzzles
+    with open(output_path, "w") as f:
+        f.write("".join(lines[:2]) + lines[2][:50])
+    assert read_done(output_path) == {(line.split()[0], int(line.split()[1])) for line in lines[:2]}
+    assert generate_bulk(output_path, 3, ["easy", "hard"], workers=1, seed=7, verbose=False) == 4
+    with open(output_path) as f:
+        assert sorted(f.readlines()) == lines
+
+def test_puzzle_prefetcher():
+    prefetcher = PuzzlePrefetcher(difficulties=["easy", "hard"], queue_size=2, mode="incremental", seed=0)
+    try:
+        for _ in range(3):
+            solution_grid, grid = prefetcher.get("hard", block=True, timeout=60)
+            assert validate_grids(solution_grid[None])[0]
+            assert dlx_solver(grid) == 1
+
+        # The queues stay bounded: ready + pending never exceeds queue_size
+        for difficulty in ["easy", "hard"]:
+            assert prefetcher.available(difficulty) + prefetcher.pending[difficulty] == 2
+    finally:
+        prefetcher.close()
+
+def test_puzzle_prefetcher_failure():
+    # A generation that always fails is given up after MAX_FAILURES tries, and get() reports it
+    prefetcher = PuzzlePrefetcher(difficulties=["easy"], queue_size=2, mode="unknown", seed=0)
+    try:
+        with pytest.raises(RuntimeError) as excinfo:
+            prefetcher.get("easy", block=True, timeout=60)
+        assert isinstance(excinfo.value.__cause__, ValueError)
+        assert prefetcher.next_index["easy"] < MAX_FAILURES + 2
+        with pytest.raises(RuntimeError):
+            prefetcher.get("easy")
+    finally:
+        prefetcher.close()
+
+def test_board_sizes_generation():
+    np.random.seed(3)
+    for box_size in (2, 4):
+        size = box_size * box_size
+        solution_grid, grid = generate_grid(difficulty="medium", mode="incremental", box_size=box_size)
+        assert grid.shape == (size, size)
+        assert validate_grids(solution_grid[None])[0]
+        clues = grid != 0
+        assert np.array_equal(grid[clues], solution_grid[clues]) and not clues.all()
+        assert propagating_solver(grid) == 1
+    
+    transformed = transform_grids(generate_solutions(10, box_size=4), np.random.default_rng(0))
+    assert validate_grids(transformed).all()
+
+def first_appearance(grid):
+    # Relabel the numbers of a grid in order of first appearance
+    labels = {0: 0}
+    return tuple(labels.setdefault(int(num), len(labels)) for num in np.ravel(grid))
+
+def test_canonical_form():
+    rng = np.random.default_rng(0)
+    puzzles = np.array(load_corpus("hard")[0] + load_corpus("expert")[0], dtype=np.uint8)
+    canonical, transforms = canonicalize(puzzles)
+    assert len(set(map(bytes, canonical))) == len(puzzles)
+    
+    # Same canonical form for every transformation of a puzzle, and never above a transformed puzzle
+    for _ in range(3):
+        transformed = transform_grids(puzzles, rng)
+        assert np.array_equal(canonicalize(transformed)[0], canonical)
+        assert all(tuple(c.ravel()) <= first_appearance(t) for c, t in zip(canonical, transformed))
+    
+    # The transformation maps the puzzle to its canonical form, and the canonical solution back to the solution
+    puzzle = puzzles[0].astype(int)
+    _, solution = milp_solver(puzzle, return_solution=True)
+    form, transform = canonical_form(puzzle)
+    assert np.array_equal(form, canonical[0]) and np.array_equal(apply_transform(puzzle, transform), form)
+    canonical_solution = apply_transform(solution, transform)
+    assert validate_grids(canonical_solution[None])[0] and np.array_equal(canonical_solution[form != 0], form[form != 0])
+    assert np.array_equal(invert_transform(canonical_solution, transform), solution)
+    
+    # Exhaustive check on 4x4 puzzles: 2 orientations x 8 row permutations x 8 column permutations
+    perms = [[0, 1, 2, 3], [1, 0, 2, 3], [0, 1, 3, 2], [1, 0, 3, 2], [2, 3, 0, 1], [3, 2, 0, 1], [2, 3, 1, 0], [3, 2, 1, 0]]
+    for grid in generate_solutions(20, rng=rng, box_size=2):
+        grid[rng.random((4, 4)) < 0.5] = 0
+        best = min(first_appearance(g[np.ix_(rows, cols)]) for g in (grid, grid.T) for rows in perms for cols in perms)
+        assert tuple(canonical_form(grid)[0].ravel()) == best
+
+def test_dedup_index(tmp_path):
+    rng = np.random.default_rng(1)
+    puzzles = np.array(load_corpus("medium")[0], dtype=np.uint8)
+    index_path = str(tmp_path / "puzzles.dedup")
+    index = DedupIndex(index_path)
+    assert index.add_many(puzzles).all() and len(index) == len(puzzles)
+    
+    # Equivalent puzzles are duplicates, also after reopening the index
+    index = DedupIndex(index_path)
+    transformed = transform_grids(puzzles, rng)
+    assert not index.add_many(transformed).any() and transformed[0] in index
+    assert index.add_many(np.stack([puzzles[1], puzzles[1]])).tolist() == [False, False]
+    
+    # Bulk generation with the index: a second run of the same tasks only gives new puzzles
+    output_path = str(tmp_path / "puzzles.txt")
+    generate_bulk(output_path, 2, ["easy"], workers=1, seed=3, verbose=False, dedup_path=index_path)
+    generate_bulk(str(tmp_path / "other.txt"), 2, ["easy"], workers=1, seed=3, verbose=False, dedup_path=index_path)
+    with open(output_path) as f, open(str(tmp_path / "other.txt")) as g:
+        lines = f.readlines() + g.readlines()
+    grids = np.array([[int(c) for c in line.split()[2]] for line in lines], dtype=np.uint8).reshape(-1, 9, 9)
+    assert len(grids) == 4 and len(set(map(bytes, canonicalize(grids)[0]))) == 4
+
@@ -1,12 +1,32 @@
 import sys
 import os
+import asyncio
+import json
+import signal
+import threading
 
 # Add the root directory to the path in order to import the modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 
 import numpy as np
+import pytest
 
 from src.solver.sudoku_solvers import backtracking_solver, lp_solver, degree_heuristic, mrv_heuristic, lcv_heuristic
+from src.solver.sudoku_solvers import bitmask_solver, BitmaskBoard, MASK_DIGITS, dlx_solver, DancingLinks
+from src.solver.sudoku_solvers import propagating_solver, PropagatingBoard, check_cell, check_grid
+from src.solver.sudoku_solvers import milp_solver, LPModel
+from src.solver.solver_stats import SolverStats
+from src.solver.benchmark import run_benchmark, compare_reports, load_corpus, measure_cold_start, CORPORA
+from src.solver.backends import get_solver, load_backend, loaded_backends
+from src.solver.batch_validation import check_grids, candidate_masks
+from src.solver.parallel_counting import parallel_count, split_grid
+from src.solver.solution_cache import SolutionCache, set_solution_cache
+from src.solver.sudoku_solvers import place_hint
+from src.solver import portfolio as portfolio_module
+from src.solver.portfolio import Portfolio, puzzle_features, feature_bucket, DEFAULT_BACKEND, MIN_BUCKET_RACES
+from src.solver import solve_service
+from src.solver.solve_service import SolveService, stream_results, solve_batch, parse_puzzle, format_grid
+from src.generator.solution_factory import generate_solutions
 
 def test_backtracking_solver(grid, heuristic=None):
     solution = backtracking_solver(grid, heuristic=heuristic)
@@ -27,19 +47,437 @@ def test_lp_solver(grid):
         print("No solution exists.")
         
 
+# Example of a Sudoku grid
+EXAMPLE_GRID = np.array([
+    [5, 3, 0, 0, 7, 0, 0, 0, 0],
+    [6, 0, 0, 1, 9, 5, 0, 0, 0],
+    [0, 9, 8, 0, 0, 0, 0, 6, 0],
+    [8, 0, 0, 0, 6, 0, 0, 0, 3],
+    [4, 0, 0, 8, 0, 3, 0, 0, 1],
+    [7, 0, 0, 0, 2, 0, 0, 0, 6],
+    [0, 6, 0, 0, 0, 0, 2, 8, 0],
+    [0, 0, 0, 4, 1, 9, 0, 0, 5],
+    [0, 0, 0, 0, 8, 0, 0, 7, 9]
+])
+
+def test_bitmask_solver():
+    grid = np.copy(EXAMPLE_GRID)
+    assert bitmask_solver(grid) == 1
+    assert np.array_equal(grid, EXAMPLE_GRID)  # The grid is not modified
+    
+    # Removing clues gives several solutions
+    grid[0, :] = 0
+    grid[1, :] = 0
+    assert bitmask_solver(grid) == 2
+    assert bitmask_solver(grid, limit=5) == 5
+    
+    # Conflicting clues have no solution
+    grid = np.copy(EXAMPLE_GRID)
+    grid[0, 2] = 5
+    assert bitmask_solver(grid) == 0
+    
+def test_bitmask_board():
+    board = BitmaskBoard(EXAMPLE_GRID)
+    # Cell (0, 2): 5, 3, 7 in the row, 8 in the column, 6, 9 in the box
+    assert MASK_DIGITS[board.candidates(2)] == [1, 2, 4]
+    board.place(2, 4)
+    assert MASK_DIGITS[board.candidates(3)] == [2, 6]
+    board.remove(2)
+    assert np.array_equal(board.to_grid(), EXAMPLE_GRID)
+
+# Hard puzzle with few clues (17-clue puzzle)
+MINIMAL_GRID = np.array([int(c) for c in
+    "000000010400000000020000000000050407008000300001090000300400200050100000000806000"]).reshape(9, 9)
+
+def test_dlx_solver():
+    assert dlx_solver(EXAMPLE_GRID) == 1
+    assert dlx_solver(MINIMAL_GRID) == 1
+    
+    # The solution is a complete valid grid extending the clues
+    dlx = DancingLinks(EXAMPLE_GRID)
+    assert dlx.count(limit=1) == 1
+    solution = dlx.solution_grid()
+    clues = EXAMPLE_GRID != 0
+    assert np.array_equal(solution[clues], EXAMPLE_GRID[clues])
+    assert bitmask_solver(solution) == 1
+    
+    # The count stops at the limit
+    grid = np.copy(EXAMPLE_GRID)
+    grid[:3, :] = 0
+    assert dlx_solver(grid) == 2
+    assert dlx_solver(grid, limit=7) == 7
+    assert dlx_solver(grid, limit=7) == bitmask_solver(grid, limit=7)
+    
+    # Conflicting clues have no solution
+    grid = np.copy(EXAMPLE_GRID)
+    grid[8, 0] = 5
+    assert dlx_solver(grid) == 0
+
+def test_propagating_solver():
+    assert backtracking_solver(np.copy(EXAMPLE_GRID), propagate=True) == 1
+    assert propagating_solver(MINIMAL_GRID) == 1
+    
+    # Same counts as the exact cover solver on under-constrained grids
+    grid = np.copy(MINIMAL_GRID)
+    grid[0, 7] = 0
+    grid[3, 4] = 0
+    for limit in (1, 2, 20):
+        assert propagating_solver(grid, limit=limit) == dlx_solver(grid, limit=limit)
+    
+    # The undo trail restores the board
+    board = PropagatingBoard(EXAMPLE_GRID)
+    cand = list(board.cand)
+    mark = len(board.trail)
+    assert board.assign(2, 4) and board.propagate()
+    board.undo(mark)
+    assert board.cand == cand and np.array_equal(board.to_grid(), EXAMPLE_GRID)
+    
+    # Unassigning a clue gives the same board as building it without the clue, and can be undone
+    grid = np.copy(EXAMPLE_GRID)
+    grid[4, 3] = 0
+    board.unassign(4 * 9 + 3)
+    assert board.cand == PropagatingBoard(grid).cand and np.array_equal(board.to_grid(), grid)
+    board.undo(mark)
+    assert board.cand == cand and np.array_equal(board.to_grid(), EXAMPLE_GRID)
+
+def test_batch_validation():
+    rng = np.random.default_rng(0)
+    solution = DancingLinks(EXAMPLE_GRID)
+    solution.count(limit=1)
+    solution = solution.solution_grid()
+    
+    # Stack of solved, partial and random grids
+    grids = np.stack([solution, EXAMPLE_GRID] + [rng.integers(0, 10, (9, 9)) * (rng.random((9, 9)) < 0.3) for _ in range(6)]).astype(np.uint8)
+    original = np.copy(grids)
+    valid, conflicts, candidates = check_grids(grids)
+    assert np.array_equal(grids, original)  # The input is not modified
+    assert valid.tolist()[:2] == [True, False]
+    assert check_grids(grids, complete=False)[0][1]
+    
+    # Same results as check_cell on each grid
+    for n, grid in enumerate(grids.astype(int)):
+        for row in range(9):
+            for col in range(9):
+                num = grid[row][col]
+                if num != 0:
+                    grid[row][col] = 0
+                    assert conflicts[n, row, col] == (not check_cell(grid, row, col, num))
+                    grid[row][col] = num
+                else:
+                    legal = [check_cell(grid, row, col, k) for k in range(1, 10)]
+                    assert candidates[n, 9 * row + col].tolist() == legal
+    assert np.array_equal(candidate_masks(grids), candidates)
+
+def test_board_sizes():
+    # 4x4, 16x16 and 25x25 puzzles from transformed pattern grids, with about half of the cells removed
+    rng = np.random.default_rng(0)
+    for box_size in (2, 4, 5):
+        size = box_size * box_size
+        solution = generate_solutions(1, rng=rng, box_size=box_size)[0].astype(int)
+        assert check_grids(solution[None])[0][0]
+        assert check_grid(np.zeros_like(solution), solution) == []
+        
+        # The partial grid has the solution among its solutions, and the solvers agree on the count
+        grid = solution * (rng.random((size, size)) < 0.6)
+        board = PropagatingBoard(grid)
+        assert board.count(limit=1) == 1
+        nb_solutions = propagating_solver(grid)
+        if box_size == 2:
+            assert backtracking_solver(np.copy(grid)) == nb_solutions == lp_solver(grid)
+        if box_size <= 4:
+            assert milp_solver(grid) == nb_solutions
+        
+        # Candidates of the batch validator match check_cell
+        candidates = candidate_masks(grid[None])[0]
+        row, col = np.argwhere(grid == 0)[0]
+        legal = [check_cell(grid, row, col, num) for num in range(1, size + 1)]
+        assert candidates[size * row + col].tolist() == legal
+    
+    with pytest.raises(ValueError):
+        propagating_solver(np.zeros((6, 6), dtype=int))
+
+def test_milp_solver():
+    nb_solutions, solution = milp_solver(EXAMPLE_GRID, return_solution=True)
+    assert nb_solutions == 1
+    assert bitmask_solver(solution) == 1
+    clues = EXAMPLE_GRID != 0
+    assert np.array_equal(solution[clues], EXAMPLE_GRID[clues])
+    
+    # A second solution is detected
+    grid = np.copy(MINIMAL_GRID)
+    grid[0, 7] = 0
+    assert milp_solver(grid) == 2
+    
+    # Conflicting clues have no solution, and the model can be reused afterwards
+    model = LPModel()
+    grid = np.copy(EXAMPLE_GRID)
+    grid[0, 2] = 5
+    assert model.check(grid) == (0, None)
+    assert model.check(MINIMAL_GRID)[0] == 1
+
+def test_benchmark():
+    # Every puzzle of the pinned corpora has a unique solution
+    for corpus in CORPORA:
+        puzzles, _ = load_corpus(corpus)
+        assert puzzles and all(dlx_solver(grid) == 1 for grid in puzzles)
+    
+    report = run_benchmark(["propagating", "dlx"], ["easy"], timeout=5.0, verbose=False)
+    assert report["timeout_supported"] == hasattr(signal, "SIGALRM")
+    stats = report["results"]["propagating"]["easy"]
+    assert stats["timeouts"] == 0 and stats["wrong_results"] == 0
+    assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["max_ms"]
+    assert stats["nodes_per_second"] > 0 and stats["peak_memory_kb"] > 0
+    assert compare_reports(report, report) == []
+    
+    # A slower run fails the comparison, small increases below min_ms are ignored
+    slower = {**report, "results": {"dlx": {"easy": {**report["results"]["dlx"]["easy"], "p95_ms": 1000.0, "timeouts": 1}}}}
+    failures = compare_reports(report, slower)
+    assert len(failures) == 2 and all(failure.startswith("dlx/easy") for failure in failures)
+    noisy = {**report, "results": {"dlx": {"easy": {**report["results"]["dlx"]["easy"], "max_ms": report["results"]["dlx"]["easy"]["max_ms"] * 2.1}}}}
+    assert compare_reports(report, noisy, {"default": {"max_ms": 2.0}, "min_ms": 1000.0}) == []
+
+def test_lazy_backends():
+    # Importing the solvers, the generator or the interface imports neither PuLP nor SciPy, and opens no window
+    modules = ["src.solver.sudoku_solvers", "src.generator.grid_generator", "src.interface.sudoku_interface"]
+    cold_start = measure_cold_start(modules, repeat=1)
+    assert all(cold_start[module]["heavy_modules"] == [] and cold_start[module]["import_ms"] > 0 for module in modules)
+    
+    # The backends are loaded on first use
+    assert get_solver("milp") is milp_solver and get_solver("propagating")(MINIMAL_GRID) == 1
+    assert milp_solver(MINIMAL_GRID) == 1 and "highs" in loaded_backends()
+    assert get_solver("backtracking_mrv").keywords == {"heuristic": mrv_heuristic}
+    assert get_solver("backtracking_mrv")(np.copy(EXAMPLE_GRID), use_cache=False) == 1
+    with pytest.raises(ValueError):
+        load_backend("unknown")
+    with pytest.raises(ValueError):
+        get_solver("unknown")
+    
+    # A slower import or a heavy library imported again fails the comparison
+    report = {"results": {}, "cold_start": cold_start}
+    slower = {"results": {}, "cold_start": {module: {"import_ms": 1000.0, "heavy_modules": ["pulp"]} for module in modules}}
+    assert compare_reports(report, report) == []
+    assert len(compare_reports(report, slower)) == 2 * len(modules)
+
+def test_solver_stats():
+    calls = []
+    stats = SolverStats(callback=lambda s: calls.append(s.nodes), callback_every=10)
+    assert backtracking_solver(np.copy(EXAMPLE_GRID), heuristic=mrv_heuristic, stats=stats) == 1
+    assert stats.solver == "backtracking" and stats.nodes > 0
+    assert stats.max_depth == (EXAMPLE_GRID == 0).sum()  # The last node fills the grid
+    assert stats.candidate_checks >= stats.nodes - 1 and stats.backtracks > 0
+    assert 0 < stats.heuristic_time < stats.wall_time and stats.cpu_time > 0
+    assert calls == list(range(10, stats.nodes + 1, 10))
+    
+    for solver in [bitmask_solver, dlx_solver, propagating_solver, milp_solver]:
+        stats = SolverStats()
+        assert solver(MINIMAL_GRID, stats=stats) == 1
+        assert stats.wall_time > 0 and stats.as_dict()["solver"] is not None
+    assert stats.status is not None  # Status reported by HiGHS
+    
+    # The counters add up over successive calls
+    stats = SolverStats()
+    dlx_solver(EXAMPLE_GRID, stats=stats)
+    nodes = stats.nodes
+    dlx_solver(EXAMPLE_GRID, stats=stats)
+    assert stats.nodes == 2 * nodes
+
+def test_parallel_count():
+    # Example grid with its first 7 clues removed: 2484 solutions
+    grid = np.copy(EXAMPLE_GRID)
+    grid.flat[np.flatnonzero(grid)[:7]] = 0
+    expected = dlx_solver(grid, limit=np.inf)
+    assert expected == 2484
+    assert parallel_count(grid, workers=2) == expected
+    
+    # Early cancellation once the limit is reached
+    assert parallel_count(grid, limit=50, workers=2) == 50
+    assert parallel_count(grid, limit=0) == 0
+    assert parallel_count(EXAMPLE_GRID, limit=50, workers=2) == 1
+    
+    # Explicit split depth: the subproblems are disjoint and cover all the solutions
+    subproblems, solved = split_grid(grid, depth=2)
+    assert len(subproblems) > 1
+    assert solved + sum(dlx_solver(subproblem, limit=np.inf) for subproblem in subproblems) == expected
+    assert parallel_count(grid, workers=2, depth=2) == expected
+    
+    # Any board size: the empty 4x4 board has 288 solutions
+    assert parallel_count(np.zeros((4, 4), dtype=int), workers=2) == 288
+
+def test_solution_cache(tmp_path):
+    cache = SolutionCache(capacity=2, path=str(tmp_path / "solutions.bin"))
+    previous = set_solution_cache(cache)
+    try:
+        # Equivalent puzzle: transposed, bands swapped and numbers relabeled
+        relabel = np.array([0, 5, 3, 9, 1, 7, 2, 8, 4, 6])
+        equivalent = relabel[EXAMPLE_GRID.T[[3, 4, 5, 0, 1, 2, 6, 7, 8]]]
+        assert backtracking_solver(np.copy(EXAMPLE_GRID)) == 1
+        assert cache.counters() == {"entries": 1, "hits": 0, "misses": 1, "evictions": 0}
+        assert backtracking_solver(np.copy(equivalent)) == 1 and lp_solver(equivalent) == 1
+        assert cache.hits == 2 and len(cache) == 1
+        
+        # The solution found by lp_solver is transformed back to each puzzle for place_hint
+        assert lp_solver(MINIMAL_GRID) == 1 and cache.misses == 2
+        grid, hints = place_hint(None, np.copy(MINIMAL_GRID), [])
+        (row, col), = hints
+        assert cache.hits == 3 and grid[row, col] != 0 and check_cell(MINIMAL_GRID, row, col, grid[row, col])
+        grid, _ = place_hint(None, np.copy(equivalent), [])
+        assert cache.hits == 3 and propagating_solver(grid) == 1  # The entry of EXAMPLE_GRID had no solution
+        assert cache.lookup(EXAMPLE_GRID, need_solution=True) is not None
+        
+        # Conflicting clues in a box are stored as having no solution, the oldest entry is evicted
+        grid = np.copy(EXAMPLE_GRID)
+        grid[1, 1] = 8
+        assert backtracking_solver(np.copy(grid)) == 0 and lp_solver(grid) == 2
+        assert cache.evictions == 1 and len(cache) == 2 and cache.lookup(MINIMAL_GRID) is None
+        
+        # Conflicting clues in a row have no canonical form and are not cached
+        grid[1, 1] = 6
+        assert lp_solver(grid) == 2 and len(cache) == 2
+        
+        # The entries are saved and reloaded, from the least to the most recently used
+        cache.save()
+        loaded = SolutionCache(path=cache.path)
+        assert list(loaded.entries) == list(cache.entries)
+        _, solution = loaded.lookup(equivalent, need_solution=True)
+        assert propagating_solver(solution) == 1 and np.array_equal(solution[equivalent != 0], equivalent[equivalent != 0])
+        
+        # A SolverStats bypasses the cache
+        hits = cache.hits
+        assert backtracking_solver(np.copy(EXAMPLE_GRID), stats=SolverStats()) == 1 and cache.hits == hits
+    finally:
+        set_solution_cache(previous)
+
+def test_solve_service(tmp_path, monkeypatch):
+    path = str(tmp_path / "solver.sock")
+    conflicting = np.copy(EXAMPLE_GRID)
+    conflicting[1, 1] = 8
+    hard, _ = load_corpus("expert")
+    assert np.array_equal(parse_puzzle(format_grid(EXAMPLE_GRID)), EXAMPLE_GRID)
+    with pytest.raises(ValueError):
+        parse_puzzle("12345")
+    assert "lp" not in SolveService().solvers  # lp_solver does not count the solutions
+    with pytest.raises(ValueError):
+        SolveService(solvers=["lp"])
+    
+    async def run():
+        service = SolveService(workers=2, solvers=["propagating", "backtracking", "milp"], tasks_per_worker=1)
+        await service.start(path)
+        try:
+            # Results are streamed with the index of their puzzle, then the summary
+            puzzles = [EXAMPLE_GRID, MINIMAL_GRID, conflicting, "123", np.zeros((4, 4), dtype=int)] * 3
+            messages = [message async for message in stream_results(puzzles, path, solution=True)]
+            done = messages.pop()
+            assert done == {"id": 0, "done": True, "solved": 12, "errors": 3}
+            results = {message["index"]: message for message in messages}
+            assert sorted(results) == list(range(len(puzzles)))
+            assert [results[index].get("nb_solutions") for index in range(5)] == [1, 1, 0, None, 2]
+            solution = parse_puzzle(results[0]["solution"])
+            assert propagating_solver(solution) == 1 and np.array_equal(solution[EXAMPLE_GRID != 0], EXAMPLE_GRID[EXAMPLE_GRID != 0])
+            assert "solution" not in results[2] and results[3]["error"].startswith("Invalid puzzle")
+            assert service.peak_tasks <= service.max_tasks == 2  # Backpressure
+            
+            # The timeout of a request stops its puzzles
+            messages = [message async for message in stream_results(hard[:3], path, solver="backtracking", timeout=0.3)]
+            assert messages[-1]["errors"] == 3 and all(message["error"] == "timeout" for message in messages[:-1])
+            
+            # Invalid requests, and cancellation of an open request
+            messages = [message async for message in stream_results([EXAMPLE_GRID], path, solver="dlx")]
+            assert messages == [{"id": 0, "error": "Invalid solver: dlx"}]
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(json.dumps({"id": "slow", "puzzles": [format_grid(grid) for grid in hard], "solver": "backtracking"}).encode() + b"\n")
+            writer.write(json.dumps({"id": "slow", "cancel": True}).encode() + b"\n")
+            await writer.drain()
+            assert json.loads(await reader.readline()) == {"id": "slow", "cancelled": True}
+            writer.close()
+        finally:
+            await service.close()
+    asyncio.run(run())
+    
+    # TCP, and workers without the SIGALRM timer (Windows): the front end reports the timeout
+    monkeypatch.setattr(solve_service, "TIMER_SUPPORTED", False)
+    async def run_tcp():
+        service = SolveService(workers=1, solvers=["backtracking"])
+        await service.start(port=0)
+        try:
+            port = service.address()[1]
+            messages = [message async for message in stream_results([EXAMPLE_GRID, hard[0]], port=port, solver="backtracking", timeout=0.3)]
+            results = {message.get("index"): message for message in messages}
+            assert results[0]["nb_solutions"] == 1 and results[1]["error"] == "timeout"
+        finally:
+            await service.close()
+    asyncio.run(run_tcp())
+    
+    # Synchronous client, with the service in another thread
+    def serve_in_thread(ready, stop):
+        async def run():
+            service = SolveService(workers=1, solvers=["dlx"])
+            await service.start(path)
+            ready.set()
+            await asyncio.to_thread(stop.wait)
+            await service.close()
+        asyncio.run(run())
+    ready, stop = threading.Event(), threading.Event()
+    thread = threading.Thread(target=serve_in_thread, args=(ready, stop))
+    thread.start()
+    try:
+        assert ready.wait(60)
+        results = solve_batch([EXAMPLE_GRID, MINIMAL_GRID], path, solver="dlx")
+        assert [result["nb_solutions"] for result in results] == [1, 1]
+    finally:
+        stop.set()
+        thread.join()
+
+def test_portfolio(tmp_path, monkeypatch):
+    features = puzzle_features(np.stack([EXAMPLE_GRID, MINIMAL_GRID]))
+    assert list(features["clues"]) == [30, 17] and features["mean_candidates"][1] > features["mean_candidates"][0]
+    assert features["digit_skew"][0] > 0 and feature_bucket(features, 0) != feature_bucket(features, 1)
+    
+    # The first backend to answer wins, the others are stopped
+    portfolio = Portfolio(["backtracking", "propagating"], log_path=str(tmp_path / "wins.json"))
+    hard, _ = load_corpus("expert")
+    assert portfolio.race(EXAMPLE_GRID)[0] == 1
+    nb_solutions, winner, elapsed = portfolio.race(hard[0])
+    assert nb_solutions == 1 and winner == "propagating" and elapsed < 2.0
+    conflicting = np.copy(EXAMPLE_GRID)
+    conflicting[1, 1] = 8
+    assert portfolio.race(conflicting)[0] == 0
+    with pytest.raises(TimeoutError):
+        portfolio.race(hard[0], backends=["backtracking"], timeout=0.2)
+    
+    # Without process groups (Windows), the racers are killed one by one
+    monkeypatch.setattr(portfolio_module, "PROCESS_GROUPS", False)
+    assert portfolio.race(hard[0])[:2] == (1, "propagating")
+    monkeypatch.undo()
+    
+    # A backend failing on the grid does not win, the race fails only if they all fail
+    empty = np.zeros((4, 4), dtype=int)
+    assert portfolio.race(empty, backends=["bitmask", "propagating"])[:2] == (2, "propagating")
+    with pytest.raises(ValueError):
+        portfolio.race(empty, backends=["bitmask", "dlx"])
+    with pytest.raises(ValueError):
+        Portfolio(["lp"])
+    
+    # The selector picks the backend winning the most races in the bucket of the puzzle
+    selector = Portfolio(["backtracking", "propagating"])
+    assert selector.select(EXAMPLE_GRID) == DEFAULT_BACKEND
+    for _ in range(MIN_BUCKET_RACES):
+        selector.record(EXAMPLE_GRID, "backtracking")
+    assert selector.solve(EXAMPLE_GRID, race=False) == (1, "backtracking")
+    assert selector.select(MINIMAL_GRID) == "backtracking"  # Other buckets fall back on the overall wins
+    
+    # Win rates are saved and reloaded
+    portfolio.save()
+    loaded = Portfolio(["backtracking", "propagating"], log_path=portfolio.log_path)
+    assert loaded.wins == portfolio.wins and sum(loaded.win_counts().values()) == 5
+    assert loaded.win_rates() == portfolio.win_rates() and sum(loaded.win_rates().values()) == pytest.approx(1.0)
+    
+    # Wins of backends outside the portfolio do not count in its win rates
+    subset = Portfolio(["backtracking", "milp"], log_path=portfolio.log_path)
+    subset.record(EXAMPLE_GRID, "backtracking")
+    assert sum(subset.win_rates().values()) == pytest.approx(1.0) and subset.win_rates()["milp"] == 0.0
+
 def main():
-    # Example of a Sudoku grid
-    grid = np.array([
-        [5, 3, 0, 0, 7, 0, 0, 0, 0],
-        [6, 0, 0, 1, 9, 5, 0, 0, 0],
-        [0, 9, 8, 0, 0, 0, 0, 6, 0],
-        [8, 0, 0, 0, 6, 0, 0, 0, 3],
-        [4, 0, 0, 8, 0, 3, 0, 0, 1],
-        [7, 0, 0, 0, 2, 0, 0, 0, 6],
-        [0, 6, 0, 0, 0, 0, 2, 8, 0],
-        [0, 0, 0, 4, 1, 9, 0, 0, 5],
-        [0, 0, 0, 0, 8, 0, 0, 7, 9]
-    ])
+    grid = np.copy(EXAMPLE_GRID)
     
     heursitics = [
         degree_heuristic,
@@ -0,0 +1,103 @@
+import sys
+import os
+
+# Add the root directory to the path in order to import the modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pytest
+
+from src.utils.puzzle_store import PuzzleStore, import_grids
+from src.generator.solution_factory import load_seed_grids
+from src.utils.reward_utils import UnitCounts, RewardTracker, ConflictTracker
+
+def test_puzzle_store(tmp_path):
+    solutions = load_seed_grids()
+    puzzles = solutions * (np.random.default_rng(0).random(solutions.shape) < 0.4)
+
+    for packing in ["nibble", "uint8"]:
+        path = str(tmp_path / f"{packing}.store")
+        store = PuzzleStore.create(path, difficulty="hard", packing=packing, metadata={"source": "test"})
+        store.append(puzzles[:50], solutions[:50])
+        store.append(puzzles[50], solutions[50])
+        store.append(puzzles[51:], solutions[51:])
+
+        # Reopen the file and read it back
+        store = PuzzleStore(path)
+        assert len(store) == len(solutions)
+        assert store.difficulty == "hard" and store.metadata == {"source": "test"}
+        assert np.array_equal(store.puzzles, puzzles) and np.array_equal(store.solutions, solutions)
+        assert np.array_equal(store[10][1], solutions[10])
+        assert np.array_equal(store[[3, 1]][0], puzzles[[3, 1]])
+        assert np.array_equal(store[5:60:5][1], solutions[5:60:5])
+
+    assert os.path.getsize(str(tmp_path / "nibble.store")) == store.header_size + 81 * len(solutions)
+    with pytest.raises(FileExistsError):
+        PuzzleStore.create(path)
+
+def test_import_grids(tmp_path):
+    store = PuzzleStore.create(str(tmp_path / "expert.store"), difficulty="expert")
+    n = import_grids(store)
+    assert n == len([f for f in os.listdir(os.path.join(os.path.dirname(__file__), "../data/grids")) if f.startswith("solution_expert")])
+    assert len(store) == n and (store.solutions != 0).all()
+
+def count_conflicts(grid):
+    # Pairs of equal numbers in each unit, by rescanning the board
+    grid = np.array(grid)
+    units = list(grid) + list(grid.T) + [grid[r:r + 3, c:c + 3].ravel() for r in range(0, 9, 3) for c in range(0, 9, 3)]
+    return sum(n * (n - 1) // 2 for unit in units for n in np.bincount(unit, minlength=10)[1:])
+
+def test_reward_tracker():
+    solution = load_seed_grids()[0]
+    puzzle = solution * (np.random.default_rng(0).random((9, 9)) < 0.5)
+    tracker = RewardTracker(puzzle)
+    assert tracker.conflicts == 0 and not tracker.solved
+
+    # Random moves: the incremental conflict count matches a rescan
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        row, col, num = rng.integers(9), rng.integers(9), rng.integers(1, 10)
+        before = tracker.conflicts
+        if rng.random() < 0.3:
+            reward, delta, solved = tracker.erase(row, col)
+        else:
+            reward, delta, solved = tracker.place(row, col, num)
+        assert tracker.conflicts == before + delta == count_conflicts(tracker.grid)
+        if puzzle[row][col]:
+            assert reward == tracker.rewards["invalid"] and tracker.grid[row][col] == puzzle[row][col]
+
+    # Completing the board
+    for row, col in zip(*np.nonzero(puzzle == 0)):
+        reward, delta, solved = tracker.place(row, col, solution[row][col])
+    assert solved and tracker.solved and reward >= tracker.rewards["solved"]
+    row, col = np.argwhere(puzzle == 0)[0]
+    assert tracker.erase(row, col)[1:] == (0, False) and not tracker.solved
+
+    # 4x4 board
+    counts = UnitCounts([[1, 2, 0, 0], [0, 0, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+    assert counts.place(0, 2, 1) == 3 and counts.conflicts == 3  # Row of (0, 0), column and box of (1, 2)
+    assert counts.erase(1, 2) == -2 and counts.conflicts == 1
+
+def test_conflict_tracker():
+    solution = load_seed_grids()[1]
+    puzzle = solution * (np.random.default_rng(2).random((9, 9)) < 0.4)
+    tracker = ConflictTracker(puzzle)
+    assert tracker.conflicting == set()
+
+    # An edit can create or clear conflicts in other cells
+    rng = np.random.default_rng(3)
+    for _ in range(300):
+        row, col = rng.integers(9), rng.integers(9)
+        if rng.random() < 0.3:
+            tracker.erase(row, col)
+        else:
+            tracker.place(row, col, rng.integers(1, 10))
+        grid = np.array(tracker.grid)
+        expected = set()
+        for i in range(9):
+            for j in range(9):
+                num = grid[i][j]
+                box = grid[3 * (i // 3):3 * (i // 3) + 3, 3 * (j // 3):3 * (j // 3) + 3]
+                if num and ((grid[i] == num).sum() > 1 or (grid[:, j] == num).sum() > 1 or (box == num).sum() > 1):
+                    expected.add((i, j))
+        assert tracker.conflicting == expected